@@ -1,24 +1,50 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, url_for, abort, stream_with_context
 from marshmallow import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.orm import joinedload, selectinload, undefer
+from sqlalchemy.orm.exc import StaleDataError
 from extensions import db
 from models import (
     MemeTemplate, TemplateCategory, TemplateField, 
     Sticker, StickerCategory, Font, Meme, MemeLayer, MemeDraft, User
 )
 from schemas import (
-    TemplateSchema, TemplateDetailSchema, TemplateCategorySchema,
-    StickerSchema, StickerCategorySchema, FontSchema,
+    TemplateDetailSchema, TemplateCategorySchema,
+    StickerCategorySchema, FontSchema,
     AssetCategorySchema, TrendingItemSchema, GifSchema,
-    MemeSchema, MemeCreateSchema, MemeLayerSchema,
-    DraftCreateSchema, PaginatedSchema, ErrorSchema
+    MemeSchema, MemeCreateSchema, MemeBatchCreateSchema, MemeLayerSchema, MemeRenderSchema,
+    DraftCreateSchema, PaginatedSchema, ErrorSchema, image_variants
 )
-from services.reddit_service import get_trending_content
+from pagination import paginate
+from validation import CompiledSchema, PayloadTooLarge, json_body, check_limits
+from serializers import (
+    template_rows, template_serializer, sticker_rows, sticker_serializer,
+    meme_rows, serialize_memes, draft_rows, serialize_draft
+)
+from search import search_templates
+from json_patch import apply_patch, JsonPatchError, JsonPatchTestFailed
+from user_export import export_lines, decode_export_cursor
+from services.trending_service import get_trending_content
 from services.giphy_service import get_cached_gifs
+from services.render_service import (
+    render_meme, render_path, RenderError, MemeNotFoundError, InvalidLayerError, FORMATS
+)
+from services.thumbnail_service import get_variant, VariantError, VARIANT_FORMATS
+from services.catalog_cache import catalog_cached
+from services.cache import cache_stats, CacheTimeout
+from services.http_client import get_http_client
+from compression import compression_stats
+from services import draft_buffer
 from datetime import datetime
 
 
 api_v1 = Blueprint('api_v1', __name__, url_prefix='/api/v1')
 
+# Single-pass equivalents of MemeCreateSchema().load and DraftCreateSchema().load
+MEME_CREATE_LOADER = CompiledSchema(MemeCreateSchema)
+DRAFT_CREATE_LOADER = CompiledSchema(DraftCreateSchema)
+DRAFT_UPDATE_LOADER = CompiledSchema(DraftCreateSchema, partial=True)
+
 
 # Error handler
 def error_response(message, status_code=400, error_type='BadRequest'):
@@ -31,38 +57,58 @@ def error_response(message, status_code=400, error_type='BadRequest'):
     })), status_code
 
 
+VARIANT_MAX_AGE = 30 * 24 * 3600
+
+
+def image_variant_response(source):
+    """Serve the nearest resized variant of a catalog image (?w=&fmt=)."""
+    width = request.args.get('w', type=int)
+    fmt = request.args.get('fmt', 'webp')
+
+    if not source:
+        return error_response('Image not available', 404, 'NotFound')
+    if fmt not in VARIANT_FORMATS:
+        return error_response(f'Unsupported format: {fmt}', 400, 'BadRequest')
+
+    try:
+        variant = get_variant(source, width, fmt)
+    except VariantError as e:
+        return error_response(f'Failed to load image: {str(e)}', 502, 'ServiceUnavailable')
+
+    response = send_file(variant['path'], mimetype=variant['mimetype'], etag=variant['etag'], conditional=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = VARIANT_MAX_AGE
+    return response
+
+
 # Template endpoints
 @api_v1.route('/templates', methods=['GET'])
 def get_templates():
     """Get templates with optional filtering and pagination."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
     category_id = request.args.get('category_id', type=int)
     search = request.args.get('search', '')
     
-    query = MemeTemplate.query
+    query = template_rows()
     
     if category_id:
-        query = query.filter_by(category_id=category_id)
-    
-    if search:
-        query = query.filter(MemeTemplate.name.ilike(f'%{search}%'))
+        query = query.filter(MemeTemplate.category_id == category_id)
     
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+    if search.strip():
+        query = search_templates(query, search)
     
-    schema = TemplateSchema(many=True)
-    return jsonify({
-        'page': page,
-        'per_page': per_page,
-        'total': paginated.total,
-        'items': schema.dump(paginated.items)
-    }), 200
+    try:
+        result = paginate(query, MemeTemplate, template_serializer(), f'templates:{category_id}:{search}')
+    except ValueError as e:
+        return error_response(str(e), 400, 'BadRequest')
+    return jsonify(result), 200
 
 
 @api_v1.route('/templates/<int:template_id>', methods=['GET'])
 def get_template(template_id):
     """Get a specific template with metadata."""
-    template = MemeTemplate.query.get_or_404(template_id)
+    template = MemeTemplate.query.options(
+        joinedload(MemeTemplate.category), selectinload(MemeTemplate.fields)
+    ).filter_by(id=template_id).first_or_404()
     
     result = {
         'id': template.id,
@@ -82,28 +128,44 @@ def get_template(template_id):
             }
             for f in template.fields
         ],
+        'variants': image_variants('api_v1.get_template_image', template_id=template.id) if template.image_url else [],
         'created_at': template.created_at.isoformat()
     }
     return jsonify(result), 200
 
 
+@api_v1.route('/templates/<int:template_id>/image', methods=['GET'])
+def get_template_image(template_id):
+    """Get a resized WebP/JPEG variant of a template image."""
+    template = MemeTemplate.query.get_or_404(template_id)
+    return image_variant_response(template.image_url)
+
+
 # Stickers endpoint
 @api_v1.route('/stickers', methods=['GET'])
+@catalog_cached
 def get_stickers():
     """Get all stickers with optional category filter."""
     category_id = request.args.get('category_id', type=int)
     
-    query = Sticker.query
+    query = sticker_rows()
     if category_id:
-        query = query.filter_by(category_id=category_id)
+        query = query.filter(Sticker.category_id == category_id)
     
-    stickers = query.all()
-    schema = StickerSchema(many=True)
-    return jsonify(schema.dump(stickers)), 200
+    serialize = sticker_serializer()
+    return jsonify([serialize(row) for row in query.all()]), 200
+
+
+@api_v1.route('/stickers/<int:sticker_id>/image', methods=['GET'])
+def get_sticker_image(sticker_id):
+    """Get a resized WebP/JPEG variant of a sticker image."""
+    sticker = Sticker.query.get_or_404(sticker_id)
+    return image_variant_response(sticker.image_url)
 
 
 # Fonts endpoint
 @api_v1.route('/fonts', methods=['GET'])
+@catalog_cached
 def get_fonts():
     """Get all available fonts."""
     fonts = Font.query.all()
@@ -113,6 +175,7 @@ def get_fonts():
 
 # Asset categories endpoint
 @api_v1.route('/assets/categories', methods=['GET'])
+@catalog_cached
 def get_asset_categories():
     """Get all asset categories."""
     template_categories = TemplateCategory.query.all()
@@ -133,6 +196,8 @@ def get_trending():
         trending = get_trending_content(cache_ttl=3600)
         schema = TrendingItemSchema(many=True)
         return jsonify(schema.dump(trending)), 200
+    except CacheTimeout as e:
+        return error_response(str(e), 503, 'ServiceUnavailable')
     except Exception as e:
         return error_response(f'Failed to fetch trending content: {str(e)}', 502, 'ServiceUnavailable')
 
@@ -143,51 +208,100 @@ def search_gifs():
     """Search for GIFs."""
     query = request.args.get('query', '')
     limit = request.args.get('limit', 20, type=int)
+    offset = request.args.get('offset', type=int)
+    if offset is not None:
+        offset = max(offset, 0)
     
-    if not query:
+    if not query.strip():
         return error_response('Query parameter is required', 400, 'BadRequest')
     
-    if limit > 50:
-        limit = 50
+    limit = min(max(limit, 1), 50)
     
     try:
-        gifs = get_cached_gifs(query, cache_ttl=1800)
+        page = get_cached_gifs(query, limit=limit, offset=offset or 0, cache_ttl=1800)
         schema = GifSchema(many=True)
-        return jsonify(schema.dump(gifs)), 200
+        # Without ?offset= keep the original bare-list response
+        if offset is None:
+            return jsonify(schema.dump(page['items'])), 200
+        return jsonify({
+            'offset': offset,
+            'limit': limit,
+            'total': page['total'],
+            'next_offset': page['next_offset'],
+            'items': schema.dump(page['items'])
+        }), 200
+    except CacheTimeout as e:
+        return error_response(str(e), 503, 'ServiceUnavailable')
     except Exception as e:
         return error_response(f'Failed to fetch GIFs: {str(e)}', 502, 'ServiceUnavailable')
 
 
+# Cache statistics endpoint
+@api_v1.route('/stats/cache', methods=['GET'])
+def get_cache_stats():
+    """Get this worker's hit/stale/miss counts for the upstream caches."""
+    return jsonify(cache_stats()), 200
+
+
+@api_v1.route('/stats/http', methods=['GET'])
+def get_http_stats():
+    """Get this worker's per-host upstream latency, retry and connection-reuse stats."""
+    return jsonify(get_http_client().stats()), 200
+
+
+@api_v1.route('/stats/compression', methods=['GET'])
+def get_compression_stats():
+    """Get this worker's response compression ratios and CPU time per encoding."""
+    return jsonify(compression_stats()), 200
+
+
+@api_v1.route('/stats/drafts', methods=['GET'])
+def get_draft_storage_stats():
+    """Get stored draft bytes per user, largest first (or for one user with ?user_id=)."""
+    user_id = request.args.get('user_id', type=int)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    
+    query = db.session.query(
+        MemeDraft.user_id,
+        func.count(MemeDraft.id),
+        func.coalesce(func.sum(MemeDraft.data_size), 0)
+    ).group_by(MemeDraft.user_id)
+    if user_id:
+        query = query.filter(MemeDraft.user_id == user_id)
+    rows = query.order_by(func.coalesce(func.sum(MemeDraft.data_size), 0).desc()).limit(limit).all()
+    
+    return jsonify([
+        {'user_id': row_user_id, 'drafts': drafts, 'stored_bytes': int(stored_bytes)}
+        for row_user_id, drafts, stored_bytes in rows
+    ]), 200
+
+
 # Meme endpoints
 @api_v1.route('/memes', methods=['GET'])
 def get_memes():
     """Get user memes with pagination."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
     user_id = request.args.get('user_id', type=int)
     
-    query = Meme.query
+    query = meme_rows()
     if user_id:
-        query = query.filter_by(user_id=user_id)
+        query = query.filter(Meme.user_id == user_id)
     
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-    schema = MemeSchema(many=True)
-    
-    return jsonify({
-        'page': page,
-        'per_page': per_page,
-        'total': paginated.total,
-        'items': schema.dump(paginated.items)
-    }), 200
+    try:
+        result = paginate(query, Meme, serialize_memes, f'memes:{user_id}', many=True)
+    except ValueError as e:
+        return error_response(str(e), 400, 'BadRequest')
+    return jsonify(result), 200
 
 
 @api_v1.route('/memes', methods=['POST'])
 def create_meme():
     """Create and save a finalized meme."""
-    schema = MemeCreateSchema()
-    
     try:
-        data = schema.load(request.get_json() or {})
+        body = json_body(current_app.config['MAX_MEME_BYTES'])
+        check_limits(body, 'layers')
+        data = MEME_CREATE_LOADER.load(body)
+    except PayloadTooLarge as e:
+        return error_response(str(e), 413, 'PayloadTooLarge')
     except ValidationError as err:
         return error_response(f'Validation failed: {err.messages}', 400, 'ValidationError')
     
@@ -222,22 +336,153 @@ def create_meme():
         return error_response(f'Failed to create meme: {str(e)}', 500, 'InternalServerError')
 
 
+@api_v1.route('/memes/batch', methods=['POST'])
+def create_memes_batch():
+    """Create many memes with their layers in one transaction."""
+    try:
+        body = json_body(current_app.config['MAX_BATCH_BYTES'])
+        # Each meme sits two levels down, inside {"memes": [...]}
+        check_limits(body, wrapper_depth=2)
+        payload = MemeBatchCreateSchema().load(body)
+    except PayloadTooLarge as e:
+        return error_response(str(e), 413, 'PayloadTooLarge')
+    except ValidationError as err:
+        return error_response(f'Validation failed: {err.messages}', 400, 'ValidationError')
+
+    results = [{'index': index, 'id': None} for index in range(len(payload['memes']))]
+    valid = []
+    for index, item in enumerate(payload['memes']):
+        if not isinstance(item, dict):
+            results[index]['errors'] = {str(index): ['Must be an object.']}
+            continue
+        try:
+            check_limits(item, 'layers')
+            valid.append((index, MEME_CREATE_LOADER.load(item)))
+        except ValidationError as err:
+            results[index]['errors'] = err.messages
+
+    # Check references with one query per table instead of relying on FK enforcement
+    template_ids = {data['template_id'] for _, data in valid if data.get('template_id')}
+    user_ids = {data['user_id'] for _, data in valid if data.get('user_id')}
+    known_templates = {row_id for (row_id,) in db.session.query(MemeTemplate.id).filter(MemeTemplate.id.in_(template_ids))}
+    known_users = {row_id for (row_id,) in db.session.query(User.id).filter(User.id.in_(user_ids))}
+    checked = []
+    for index, data in valid:
+        if data.get('template_id') and data['template_id'] not in known_templates:
+            results[index]['errors'] = {'template_id': ['Template not found.']}
+        elif data.get('user_id') and data['user_id'] not in known_users:
+            results[index]['errors'] = {'user_id': ['User not found.']}
+        else:
+            checked.append((index, data))
+
+    if checked:
+        try:
+            meme_ids = db.session.scalars(
+                insert(Meme).returning(Meme.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'title': data['title'],
+                        'image_url': data.get('image_url'),
+                        'user_id': data.get('user_id'),
+                        'template_id': data.get('template_id')
+                    }
+                    for _, data in checked
+                ]
+            ).all()
+            layers = [
+                {
+                    'meme_id': meme_id,
+                    'layer_type': layer['layer_type'],
+                    'content': layer['content'],
+                    'properties': layer.get('properties'),
+                    'z_index': layer.get('z_index', 0)
+                }
+                for meme_id, (_, data) in zip(meme_ids, checked)
+                for layer in data.get('layers', [])
+            ]
+            if layers:
+                db.session.execute(insert(MemeLayer), layers)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return error_response(f'Failed to create memes: {str(e)}', 500, 'InternalServerError')
+
+        for meme_id, (index, _) in zip(meme_ids, checked):
+            results[index]['id'] = meme_id
+
+    created = len(checked)
+    failed = len(results) - created
+    status = 201 if not failed else (207 if created else 400)
+    return jsonify({'created': created, 'failed': failed, 'results': results}), status
+
+
 @api_v1.route('/memes/<int:meme_id>', methods=['GET'])
 def get_meme(meme_id):
     """Get a specific meme with all layers."""
-    meme = Meme.query.get_or_404(meme_id)
+    meme = Meme.query.options(selectinload(Meme.layers)).filter_by(id=meme_id).first_or_404()
     schema = MemeSchema()
     return jsonify(schema.dump(meme)), 200
 
 
+@api_v1.route('/memes/render', methods=['POST'])
+def render_meme_image():
+    """Render a meme on the server and return the location of the image."""
+    schema = MemeRenderSchema()
+
+    try:
+        data = schema.load(request.get_json() or {})
+    except ValidationError as err:
+        return error_response(f'Validation failed: {err.messages}', 400, 'ValidationError')
+
+    try:
+        result = render_meme(data['meme_id'], data['format'], data['filters'])
+    except MemeNotFoundError as e:
+        return error_response(str(e), 404, 'NotFound')
+    except InvalidLayerError as e:
+        return error_response(f'Failed to render meme: {str(e)}', 400, 'ValidationError')
+    except RenderError as e:
+        return error_response(f'Failed to render meme: {str(e)}', 502, 'ServiceUnavailable')
+
+    return jsonify({
+        'meme_id': result['meme_id'],
+        'key': result['key'],
+        'format': result['format'],
+        'cached': result['cached'],
+        'url': url_for('api_v1.get_render', key=result['key'], fmt=result['format'])
+    }), 200
+
+
+@api_v1.route('/renders/<string:key>.<string:fmt>', methods=['GET'])
+def get_render(key, fmt):
+    """Serve a rendered meme image by its composition hash."""
+    if fmt not in FORMATS or len(key) != 64 or not all(c in '0123456789abcdef' for c in key):
+        abort(404)
+
+    path = render_path(key, fmt)
+    if path is None:
+        abort(404)
+    try:
+        response = send_file(path, mimetype=FORMATS[fmt], etag=key, conditional=True)
+    except FileNotFoundError:
+        abort(404)
+
+    # Renders are content-addressed, so a given URL never changes
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+
 # Draft endpoints
 @api_v1.route('/memes/draft', methods=['POST'])
 def create_draft():
     """Create or update a meme draft."""
-    schema = DraftCreateSchema()
-    
     try:
-        data = schema.load(request.get_json() or {})
+        body = json_body(current_app.config['MAX_DRAFT_BYTES'])
+        check_limits(body)
+        data = DRAFT_CREATE_LOADER.load(body)
+    except PayloadTooLarge as e:
+        return error_response(str(e), 413, 'PayloadTooLarge')
     except ValidationError as err:
         return error_response(f'Validation failed: {err.messages}', 400, 'ValidationError')
     
@@ -255,6 +500,7 @@ def create_draft():
         return jsonify({
             'id': draft.id,
             'title': draft.title,
+            'version': draft.version,
             'created_at': draft.created_at.isoformat(),
             'updated_at': draft.updated_at.isoformat()
         }), 201
@@ -265,52 +511,235 @@ def create_draft():
 
 @api_v1.route('/memes/draft/<int:draft_id>', methods=['GET'])
 def get_draft(draft_id):
-    """Get a specific draft."""
-    draft = MemeDraft.query.get_or_404(draft_id)
+    """Get a specific draft, including any autosave not yet flushed."""
+    draft = draft_or_404(draft_id)
+    state = draft_state(draft)
     return jsonify({
         'id': draft.id,
-        'title': draft.title,
+        'title': state['title'],
         'user_id': draft.user_id,
+        'template_id': state['template_id'],
+        'data': state['data'],
+        'version': state['version'],
+        'created_at': draft.created_at.isoformat(),
+        'updated_at': state['updated_at']
+    }), 200
+
+
+def draft_or_404(draft_id):
+    """Load a draft together with its deferred data payload."""
+    return MemeDraft.query.options(undefer(MemeDraft.data_blob)).get_or_404(draft_id)
+
+
+def draft_state(draft):
+    """Latest state of a draft: its buffered autosave if one is pending, else the row."""
+    state = draft_buffer.buffered_state(draft.id)
+    if state and state['version'] > draft.version:
+        return state
+    return {
+        'title': draft.title,
         'template_id': draft.template_id,
         'data': draft.data,
-        'created_at': draft.created_at.isoformat(),
+        'version': draft.version,
         'updated_at': draft.updated_at.isoformat()
-    }), 200
+    }
+
+
+def write_draft(draft, state, claimed):
+    """Write a state to the draft's row.
+
+    A write whose version is ``claimed`` in the buffer cannot lose to another
+    save, only to the flusher moving the row to an older version (or to this
+    very state), so it retries instead of reporting a conflict.
+    """
+    for attempt in range(3):
+        draft.title = state['title']
+        draft.template_id = state['template_id']
+        draft.data = state['data']
+        draft.updated_at = datetime.fromisoformat(state['updated_at'])
+        # Buffered autosaves may have moved the version past the row's
+        draft.version = state['version']
+        try:
+            db.session.commit()
+            return
+        except StaleDataError:
+            db.session.rollback()
+            if not claimed or attempt == 2:
+                raise
+            if draft.version >= state['version']:
+                return
+
+
+def store_draft(draft, state):
+    """Save a new draft state, or only buffer it when the client sent ?autosave=1.
+
+    Buffered autosaves are written to the database by the flusher within
+    DRAFT_FLUSH_INTERVAL seconds; a save without autosave, or an autosave while
+    Redis is unavailable, writes through. Either way the new version is first
+    claimed in the buffer with a compare-and-set, so of two writes based on the
+    same version exactly one succeeds: the other raises
+    draft_buffer.VersionConflict, or StaleDataError when both write through
+    without Redis. Returns (state, buffered).
+    """
+    state = dict(state, version=state['version'] + 1, updated_at=datetime.utcnow().isoformat())
+    autosave = request.args.get('autosave', '').lower() in ('1', 'true', 'yes')
+    claimed = draft_buffer.buffer_draft(draft.id, state, draft.version)
+    if claimed and autosave and current_app.config.get('DRAFT_AUTOSAVE_BUFFER'):
+        return state, True
+
+    try:
+        write_draft(draft, state, claimed)
+    finally:
+        if claimed:
+            draft_buffer.settle(draft.id, state)
+    return state, False
+
+
+def version_conflict(draft_id, current, expected=None):
+    """409 response for a write based on a stale draft version."""
+    based_on = f', not {expected}' if expected is not None else ''
+    return error_response(
+        f'Draft {draft_id} is at version {current}{based_on}; reload and retry',
+        409, 'Conflict'
+    )
+
+
+def stored_version(draft_id):
+    """Current version of a draft after a failed write."""
+    db.session.rollback()
+    return draft_state(db.session.get(MemeDraft, draft_id))['version']
+
+
+def expected_version(body):
+    """Version the client based its change on, from the body or an If-Match header.
+
+    Returns None when neither is given; raises ValueError when one is given
+    but is not an integer, so a typo never turns into an unversioned write.
+    """
+    if isinstance(body, dict) and 'version' in body:
+        version = body['version']
+    else:
+        header = request.headers.get('If-Match', '').strip()
+        if not header:
+            return None
+        version = header.removeprefix('W/').strip('"')
+    if isinstance(version, bool) or isinstance(version, float) and not version.is_integer():
+        raise ValueError(f'Invalid draft version: {version!r}')
+    try:
+        return int(version)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid draft version: {version!r}')
 
 
 @api_v1.route('/memes/draft/<int:draft_id>', methods=['PUT'])
 def update_draft(draft_id):
     """Update a draft."""
-    draft = MemeDraft.query.get_or_404(draft_id)
-    schema = DraftCreateSchema(partial=True)
+    draft = draft_or_404(draft_id)
+    try:
+        body = json_body(current_app.config['MAX_DRAFT_BYTES'])
+    except PayloadTooLarge as e:
+        return error_response(str(e), 413, 'PayloadTooLarge')
     
+    # Versioning is optional for full replacements to keep existing clients working
     try:
-        data = schema.load(request.get_json() or {})
+        version = expected_version(body)
+    except ValueError as e:
+        return error_response(str(e), 400, 'BadRequest')
+    if isinstance(body, dict):
+        body = {key: value for key, value in body.items() if key != 'version'}
+    
+    try:
+        check_limits(body)
+        data = DRAFT_UPDATE_LOADER.load(body)
     except ValidationError as err:
         return error_response(f'Validation failed: {err.messages}', 400, 'ValidationError')
     
+    state = draft_state(draft)
+    if version is not None and version != state['version']:
+        return version_conflict(draft_id, state['version'], version)
+    
     try:
-        if 'title' in data:
-            draft.title = data['title']
-        if 'data' in data:
-            draft.data = data['data']
-        if 'template_id' in data:
-            draft.template_id = data['template_id']
-        
-        draft.updated_at = datetime.utcnow()
-        db.session.commit()
+        for key in ('title', 'data', 'template_id'):
+            if key in data:
+                state[key] = data[key]
+        state, buffered = store_draft(draft, state)
         
         return jsonify({
             'id': draft.id,
-            'title': draft.title,
+            'title': state['title'],
+            'version': state['version'],
+            'buffered': buffered,
             'created_at': draft.created_at.isoformat(),
-            'updated_at': draft.updated_at.isoformat()
+            'updated_at': state['updated_at']
         }), 200
+    except draft_buffer.VersionConflict as e:
+        return version_conflict(draft_id, e.current, version)
+    except StaleDataError:
+        return version_conflict(draft_id, stored_version(draft_id), version)
     except Exception as e:
         db.session.rollback()
         return error_response(f'Failed to update draft: {str(e)}', 500, 'InternalServerError')
 
 
+@api_v1.route('/memes/draft/<int:draft_id>', methods=['PATCH'])
+def patch_draft(draft_id):
+    """Apply an RFC 6902 JSON Patch to a draft's data."""
+    try:
+        body = json_body(current_app.config['MAX_DRAFT_BYTES'], silent=True)
+        check_limits(body)
+    except PayloadTooLarge as e:
+        return error_response(str(e), 413, 'PayloadTooLarge')
+    except ValidationError as err:
+        return error_response(f'Validation failed: {err.messages}', 400, 'ValidationError')
+    if isinstance(body, list):
+        patch = body
+    elif isinstance(body, dict) and isinstance(body.get('patch'), list):
+        patch = body['patch']
+    else:
+        return error_response('Body must be a JSON Patch array or {"version": n, "patch": [...]}', 400, 'BadRequest')
+    
+    try:
+        version = expected_version(body)
+    except ValueError as e:
+        return error_response(str(e), 400, 'BadRequest')
+    if version is None:
+        return error_response('A draft version is required (body "version" or If-Match header)', 428, 'PreconditionRequired')
+    
+    draft = draft_or_404(draft_id)
+    state = draft_state(draft)
+    if state['version'] != version:
+        return version_conflict(draft_id, state['version'], version)
+    
+    try:
+        data = apply_patch(state['data'] or {}, patch)
+    except JsonPatchTestFailed as e:
+        return error_response(str(e), 409, 'Conflict')
+    except JsonPatchError as e:
+        return error_response(f'Invalid patch: {str(e)}', 422, 'UnprocessableEntity')
+    if not isinstance(data, dict):
+        return error_response('Invalid patch: draft data must remain an object', 422, 'UnprocessableEntity')
+    
+    # A patch that changes nothing does not write or bump the version
+    buffered = False
+    if data != state['data']:
+        try:
+            state, buffered = store_draft(draft, dict(state, data=data))
+        except draft_buffer.VersionConflict as e:
+            return version_conflict(draft_id, e.current, version)
+        except StaleDataError:
+            return version_conflict(draft_id, stored_version(draft_id), version)
+        except Exception as e:
+            db.session.rollback()
+            return error_response(f'Failed to update draft: {str(e)}', 500, 'InternalServerError')
+    
+    return jsonify({
+        'id': draft.id,
+        'version': state['version'],
+        'buffered': buffered,
+        'updated_at': state['updated_at']
+    }), 200
+
+
 @api_v1.route('/memes/draft/<int:draft_id>', methods=['DELETE'])
 def delete_draft(draft_id):
     """Delete a draft."""
@@ -319,6 +748,7 @@ def delete_draft(draft_id):
     try:
         db.session.delete(draft)
         db.session.commit()
+        draft_buffer.discard(draft_id)
         return jsonify({'message': 'Draft deleted successfully'}), 200
     except Exception as e:
         db.session.rollback()
@@ -328,27 +758,43 @@ def delete_draft(draft_id):
 @api_v1.route('/memes/drafts', methods=['GET'])
 def get_drafts():
     """Get user drafts with pagination."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
     user_id = request.args.get('user_id', type=int)
     
-    query = MemeDraft.query
+    query = draft_rows()
     if user_id:
-        query = query.filter_by(user_id=user_id)
+        query = query.filter(MemeDraft.user_id == user_id)
     
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+    try:
+        result = paginate(query, MemeDraft, serialize_draft, f'drafts:{user_id}')
+    except ValueError as e:
+        return error_response(str(e), 400, 'BadRequest')
     
-    return jsonify({
-        'page': page,
-        'per_page': per_page,
-        'total': paginated.total,
-        'items': [
-            {
-                'id': d.id,
-                'title': d.title,
-                'created_at': d.created_at.isoformat(),
-                'updated_at': d.updated_at.isoformat()
-            }
-            for d in paginated.items
-        ]
-    }), 200
+    # Show pending autosaves without waiting for the flusher
+    buffered = draft_buffer.buffered_states(item['id'] for item in result['items'])
+    for item in result['items']:
+        state = buffered.get(item['id'])
+        if state:
+            item.update(title=state['title'], updated_at=state['updated_at'])
+    return jsonify(result), 200
+
+
+# Export
+@api_v1.route('/users/<int:user_id>/export', methods=['GET'])
+def export_user(user_id):
+    """Stream a user's memes and drafts as NDJSON; ?cursor= resumes after a received line."""
+    if db.session.get(User, user_id) is None:
+        return error_response(f'User {user_id} not found', 404, 'NotFound')
+    cursor = request.args.get('cursor') or None
+    if cursor:
+        try:
+            decode_export_cursor(cursor)
+        except ValueError as e:
+            return error_response(str(e), 400, 'BadRequest')
+
+    lines = export_lines(user_id, cursor, current_app.config['EXPORT_BATCH_SIZE'])
+    response = Response(stream_with_context(lines), mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = f'attachment; filename=user-{user_id}-export.ndjson'
+    response.headers['Cache-Control'] = 'no-store'
+    # Ask nginx-style proxies not to buffer, so rows reach the client as they are read
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
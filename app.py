@@ -10,11 +10,21 @@ import os
 # Import models so that they are registered with SQLAlchemy
 from models import User, MemeTemplate, TemplateCategory, TemplateField, Sticker, StickerCategory, Font, Meme, MemeLayer, MemeDraft
 
-from commands import seed
+from commands import (
+    seed, prefetch_assets, generate_image_variants, reindex_search, import_catalog_command, trending_worker,
+    flush_drafts_command
+)
+from services.trending_worker import ensure_trending_thread
+from json_provider import init_json_provider
+from compression import init_compression
 
 def create_app(config_class=Config):
-    app = Flask(__name__, static_folder='static', static_url_path='/static')
+    # No builtin static route: main.serve_static serves it with precompression and cache headers
+    app = Flask(__name__, static_folder=None)
+    app.static_folder = 'static'
     app.config.from_object(config_class)
+    init_json_provider(app)
+    init_compression(app)
 
     # Initialize extensions
     db.init_app(app)
@@ -36,6 +46,17 @@ def create_app(config_class=Config):
     
     # Register commands
     app.cli.add_command(seed)
+    app.cli.add_command(prefetch_assets)
+    app.cli.add_command(generate_image_variants)
+    app.cli.add_command(reindex_search)
+    app.cli.add_command(import_catalog_command)
+    app.cli.add_command(trending_worker)
+    app.cli.add_command(flush_drafts_command)
+
+    # Single-node deployments can refresh the trending feed in-process, started
+    # by the first request so CLI commands don't spawn a refresher
+    if app.config.get('TRENDING_REFRESHER') == 'thread':
+        app.before_request(lambda: ensure_trending_thread(app))
 
     return app
 
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+"""Benchmark every /api/v1 endpoint against realistically sized data.
+
+Seeds an SQLite database (kept with --db so later runs skip seeding) with
+100k templates with fields, 1M memes with layers and 100k drafts by default
+(--scale shrinks or grows every volume), then times each endpoint through
+the Flask test client. Upstream-backed endpoints use the bundled fake
+Reddit/Giphy server, so no network is needed.
+
+Each case reports min/median/mean/p95/max and ops/sec in the style of
+pytest-benchmark. Results are written as JSON; pass --compare with an
+earlier file to print the median change per case.
+
+Usage: python benchmarks/bench_api.py [--scale 0.1] [--iterations 20] [--db /tmp/bench_api.db]
+                                      [--only memes] [--output results.json] [--compare before.json]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+from sqlalchemy import func, insert  # noqa: E402
+
+from app import create_app  # noqa: E402
+from benchmarks.fake_upstream import start_fake_upstream  # noqa: E402
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from models import (  # noqa: E402
+    User, TemplateCategory, MemeTemplate, TemplateField, StickerCategory, Sticker,
+    Font, Meme, MemeLayer, MemeDraft
+)
+from pagination import encode_cursor  # noqa: E402
+import draft_codec  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VOLUMES = {
+    'templates': 100_000,
+    'memes': 1_000_000,
+    'drafts': 100_000,
+    'users': 1_000,
+    'stickers': 2_000,
+}
+FIELDS_PER_TEMPLATE = 2
+LAYERS_PER_MEME = 3
+BATCH = 20_000
+IMAGES = 8
+
+WORDS = [
+    'drake', 'hotline', 'bling', 'expanding', 'brain', 'distracted', 'boyfriend', 'woman',
+    'yelling', 'cat', 'change', 'my', 'mind', 'two', 'buttons', 'surprised', 'pikachu',
+    'success', 'kid', 'doge', 'roll', 'safe', 'guy', 'tapping', 'head', 'stonks', 'gru',
+]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def insert_batches(model, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH:
+            db.session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+    db.session.commit()
+
+
+def draft_data(rng, layers):
+    return {
+        'canvas': {'width': 600, 'height': 600, 'background': '#ffffff'},
+        'layers': [
+            {
+                'id': f'layer-{i}', 'type': 'text', 'text': ' '.join(rng.choices(WORDS, k=6)),
+                'x': rng.randint(0, 600), 'y': rng.randint(0, 600), 'fontSize': 32,
+                'fontFamily': 'Impact', 'fill': '#ffffff', 'stroke': '#000000', 'rotation': 0,
+            }
+            for i in range(layers)
+        ],
+    }
+
+
+def seed(volumes, images):
+    """Populate every table with synthetic rows using bulk inserts."""
+    rng = random.Random(0)
+    base = datetime(2024, 1, 1)
+
+    db.session.add_all([TemplateCategory(name=name) for name in ('Classic', 'Modern', 'Dank')])
+    db.session.add_all([StickerCategory(name=name) for name in ('Faces', 'Objects', 'Symbols')])
+    db.session.add_all([Font(name=name, file_path=f'fonts/{name}.ttf') for name in ('Impact', 'Arial', 'Comic')])
+    db.session.commit()
+
+    print(f'Seeding {volumes["users"]} users, {volumes["stickers"]} stickers...')
+    insert_batches(User, (
+        {'username': f'user{i}', 'email': f'user{i}@example.com', 'created_at': base}
+        for i in range(volumes['users'])
+    ))
+    insert_batches(Sticker, (
+        {'name': f'Sticker {i}', 'image_url': images[i % len(images)], 'category_id': i % 3 + 1}
+        for i in range(volumes['stickers'])
+    ))
+
+    print(f'Seeding {volumes["templates"]} templates with {FIELDS_PER_TEMPLATE} fields each...')
+    insert_batches(MemeTemplate, (
+        {
+            'name': f'{" ".join(rng.choices(WORDS, k=3)).title()} {i}',
+            'image_url': images[i % len(images)],
+            'category_id': i % 3 + 1,
+            'created_at': base + timedelta(seconds=i),
+        }
+        for i in range(volumes['templates'])
+    ))
+    insert_batches(TemplateField, (
+        {
+            'template_id': i // FIELDS_PER_TEMPLATE + 1, 'name': ('Top Text', 'Bottom Text')[i % 2],
+            'x_pos': 10, 'y_pos': 10 + 300 * (i % 2), 'width': 380, 'height': 80, 'default_color': '#FFFFFF',
+        }
+        for i in range(volumes['templates'] * FIELDS_PER_TEMPLATE)
+    ))
+
+    print(f'Seeding {volumes["memes"]} memes with {LAYERS_PER_MEME} layers each...')
+    insert_batches(Meme, (
+        {
+            'title': f'Meme {i}',
+            'user_id': rng.randint(1, volumes['users']),
+            'template_id': rng.randint(1, volumes['templates']),
+            'created_at': base + timedelta(seconds=i),
+        }
+        for i in range(volumes['memes'])
+    ))
+    insert_batches(MemeLayer, (
+        {
+            'meme_id': i // LAYERS_PER_MEME + 1, 'layer_type': 'text', 'content': f'Caption {i}',
+            'properties': {'x': 20, 'y': 20 + 120 * (i % LAYERS_PER_MEME), 'fontSize': 28, 'color': '#ffffff'},
+            'z_index': i % LAYERS_PER_MEME,
+        }
+        for i in range(volumes['memes'] * LAYERS_PER_MEME)
+    ))
+
+    print(f'Seeding {volumes["drafts"]} drafts...')
+
+    def draft_row(i):
+        blob = draft_codec.encode(draft_data(rng, rng.randint(2, 8)))
+        return {
+            'title': f'Draft {i}',
+            'user_id': rng.randint(1, volumes['users']),
+            'template_id': rng.randint(1, volumes['templates']),
+            'data_blob': blob,
+            'data_size': len(blob),
+            'created_at': base + timedelta(seconds=i),
+            'updated_at': base + timedelta(seconds=i),
+        }
+
+    insert_batches(MemeDraft, (draft_row(i) for i in range(volumes['drafts'])))
+
+
+def make_images(static_folder):
+    """Small template/sticker source images served from a throwaway static folder."""
+    os.makedirs(os.path.join(static_folder, 'bench'), exist_ok=True)
+    sources = []
+    for i in range(IMAGES):
+        name = f'bench/template{i}.png'
+        path = os.path.join(static_folder, name)
+        if not os.path.exists(path):
+            Image.new('RGB', (800, 600), (30 * i % 255, 90, 160)).save(path)
+        sources.append('/' + name)
+    return sources
+
+
+def build_cases(volumes, rng):
+    """Every endpoint as (name, method, path(i), body(i)); any 4xx/5xx response counts as an error."""
+    templates, memes, drafts = volumes['templates'], volumes['memes'], volumes['drafts']
+    mid = datetime(2024, 1, 1) + timedelta(seconds=memes // 2)
+    mid_template = datetime(2024, 1, 1) + timedelta(seconds=templates // 2)
+    large_blob = draft_data(rng, 400)
+    many_layers = [
+        {'layer_type': 'text', 'content': f'Layer {n}', 'properties': {'x': n, 'y': n, 'fontSize': 24}, 'z_index': n}
+        for n in range(100)
+    ]
+
+    def pick(count):
+        return lambda i: rng.randint(1, count)
+
+    return [
+        ('templates_first_page', 'GET', lambda i: '/api/v1/templates?per_page=20', None),
+        ('templates_deep_offset', 'GET', lambda i: f'/api/v1/templates?per_page=20&page={templates // 40}', None),
+        ('templates_deep_cursor', 'GET',
+         lambda i: f'/api/v1/templates?per_page=20&cursor={encode_cursor(mid_template, templates // 2)}', None),
+        ('templates_category', 'GET', lambda i: '/api/v1/templates?per_page=20&category_id=2', None),
+        ('templates_search', 'GET', lambda i: f'/api/v1/templates?search={rng.choice(WORDS)}', None),
+        ('templates_search_typo', 'GET', lambda i: '/api/v1/templates?search=pikahcu', None),
+        ('template_detail', 'GET', lambda i: f'/api/v1/templates/{pick(templates)(i)}', None),
+        ('template_image_variant', 'GET', lambda i: f'/api/v1/templates/{i % IMAGES + 1}/image?w=200', None),
+        ('stickers', 'GET', lambda i: '/api/v1/stickers', None),
+        ('sticker_image_variant', 'GET', lambda i: f'/api/v1/stickers/{i % IMAGES + 1}/image?w=100', None),
+        ('fonts', 'GET', lambda i: '/api/v1/fonts', None),
+        ('asset_categories', 'GET', lambda i: '/api/v1/assets/categories', None),
+        ('trending', 'GET', lambda i: '/api/v1/trending', None),
+        ('gifs', 'GET', lambda i: f'/api/v1/gifs?query={rng.choice(WORDS)}&offset={i % 4 * 25}&limit=25', None),
+        ('stats_cache', 'GET', lambda i: '/api/v1/stats/cache', None),
+        ('stats_http', 'GET', lambda i: '/api/v1/stats/http', None),
+        ('memes_first_page', 'GET', lambda i: '/api/v1/memes?per_page=20', None),
+        ('memes_deep_offset', 'GET', lambda i: f'/api/v1/memes?per_page=20&page={memes // 40}', None),
+        ('memes_deep_cursor', 'GET',
+         lambda i: f'/api/v1/memes?per_page=20&cursor={encode_cursor(mid, memes // 2)}', None),
+        ('meme_detail', 'GET', lambda i: f'/api/v1/memes/{pick(memes)(i)}', None),
+        ('meme_create_100_layers', 'POST', lambda i: '/api/v1/memes',
+         lambda i: {'title': f'Bench {i}', 'template_id': 1, 'layers': many_layers}),
+        ('meme_render', 'POST', lambda i: '/api/v1/memes/render',
+         lambda i: {'meme_id': rng.randint(1, memes), 'format': 'webp'}),
+        ('drafts_first_page', 'GET', lambda i: '/api/v1/memes/drafts?per_page=20', None),
+        ('drafts_deep_offset', 'GET', lambda i: f'/api/v1/memes/drafts?per_page=20&page={drafts // 40}', None),
+        ('drafts_by_user', 'GET', lambda i: f'/api/v1/memes/drafts?user_id={i % 50 + 1}', None),
+        ('draft_detail', 'GET', lambda i: f'/api/v1/memes/draft/{pick(drafts)(i)}', None),
+        ('draft_create', 'POST', lambda i: '/api/v1/memes/draft',
+         lambda i: {'title': f'New {i}', 'data': draft_data(rng, 6)}),
+        ('draft_update_large_blob', 'PUT', lambda i: f'/api/v1/memes/draft/{pick(drafts)(i)}',
+         lambda i: {'title': f'Edited {i}', 'data': large_blob}),
+        ('draft_delete', 'DELETE', lambda i: f'/api/v1/memes/draft/{drafts - i}', None),
+    ]
+
+
+def run_case(client, method, path, body, iterations):
+    timings = []
+    errors = 0
+    # One untimed call warms caches the way a live worker would be
+    for i in range(-1, iterations):
+        kwargs = {'json': body(i)} if body else {}
+        start = time.perf_counter()
+        response = client.open(path(i), method=method, **kwargs)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            errors += 1
+        if i >= 0:
+            timings.append(elapsed)
+    timings.sort()
+    mean = statistics.mean(timings)
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'min_ms': round(timings[0] * 1000, 3),
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'mean_ms': round(mean * 1000, 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'ops_per_sec': round(1 / mean, 1) if mean else None,
+    }
+
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = json.load(f)['cases']
+    print(f'\nMedian change vs {previous_path}:')
+    for name, stats in results.items():
+        before = previous.get(name)
+        if not before:
+            continue
+        change = (stats['median_ms'] - before['median_ms']) / before['median_ms'] * 100 if before['median_ms'] else 0
+        print(f'  {name:<28} {before["median_ms"]:>10.2f} -> {stats["median_ms"]:>10.2f} ms  ({change:+.1f}%)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier applied to every seeded volume.')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--db', help='SQLite file to seed once and reuse (default: a temporary file).')
+    parser.add_argument('--only', help='Run only cases whose name contains this string.')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/api-<commit>.json).')
+    parser.add_argument('--compare', help='Earlier results file to diff medians against.')
+    args = parser.parse_args()
+
+    volumes = {name: max(10, int(count * args.scale)) for name, count in VOLUMES.items()}
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, 'bench_api.db')
+    static_folder = os.path.join(os.path.dirname(db_path), 'bench_static')
+
+    upstream = start_fake_upstream(posts=25, seed=0)
+    Config.REDDIT_API_URL = Config.GIPHY_API_URL = upstream.base_url
+    Config.GIPHY_API_KEY = Config.GIPHY_API_KEY or 'fake'
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        REDIS_URL = None
+        TRENDING_INCLUDE_GIPHY = True
+        ASSET_STORE_DIR = os.path.join(workdir, 'assets')
+        RENDER_CACHE_DIR = os.path.join(workdir, 'renders')
+
+    app = create_app(BenchConfig)
+    app.static_folder = static_folder
+    images = make_images(static_folder)
+
+    with app.app_context():
+        db.create_all()
+        if db.session.query(func.count(Meme.id)).scalar() == 0:
+            started = time.perf_counter()
+            seed(volumes, images)
+            print(f'Seeded in {time.perf_counter() - started:.0f}s')
+        else:
+            volumes.update({
+                'templates': db.session.query(func.count(MemeTemplate.id)).scalar(),
+                'memes': db.session.query(func.count(Meme.id)).scalar(),
+                'drafts': db.session.query(func.count(MemeDraft.id)).scalar(),
+            })
+            print(f'Reusing {db_path}: {volumes}')
+        db.session.remove()
+
+    rng = random.Random(1)
+    client = app.test_client()
+    results = {}
+    print(f'{"case":<28} {"median ms":>10} {"p95 ms":>10} {"ops/s":>9} {"errors":>7}')
+    for name, method, path, body in build_cases(volumes, rng):
+        if args.only and args.only not in name:
+            continue
+        stats = run_case(client, method, path, body, args.iterations)
+        results[name] = stats
+        print(f'{name:<28} {stats["median_ms"]:>10.2f} {stats["p95_ms"]:>10.2f} '
+              f'{stats["ops_per_sec"]:>9} {stats["errors"]:>7}')
+
+    commit = git_commit()
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f'api-{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'created_at': datetime.utcnow().isoformat(),
+            'python': sys.version.split()[0],
+            'sqlite': sqlite3.sqlite_version,
+            'volumes': volumes,
+            'iterations': args.iterations,
+            'cases': results,
+        }, f, indent=2)
+    print(f'Wrote {output}')
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
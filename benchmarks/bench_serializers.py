@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""Per-item cost of the list-endpoint serializers: marshmallow + json vs column rows + orjson.
+
+For templates, stickers, memes (with layers) and drafts, times a page of items
+through the old path (ORM query, schema dump, Flask's default JSON provider)
+and the new one (column-tuple query, precompiled serializer, orjson provider),
+both including the query, and reports microseconds per item.
+
+Usage: python benchmarks/bench_serializers.py [--items 200] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from sqlalchemy.orm import joinedload, selectinload  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from json_provider import OrjsonProvider  # noqa: E402
+from models import (  # noqa: E402
+    MemeTemplate, TemplateCategory, Sticker, StickerCategory, Meme, MemeLayer, MemeDraft
+)
+from schemas import TemplateSchema, StickerSchema, MemeSchema  # noqa: E402
+import serializers  # noqa: E402
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+
+
+def seed(items):
+    db.session.add_all([TemplateCategory(name='Classic'), StickerCategory(name='Faces')])
+    db.session.flush()
+    for i in range(items):
+        db.session.add(MemeTemplate(name=f'Template {i}', image_url=f'https://example.com/{i}.jpg', category_id=1))
+        db.session.add(Sticker(name=f'Sticker {i}', image_url=f'stickers/{i}.png', category_id=1))
+        db.session.add(MemeDraft(title=f'Draft {i}', data={'layers': [{'text': 'x'}] * 5}))
+        db.session.add(Meme(title=f'Meme {i}', image_url=f'https://example.com/m{i}.jpg', template_id=1, layers=[
+            MemeLayer(layer_type='text', content=f'Caption {n}', properties={'x': 20, 'y': 40 * n, 'fontSize': 28},
+                      z_index=n)
+            for n in range(3)
+        ]))
+    db.session.commit()
+
+
+def old_drafts(query):
+    return [
+        {'id': d.id, 'title': d.title, 'created_at': d.created_at.isoformat(), 'updated_at': d.updated_at.isoformat()}
+        for d in query
+    ]
+
+
+def cases():
+    """name -> (before, after); each returns the response body for one page."""
+    return {
+        'templates': (
+            lambda: TemplateSchema(many=True).dump(MemeTemplate.query.options(joinedload(MemeTemplate.category)).all()),
+            lambda: list(map(serializers.template_serializer(), serializers.template_rows().all())),
+        ),
+        'stickers': (
+            lambda: StickerSchema(many=True).dump(Sticker.query.options(joinedload(Sticker.category)).all()),
+            lambda: list(map(serializers.sticker_serializer(), serializers.sticker_rows().all())),
+        ),
+        'memes': (
+            lambda: MemeSchema(many=True).dump(Meme.query.options(selectinload(Meme.layers)).all()),
+            lambda: serializers.serialize_memes(serializers.meme_rows().all()),
+        ),
+        'drafts': (
+            lambda: old_drafts(MemeDraft.query.all()),
+            lambda: list(map(serializers.serialize_draft, serializers.draft_rows().all())),
+        ),
+    }
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=200, help='Rows per list (one page).')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app(BenchConfig)
+    default_json, fast_json = DefaultJSONProvider(app), OrjsonProvider(app)
+    with app.test_request_context('/'):
+        db.create_all()
+        seed(args.items)
+
+        print(f'{"list":<10} {"before us/item":>15} {"after us/item":>14} {"speedup":>8}')
+        for name, (before, after) in cases().items():
+            if default_json.response(before()).data != fast_json.response(after()).data:
+                print(f'{name}: output differs!')
+            old = best_of(args.repeat, lambda: default_json.response(before()))
+            new = best_of(args.repeat, lambda: fast_json.response(after()))
+            print(f'{name:<10} {old / args.items * 1e6:>15.1f} {new / args.items * 1e6:>14.1f} {old / new:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
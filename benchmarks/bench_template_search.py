@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Benchmark template search: ILIKE scan vs the indexed search backend.
+
+Seeds a throwaway SQLite database (or DATABASE_URL if given) with N templates
+and times one search page (10 rows + total) per query term.
+
+Usage: python benchmarks/bench_template_search.py [--templates 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from models import MemeTemplate  # noqa: E402
+from search import search_templates  # noqa: E402
+
+WORDS = [
+    'drake', 'hotline', 'bling', 'expanding', 'brain', 'distracted', 'boyfriend', 'woman',
+    'yelling', 'cat', 'change', 'my', 'mind', 'two', 'buttons', 'surprised', 'pikachu',
+    'success', 'kid', 'doge', 'roll', 'safe', 'guy', 'tapping', 'head', 'stonks', 'gru',
+    'plan', 'panik', 'kalm', 'always', 'has', 'been', 'monkey', 'puppet', 'spongebob',
+]
+
+TERMS = ['drake', 'pikachu', 'brain', 'ex', 'surprized pikachu', 'zzzz']
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--templates', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{tmpdir}/bench.db'
+        REDIS_URL = None
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        rng = random.Random(0)
+        # A large synthetic vocabulary keeps hit rates realistic; the known
+        # meme words are mixed in so the sample terms have matches
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        vocabulary = WORDS + [
+            ''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(20000)
+        ]
+        print(f'Seeding {args.templates} templates...')
+        batch = []
+        for i in range(args.templates):
+            name = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(2, 4))).title()
+            batch.append({'name': f'{name} {i}', 'image_url': f'https://example.com/{i}.jpg'})
+            if len(batch) == 10000:
+                db.session.execute(insert(MemeTemplate), batch)
+                batch = []
+        if batch:
+            db.session.execute(insert(MemeTemplate), batch)
+        db.session.commit()
+
+        print(f'{"term":<20} {"ilike ms":>10} {"indexed ms":>11} {"hits":>8}')
+        for term in TERMS:
+            def ilike():
+                query = MemeTemplate.query.filter(MemeTemplate.name.ilike(f'%{term}%'))
+                query.limit(10).all()
+                return query.count()
+
+            def indexed():
+                query = search_templates(MemeTemplate.query, term)
+                query.limit(10).all()
+                return query.order_by(None).count()
+
+            hits = indexed()
+            ilike_ms = best_of(args.repeat, ilike) * 1000
+            indexed_ms = best_of(args.repeat, indexed) * 1000
+            print(f'{term:<20} {ilike_ms:>10.1f} {indexed_ms:>11.1f} {hits:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""Local stand-in for the Reddit and Giphy APIs, serving recorded fixtures.
+
+Point the app at it with REDDIT_API_URL / GIPHY_API_URL (and any non-empty
+GIPHY_API_KEY). Latency, error rate and payload size are configurable so
+caching and concurrency changes can be measured without live network.
+
+Usage: python benchmarks/fake_upstream.py [--port 8900] [--latency 150] [--jitter 50]
+                                          [--error-rate 0.02] [--posts 25]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+
+def expand(items, count, rewrite):
+    """Repeat fixture items until there are ``count``, giving each copy unique ids/URLs."""
+    expanded = []
+    for i in range(count):
+        item = copy.deepcopy(items[i % len(items)])
+        rewrite(item, i)
+        expanded.append(item)
+    return expanded
+
+
+def _rewrite_post(post, i):
+    data = post['data']
+    data['id'] = f"{data['id']}{i}"
+    stem, ext = data['url'].rsplit('.', 1)
+    data['url'] = f'{stem}{i}.{ext}'
+    data['score'] = max(1, data['score'] - i * 37)
+
+
+def _rewrite_gif(gif, i):
+    gif['id'] = f"{gif['id']}{i}"
+    for image in gif['images'].values():
+        image['url'] = image['url'].replace('/media/', f'/media/{i}/')
+
+
+class UpstreamState:
+    """Fixture payloads plus the behaviour knobs shared by every handler thread."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, posts=25, seed=None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        reddit = load_fixture('reddit_hot.json')
+        giphy = load_fixture('giphy_search.json')
+        self.reddit = reddit
+        self.posts = expand(reddit['data']['children'], posts, _rewrite_post)
+        self.giphy = giphy
+        self.total_gifs = giphy['pagination']['total_count']
+        self.gifs = expand(giphy['data'], max(posts, 50), _rewrite_gif)
+
+    def delay_and_fail(self):
+        with self.lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(delay)
+        return failed
+
+    def reddit_hot(self, subreddit, limit):
+        posts = copy.deepcopy(self.posts[:limit])
+        for post in posts:
+            post['data']['subreddit'] = subreddit
+        body = copy.copy(self.reddit)
+        body['data'] = dict(self.reddit['data'], children=posts, dist=len(posts))
+        return body
+
+    def giphy_page(self, limit, offset):
+        # Results cycle through the fixture so any offset has data up to total_count
+        end = min(offset + limit, self.total_gifs)
+        data = [self.gifs[i % len(self.gifs)] for i in range(offset, end)]
+        return dict(self.giphy, data=data, pagination={'total_count': self.total_gifs, 'count': len(data), 'offset': offset})
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        state = self.server.state
+        parts = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        segments = [segment for segment in parts.path.split('/') if segment]
+
+        if state.delay_and_fail():
+            return self.send_json({'message': 'Simulated upstream failure'}, 503)
+
+        limit = int(params.get('limit', 25))
+        if len(segments) == 3 and segments[0] == 'r' and segments[2] == 'hot':
+            return self.send_json(state.reddit_hot(segments[1], limit))
+        if segments[:2] == ['v1', 'gifs'] and segments[2:] in (['search'], ['trending']):
+            if 'api_key' not in params:
+                return self.send_json({'message': 'No API key found in request'}, 401)
+            return self.send_json(state.giphy_page(limit, int(params.get('offset', 0))))
+        self.send_json({'message': 'Not found'}, 404)
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_upstream(port=0, **options):
+    """Start the server in a daemon thread; returns it (base URL via server.base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), UpstreamHandler)
+    server.daemon_threads = True
+    server.state = UpstreamState(**options)
+    server.base_url = f'http://127.0.0.1:{server.server_port}'
+    threading.Thread(target=server.serve_forever, name='fake-upstream', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=150.0, help='Mean response delay in ms.')
+    parser.add_argument('--jitter', type=float, default=50.0, help='Uniform +/- delay in ms.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503.')
+    parser.add_argument('--posts', type=int, default=25, help='Posts per Reddit listing (payload size).')
+    args = parser.parse_args()
+
+    server = start_fake_upstream(
+        args.port, latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate, posts=args.posts
+    )
+    print(f'Fake Reddit/Giphy listening on {server.base_url}')
+    print(f'  REDDIT_API_URL={server.base_url} GIPHY_API_URL={server.base_url} GIPHY_API_KEY=fake')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        state = server.state
+        print(f'Served {state.requests} requests ({state.errors} simulated errors)')
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
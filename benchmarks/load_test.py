@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""Open-loop load test for the upstream-backed endpoints.
+
+Sends requests at a fixed target rate (independent of how fast responses
+come back) and reports p50/p95/p99 latency, error count and throughput per
+endpoint. Latency is measured from each request's scheduled send time, so
+queueing inside the client counts against the server instead of hiding it.
+
+By default the app and benchmarks/fake_upstream.py are started in-process on
+free ports; pass --base-url to drive an already running deployment instead.
+
+Usage: python benchmarks/load_test.py [--rps 50] [--duration 20] [--concurrency 64]
+                                      [--upstream-latency 150] [--upstream-error-rate 0.02]
+                                      [--base-url http://127.0.0.1:5000] [--json results.json]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_upstream import start_fake_upstream  # noqa: E402
+
+DEFAULT_ENDPOINTS = [
+    '/api/v1/trending',
+    '/api/v1/gifs?query=cat',
+    '/api/v1/gifs?query=Dog&offset=0&limit=30',
+    '/memes',
+]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def start_app(upstream_url):
+    """Run the Flask app in a background thread against the fake upstream."""
+    os.environ['REDDIT_API_URL'] = upstream_url
+    os.environ['GIPHY_API_URL'] = upstream_url
+    os.environ.setdefault('GIPHY_API_KEY', 'fake')
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{tempfile.mkdtemp()}/load.db')
+
+    from werkzeug.serving import make_server
+    from app import create_app
+    from config import Config
+
+    class LoadTestConfig(Config):
+        # Only use Redis when one is explicitly configured
+        REDIS_URL = os.environ.get('REDIS_URL')
+
+    app = create_app(LoadTestConfig)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='app', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def run_load(base_url, endpoints, rps, duration, concurrency, timeout):
+    sessions = threading.local()
+    results = {endpoint: [] for endpoint in endpoints}
+    lock = threading.Lock()
+
+    def send(endpoint, scheduled):
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        session = getattr(sessions, 'session', None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        try:
+            ok = session.get(base_url + endpoint, timeout=timeout).status_code < 400
+        except requests.RequestException:
+            ok = False
+        latency = time.perf_counter() - scheduled
+        with lock:
+            results[endpoint].append((latency, ok))
+
+    total = int(rps * duration)
+    start = time.perf_counter() + 0.1
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            pool.submit(send, endpoints[i % len(endpoints)], start + i / rps)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def summarize(results, elapsed):
+    summary = {}
+    for endpoint, samples in results.items():
+        latencies = sorted(latency for latency, _ in samples)
+        summary[endpoint] = {
+            'requests': len(samples),
+            'errors': sum(1 for _, ok in samples if not ok),
+            'throughput_rps': round(len(samples) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', help='Drive a running app instead of starting one in-process.')
+    parser.add_argument('--endpoint', action='append', dest='endpoints',
+                        help='Path to request (repeatable); defaults to trending, gifs and /memes.')
+    parser.add_argument('--rps', type=float, default=50.0, help='Target requests per second across all endpoints.')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds of load.')
+    parser.add_argument('--concurrency', type=int, default=64, help='Maximum requests in flight.')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--upstream-latency', type=float, default=150.0, help='Fake upstream mean delay in ms.')
+    parser.add_argument('--upstream-jitter', type=float, default=50.0)
+    parser.add_argument('--upstream-error-rate', type=float, default=0.0)
+    parser.add_argument('--upstream-posts', type=int, default=25)
+    parser.add_argument('--json', help='Also write the results to this file.')
+    args = parser.parse_args()
+
+    endpoints = args.endpoints or DEFAULT_ENDPOINTS
+    upstream = None
+    base_url = args.base_url
+    if not base_url:
+        upstream = start_fake_upstream(
+            latency_ms=args.upstream_latency, jitter_ms=args.upstream_jitter,
+            error_rate=args.upstream_error_rate, posts=args.upstream_posts, seed=0
+        )
+        _, base_url = start_app(upstream.base_url)
+        print(f'App at {base_url}, fake upstream at {upstream.base_url}')
+
+    print(f'{args.rps:g} rps for {args.duration:g}s over {len(endpoints)} endpoints...')
+    results, elapsed = run_load(base_url, endpoints, args.rps, args.duration, args.concurrency, args.timeout)
+    summary = summarize(results, elapsed)
+
+    print(f'{"endpoint":<45} {"reqs":>6} {"errs":>5} {"rps":>7} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for endpoint, row in summary.items():
+        print(f'{endpoint:<45} {row["requests"]:>6} {row["errors"]:>5} {row["throughput_rps"]:>7} '
+              f'{row["p50_ms"]:>8} {row["p95_ms"]:>8} {row["p99_ms"]:>8}')
+    if upstream is not None:
+        print(f'Upstream served {upstream.state.requests} requests ({upstream.state.errors} simulated errors)')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'rps': args.rps,
+                'duration': args.duration,
+                'upstream_requests': upstream.state.requests if upstream else None,
+                'endpoints': summary,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,12 @@
 # Build script for frontend integration
+import argparse
 import os
 import subprocess
 import shutil
 from pathlib import Path
 
+from services.static_assets import precompress_static
+
 def build_frontend():
     """Build the React frontend and copy to Flask static directory"""
     frontend_dir = Path(__file__).parent / 'frontend'
@@ -45,5 +48,20 @@ def build_frontend():
     else:
         raise Exception("Frontend build directory not found")
 
+    compress_static(static_dir)
+
+def compress_static(static_dir):
+    """Write .br/.gz siblings and the asset manifest the static routes serve from"""
+    manifest = precompress_static(str(static_dir))
+    variants = sum(len(entry['encodings']) for entry in manifest.values())
+    print(f"Precompressed {variants} variants for {len(manifest)} static files")
+
 if __name__ == '__main__':
-    build_frontend()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Build the frontend into static/')
+    parser.add_argument('--compress-only', action='store_true',
+                        help='Only precompress the existing static/ build and rewrite its manifest.')
+    args = parser.parse_args()
+    if args.compress_only:
+        compress_static(Path(__file__).parent / 'static')
+    else:
+        build_frontend()
@@ -0,0 +1,401 @@
+import csv
+import io
+import json
+import re
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.exc import DataError, IntegrityError
+
+from extensions import db
+from models import Font, MemeTemplate, Sticker, StickerCategory, TemplateCategory, TemplateField
+from services.catalog_cache import bump_catalog_version
+
+
+DEFAULT_BATCH_SIZE = 5000
+# Only the first errors are kept so a bad file cannot grow memory
+MAX_REPORTED_ERRORS = 100
+
+# type -> (model, category model, columns written besides name)
+RECORD_TYPES = {
+    'template': (MemeTemplate, TemplateCategory, ('image_url', 'category_id')),
+    'sticker': (Sticker, StickerCategory, ('image_url', 'category_id')),
+    'font': (Font, None, ('file_path',)),
+}
+
+FIELD_COLUMNS = ('name', 'x_pos', 'y_pos', 'width', 'height', 'default_font_id', 'default_color')
+FIELD_INT_COLUMNS = ('x_pos', 'y_pos', 'width', 'height', 'default_font_id')
+# Largest value a 32-bit INTEGER column accepts
+MAX_INT = 2 ** 31 - 1
+COLOR_RE = re.compile(r'^#[0-9A-Fa-f]{6}$')
+
+# Unquoted NULL marker for COPY; strings are always quoted, so a literal \N stays text
+COPY_NULL = '\\N'
+
+
+class CatalogImportError(Exception):
+    """Raised when an input row cannot be imported."""
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, record) pairs from CSV or JSONL without loading the whole file."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = {'_error': f'invalid JSON: {e}'}
+        yield line_no, record if isinstance(record, dict) else {'_error': 'expected a JSON object'}
+
+
+def _text(record: Dict[str, Any], key: str, max_length: int) -> Optional[str]:
+    value = record.get(key)
+    if value is None:
+        return None
+    if isinstance(value, (dict, list, bool)):
+        raise CatalogImportError(f'{key} must be text')
+    value = str(value).strip()
+    if len(value) > max_length:
+        raise CatalogImportError(f'{key} is longer than {max_length} characters')
+    return value or None
+
+
+def _template_fields(value: Any) -> Optional[List[Dict[str, Any]]]:
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            raise CatalogImportError('fields is not valid JSON')
+    if not isinstance(value, list) or not all(isinstance(field, dict) for field in value):
+        raise CatalogImportError('fields must be a list of objects')
+    return [_template_field(position, field) for position, field in enumerate(value)]
+
+
+def _template_field(position: int, field: Dict[str, Any]) -> Dict[str, Any]:
+    """Check one field's types so the database never sees a value it would reject."""
+    row = {column: field.get(column) for column in FIELD_COLUMNS}
+    name = row['name']
+    if name is not None and (not isinstance(name, str) or len(name) > 64):
+        raise CatalogImportError(f'fields[{position}].name must be text of at most 64 characters')
+    for column in FIELD_INT_COLUMNS:
+        value = row[column]
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or abs(value) > MAX_INT):
+            raise CatalogImportError(f'fields[{position}].{column} must be an integer')
+    if row['default_font_id'] is not None and row['default_font_id'] < 1:
+        raise CatalogImportError(f'fields[{position}].default_font_id must be a font id')
+    color = row['default_color']
+    if color is None:
+        row['default_color'] = '#FFFFFF'
+    elif not isinstance(color, str) or not COLOR_RE.match(color):
+        raise CatalogImportError(f'fields[{position}].default_color must look like #RRGGBB')
+    return row
+
+
+def normalize_record(record: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Validate one input record and return (type, row) ready for the database."""
+    if '_error' in record:
+        raise CatalogImportError(record['_error'])
+
+    kind = (record.get('type') or 'template').strip().lower()
+    if kind not in RECORD_TYPES:
+        raise CatalogImportError(f'unknown type {kind!r}')
+    model = RECORD_TYPES[kind][0]
+
+    name = _text(record, 'name', model.name.type.length)
+    if not name:
+        raise CatalogImportError('name is required')
+
+    row: Dict[str, Any] = {'name': name}
+    if kind == 'font':
+        row['file_path'] = _text(record, 'file_path', 256)
+    else:
+        row['image_url'] = _text(record, 'image_url', 256)
+        row['category'] = _text(record, 'category', 64)
+    if kind == 'template':
+        row['fields'] = _template_fields(record.get('fields'))
+    return kind, row
+
+
+class CatalogImporter:
+    """Batched, idempotent upsert of templates, stickers and fonts keyed by name."""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.categories: Dict[Any, Dict[str, int]] = {TemplateCategory: {}, StickerCategory: {}}
+        self.stats = {'rows': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        self.errors: List[str] = []
+        self.fonts: Optional[set] = None
+        self.use_copy = db.session.get_bind().dialect.name == 'postgresql'
+
+    def run(self, records: Iterator[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+
+        if self.stats['inserted'] or self.stats['updated']:
+            # Core statements bypass the session events that normally do this
+            bump_catalog_version()
+
+        elapsed = time.perf_counter() - started
+        return dict(self.stats, seconds=elapsed, rows_per_second=self.stats['rows'] / elapsed if elapsed else 0.0)
+
+    def import_batch(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        grouped: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind in RECORD_TYPES}
+        for line_no, record in batch:
+            self.stats['rows'] += 1
+            try:
+                kind, row = normalize_record(record)
+            except CatalogImportError as e:
+                self.skip(line_no, e)
+                continue
+            # Later rows for the same name win, as they would across batches
+            row['line'] = line_no
+            grouped[kind][row['name']] = row
+
+        snapshot = self.snapshot()
+        try:
+            self.write(grouped)
+            db.session.commit()
+            return
+        except (IntegrityError, DataError):
+            db.session.rollback()
+            self.reset(snapshot)
+
+        # Something slipped past validation: redo the batch row by row to report the culprits
+        for kind, rows in grouped.items():
+            for row in rows.values():
+                snapshot = self.snapshot()
+                savepoint = db.session.begin_nested()
+                try:
+                    self.write({kind: {row['name']: row}})
+                    savepoint.commit()
+                except (IntegrityError, DataError) as e:
+                    savepoint.rollback()
+                    self.reset(snapshot)
+                    self.skip(row['line'], f'rejected by the database: {e.orig}')
+        db.session.commit()
+
+    def write(self, grouped: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        # Fonts first, so templates in the same batch can reference them
+        for kind, rows in sorted(grouped.items(), key=lambda item: item[0] != 'font'):
+            if rows:
+                self.upsert(kind, list(rows.values()))
+
+    def skip(self, line_no: int, error: Any) -> None:
+        self.stats['skipped'] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f'line {line_no}: {error}')
+
+    def snapshot(self) -> Tuple[Dict[str, int], int]:
+        return dict(self.stats), len(self.errors)
+
+    def reset(self, snapshot: Tuple[Dict[str, int], int]) -> None:
+        """Undo the counts, reports and cached ids of writes that were rolled back."""
+        stats, errors = snapshot
+        self.stats.update(stats)
+        del self.errors[errors:]
+        for cache in self.categories.values():
+            cache.clear()
+        self.fonts = None
+
+    def resolve_categories(self, category_model, names) -> Dict[str, int]:
+        """Map category names to ids, creating missing categories; cached for the whole run."""
+        cache = self.categories[category_model]
+        missing = {name for name in names if name and name not in cache}
+        if missing:
+            table = category_model.__table__
+            found = db.session.execute(select(table.c.name, table.c.id).where(table.c.name.in_(missing)))
+            cache.update(dict(found.all()))
+            new = [{'name': name} for name in missing if name not in cache]
+            if new:
+                db.session.execute(insert(table), new)
+                found = db.session.execute(
+                    select(table.c.name, table.c.id).where(table.c.name.in_([row['name'] for row in new]))
+                )
+                cache.update(dict(found.all()))
+        return cache
+
+    def known_fonts(self, ids) -> set:
+        """The subset of ``ids`` that are existing fonts; known ids are cached for the run."""
+        if self.fonts is None:
+            self.fonts = set()
+        missing = set(ids) - self.fonts
+        if missing:
+            table = Font.__table__
+            self.fonts.update(db.session.execute(select(table.c.id).where(table.c.id.in_(missing))).scalars())
+        return self.fonts & set(ids)
+
+    def check_font_references(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop (and report) templates whose fields point at fonts that do not exist."""
+        wanted = {field['default_font_id'] for row in rows for field in row['fields'] or ()} - {None}
+        known = self.known_fonts(wanted) if wanted else set()
+        valid = []
+        for row in rows:
+            unknown = sorted({field['default_font_id'] for field in row['fields'] or ()} - known - {None})
+            if unknown:
+                self.skip(row['line'], f'fields reference unknown font ids {unknown}')
+            else:
+                valid.append(row)
+        return valid
+
+    def upsert(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        model, category_model, columns = RECORD_TYPES[kind]
+        table = model.__table__
+
+        if kind == 'template':
+            rows = self.check_font_references(rows)
+            if not rows:
+                return
+
+        if category_model is not None:
+            category_ids = self.resolve_categories(category_model, {row['category'] for row in rows})
+            for row in rows:
+                row['category_id'] = category_ids.get(row['category'])
+
+        # Names are not unique for templates/stickers; the oldest row is the one updated
+        names = [row['name'] for row in rows]
+        first_ids = select(func.min(table.c.id)).where(table.c.name.in_(names)).group_by(table.c.name)
+        existing = {
+            row.name: row
+            for row in db.session.execute(select(table).where(table.c.id.in_(first_ids)))
+        }
+
+        changed_fields = set()
+        if kind == 'template':
+            changed_fields = self.changed_fields(
+                [row for row in rows if row['fields'] is not None and row['name'] in existing],
+                {name: current.id for name, current in existing.items()}
+            )
+
+        inserts, updates, fields_only = [], [], 0
+        for row in rows:
+            values = {column: row[column] for column in columns}
+            current = existing.get(row['name'])
+            if current is None:
+                inserts.append(dict(values, name=row['name']))
+            elif any(getattr(current, column) != value for column, value in values.items()):
+                updates.append(dict(values, _id=current.id))
+            elif row['name'] in changed_fields:
+                fields_only += 1
+            else:
+                self.stats['unchanged'] += 1
+
+        if updates:
+            db.session.execute(
+                update(table).where(table.c.id == bindparam('_id')).values({c: bindparam(c) for c in columns}),
+                updates
+            )
+        if inserts:
+            if self.use_copy:
+                self.copy_rows(table, inserts)
+            else:
+                db.session.execute(insert(table), inserts)
+        self.stats['updated'] += len(updates) + fields_only
+        self.stats['inserted'] += len(inserts)
+
+        if kind == 'template':
+            self.replace_fields(table, [
+                row for row in rows
+                if row['fields'] is not None and (row['name'] not in existing or row['name'] in changed_fields)
+            ])
+
+    def changed_fields(self, rows: List[Dict[str, Any]], ids: Dict[str, int]) -> set:
+        """Names of existing templates whose stored fields differ from the imported ones."""
+        if not rows:
+            return set()
+        fields_table = TemplateField.__table__
+        stored: Dict[int, List[tuple]] = {}
+        result = db.session.execute(
+            select(fields_table.c.template_id, *(fields_table.c[column] for column in FIELD_COLUMNS))
+            .where(fields_table.c.template_id.in_([ids[row['name']] for row in rows]))
+            .order_by(fields_table.c.id)
+        )
+        for template_id, *values in result:
+            stored.setdefault(template_id, []).append(tuple(values))
+        return {
+            row['name'] for row in rows
+            if stored.get(ids[row['name']], []) != [tuple(field[c] for c in FIELD_COLUMNS) for field in row['fields']]
+        }
+
+    def replace_fields(self, table, rows: List[Dict[str, Any]]) -> None:
+        """Make each listed template's fields exactly the imported ones."""
+        if not rows:
+            return
+        ids = dict(db.session.execute(
+            select(table.c.name, func.min(table.c.id)).where(table.c.name.in_([row['name'] for row in rows]))
+            .group_by(table.c.name)
+        ).all())
+        fields_table = TemplateField.__table__
+        db.session.execute(delete(fields_table).where(fields_table.c.template_id.in_(ids.values())))
+        new_fields = [
+            dict(field, template_id=ids[row['name']])
+            for row in rows for field in row['fields']
+        ]
+        if new_fields:
+            db.session.execute(insert(fields_table), new_fields)
+
+    def copy_rows(self, table, rows: List[Dict[str, Any]]) -> None:
+        """Insert through Postgres COPY, falling back to executemany for other drivers."""
+        columns = list(rows[0].keys())
+        if 'created_at' in table.c:
+            now = datetime.utcnow()
+            columns.append('created_at')
+            rows = [dict(row, created_at=now) for row in rows]
+
+        raw = db.session.connection().connection.driver_connection
+        with raw.cursor() as cursor:
+            if not hasattr(cursor, 'copy_expert'):
+                db.session.execute(insert(table), rows)
+                return
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                copy_buffer(columns, rows)
+            )
+
+
+def _copy_field(value: Any) -> str:
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, datetime):
+        value = value.isoformat(sep=' ')
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_buffer(columns: List[str], rows: List[Dict[str, Any]]) -> io.StringIO:
+    """CSV for COPY ... (FORMAT csv, NULL '\\N'): None is the bare marker, every string is quoted.
+
+    csv.writer cannot be used here: it writes None as an empty field, which
+    COPY then loads as '' (or fails on for integer columns) instead of NULL.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_field(row[column]) for column in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+
+def import_catalog(stream: IO[str], fmt: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[Dict[str, Any], List[str]]:
+    """Import a CSV/JSONL catalog stream; returns (stats, per-row error messages)."""
+    importer = CatalogImporter(batch_size)
+    stats = importer.run(read_records(stream, fmt))
+    return stats, importer.errors
@@ -1,7 +1,15 @@
+import logging
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 from extensions import db
 from models import TemplateCategory, MemeTemplate, Font, StickerCategory, Sticker
+from search import rebuild_search_index
+from catalog_import import import_catalog, DEFAULT_BATCH_SIZE
+from services.asset_store import get_asset_store, AssetError
+from services.thumbnail_service import generate_variants, VariantError
+from services.trending_worker import run_trending_worker
+from services.draft_buffer import flush_drafts
 
 @click.command(name='seed')
 @with_appcontext
@@ -84,3 +92,94 @@ def seed():
 
     db.session.commit()
     print('Database seeded!')
+
+
+@click.command(name='prefetch-assets')
+@with_appcontext
+def prefetch_assets():
+    """Downloads template and sticker images into the local asset store."""
+    store = get_asset_store()
+    sources = [url for (url,) in db.session.query(MemeTemplate.image_url).filter(MemeTemplate.image_url.isnot(None))]
+    sources += [url for (url,) in db.session.query(Sticker.image_url).filter(Sticker.image_url.isnot(None))]
+
+    failed = 0
+    for source in sources:
+        try:
+            store.fetch(source)
+        except AssetError as e:
+            failed += 1
+            print(f'Skipped {source}: {e}')
+
+    usage = store.usage()
+    print(f'Prefetched {len(sources) - failed}/{len(sources)} assets '
+          f'({usage["blobs"]} blobs, {usage["variants"]} variants, {usage["bytes"]} bytes)')
+
+
+@click.command(name='generate-variants')
+@click.option('--overwrite', is_flag=True, help='Regenerate variants that already exist.')
+@with_appcontext
+def generate_image_variants(overwrite):
+    """Generates resized WebP/JPEG variants for every template and sticker."""
+    sources = [url for (url,) in db.session.query(MemeTemplate.image_url).filter(MemeTemplate.image_url.isnot(None))]
+    sources += [url for (url,) in db.session.query(Sticker.image_url).filter(Sticker.image_url.isnot(None))]
+
+    failed = 0
+    for source in sources:
+        try:
+            generate_variants(source, overwrite=overwrite)
+        except VariantError as e:
+            failed += 1
+            print(f'Skipped {source}: {e}')
+
+    print(f'Generated variants for {len(sources) - failed}/{len(sources)} images')
+
+
+@click.command(name='reindex-search')
+@with_appcontext
+def reindex_search():
+    """Builds or backfills the template search index."""
+    backend = rebuild_search_index()
+    count = MemeTemplate.query.count()
+    print(f'Search index rebuilt ({backend}) for {count} templates')
+
+
+@click.command(name='import-catalog')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format (default: from the file extension).')
+@click.option('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, show_default=True)
+@with_appcontext
+def import_catalog_command(path, fmt, batch_size):
+    """Bulk upserts templates, stickers and fonts from a CSV or JSONL file."""
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='' if fmt == 'csv' else None, encoding='utf-8') as stream:
+        stats, errors = import_catalog(stream, fmt, batch_size=batch_size)
+
+    for error in errors:
+        print(f'Skipped {error}')
+    print(f'Imported {stats["rows"]} rows in {stats["seconds"]:.1f}s ({stats["rows_per_second"]:.0f} rows/s): '
+          f'{stats["inserted"]} inserted, {stats["updated"]} updated, '
+          f'{stats["unchanged"]} unchanged, {stats["skipped"]} skipped')
+
+
+@click.command(name='trending-worker')
+@click.option('--interval', type=int, default=None, help='Seconds between refreshes (default TRENDING_REFRESH_INTERVAL).')
+@click.option('--once', is_flag=True, help='Refresh a single time and exit.')
+@with_appcontext
+def trending_worker(interval, once):
+    """Keeps the cached trending feed warm so requests never call Reddit."""
+    app = current_app._get_current_object()
+    interval = interval or app.config['TRENDING_REFRESH_INTERVAL']
+    app.logger.setLevel(logging.INFO)
+    print(f'Refreshing trending feed every {interval}s' if not once else 'Refreshing trending feed once')
+    try:
+        run_trending_worker(app, interval, iterations=1 if once else None)
+    except KeyboardInterrupt:
+        print('Stopped')
+
+
+@click.command(name='flush-drafts')
+@with_appcontext
+def flush_drafts_command():
+    """Writes every buffered draft autosave to the database (e.g. before a deploy)."""
+    print(f'Flushed {flush_drafts()} drafts')
@@ -0,0 +1,205 @@
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional; offered only when installed
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # optional; offered only when installed
+    zstandard = None
+
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 6
+
+# Only these are worth compressing; images, fonts and archives already are
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'image/svg+xml', 'text/html', 'text/css', 'text/plain', 'text/javascript', 'text/csv',
+}
+
+
+class _Encoder:
+    """Incremental compressor with a common compress/flush/finish interface."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        elif encoding == 'zstd':
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        else:
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far so a streamed client can decode it."""
+        if self.encoding == 'br':
+            return self._obj.flush()
+        if self.encoding == 'zstd':
+            return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._obj.finish()
+        if self.encoding == 'zstd':
+            return self._obj.flush()
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+def available_encodings():
+    """Encodings this process can produce, most preferred first."""
+    return [encoding for encoding, module in (('br', brotli), ('zstd', zstandard), ('gzip', zlib)) if module]
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    encoder = _Encoder(encoding)
+    return encoder.compress(data) + encoder.finish()
+
+
+class CompressionStats:
+    """Per-worker bytes saved and CPU time spent per encoding."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.encodings: Dict[str, Dict[str, Any]] = {}
+        self.skipped: Dict[str, int] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu: float, cached: bool = False) -> None:
+        with self.lock:
+            entry = self.encodings.setdefault(encoding, {
+                'responses': 0, 'cache_hits': 0, 'bytes_in': 0, 'bytes_out': 0, 'cpu_seconds': 0.0
+            })
+            entry['responses'] += 1
+            entry['cache_hits'] += cached
+            entry['bytes_in'] += bytes_in
+            entry['bytes_out'] += bytes_out
+            entry['cpu_seconds'] += cpu
+
+    def skip(self, reason: str) -> None:
+        with self.lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            encodings = {
+                encoding: dict(
+                    entry,
+                    bytes_saved=entry['bytes_in'] - entry['bytes_out'],
+                    cpu_seconds=round(entry['cpu_seconds'], 6)
+                )
+                for encoding, entry in self.encodings.items()
+            }
+            return {'available': available_encodings(), 'encodings': encodings, 'skipped': dict(self.skipped)}
+
+
+def compression_stats() -> Dict[str, Any]:
+    """Snapshot of this worker's compression counters."""
+    return current_app.extensions['compression'].snapshot()
+
+
+def negotiate(accept_encodings, encodings: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Pick the best encoding the client accepts; ties go to the server's preference.
+
+    ``encodings`` (in preference order) defaults to what this process can produce.
+    """
+    best, best_quality = None, 0
+    for encoding in available_encodings() if encodings is None else encodings:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _stream(chunks: Iterable[Any], encoder: _Encoder, stats: CompressionStats) -> Iterator[bytes]:
+    bytes_in = bytes_out = 0
+    cpu = 0.0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            started = time.thread_time()
+            data = encoder.compress(chunk) + encoder.flush()
+            cpu += time.thread_time() - started
+            bytes_in += len(chunk)
+            bytes_out += len(data)
+            if data:
+                yield data
+        started = time.thread_time()
+        tail = encoder.finish()
+        cpu += time.thread_time() - started
+        bytes_out += len(tail)
+        yield tail
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+        stats.record(encoder.encoding, bytes_in, bytes_out, cpu)
+
+
+def compress_response(response: Response) -> Response:
+    """after_request hook: compress the body with the negotiated encoding when worthwhile.
+
+    A response may carry ``compressed_variants``, a dict kept with a cached body
+    (see catalog_cached); encoded bodies are read from and stored into it so
+    a cached response is compressed once per encoding, not per request.
+    """
+    stats = current_app.extensions['compression']
+    mimetype = response.mimetype or ''
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    if mimetype not in COMPRESSIBLE_TYPES:
+        stats.skip('type')
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        stats.skip('not_accepted')
+        return response
+
+    if response.is_streamed:
+        response.response = _stream(response.response, _Encoder(encoding), stats)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < current_app.config['COMPRESSION_MIN_SIZE']:
+            stats.skip('small')
+            return response
+        variants = getattr(response, 'compressed_variants', None)
+        compressed = variants.get(encoding) if variants is not None else None
+        if compressed is not None:
+            stats.record(encoding, len(data), len(compressed), 0.0, cached=True)
+        else:
+            started = time.thread_time()
+            compressed = compress(data, encoding)
+            stats.record(encoding, len(data), len(compressed), time.thread_time() - started)
+            if variants is not None:
+                variants[encoding] = compressed
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    return response
+
+
+def init_compression(app) -> None:
+    """Register response compression when COMPRESSION_ENABLED is set."""
+    app.extensions['compression'] = CompressionStats()
+    if app.config.get('COMPRESSION_ENABLED', True):
+        app.after_request(compress_response)
@@ -3,6 +3,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+basedir = os.path.abspath(os.path.dirname(__file__))
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'you-will-never-guess'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
@@ -12,3 +14,51 @@ class Config:
     REDDIT_CLIENT_ID = os.environ.get('REDDIT_CLIENT_ID')
     REDDIT_CLIENT_SECRET = os.environ.get('REDDIT_CLIENT_SECRET')
     GIPHY_API_KEY = os.environ.get('GIPHY_API_KEY')
+    # Upstream base URLs; point both at benchmarks/fake_upstream.py for offline load tests
+    REDDIT_API_URL = (os.environ.get('REDDIT_API_URL') or 'https://api.reddit.com').rstrip('/')
+    GIPHY_API_URL = (os.environ.get('GIPHY_API_URL') or 'https://api.giphy.com').rstrip('/')
+    # 'orjson' (used when the package is installed) or Flask's 'default' JSON provider
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+    # Negotiated br/zstd/gzip response compression (br and zstd when their packages are installed)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1') != '0'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE') or 1024)
+    # Hard limits on meme, batch and draft bodies, checked before schema validation
+    MAX_MEME_BYTES = int(os.environ.get('MAX_MEME_BYTES') or 5 * 1024 * 1024)
+    MAX_DRAFT_BYTES = int(os.environ.get('MAX_DRAFT_BYTES') or 5 * 1024 * 1024)
+    MAX_BATCH_BYTES = int(os.environ.get('MAX_BATCH_BYTES') or 20 * 1024 * 1024)
+    MAX_MEME_LAYERS = int(os.environ.get('MAX_MEME_LAYERS') or 500)
+    MAX_PAYLOAD_DEPTH = int(os.environ.get('MAX_PAYLOAD_DEPTH') or 32)
+    # Serve /fonts, /stickers and /assets/categories from memory until the catalog changes
+    CATALOG_CACHE_ENABLED = os.environ.get('CATALOG_CACHE_ENABLED', '1') != '0'
+    # Local content-addressed copies of template/sticker source images; the byte
+    # budget covers their resized variants too
+    ASSET_STORE_DIR = os.environ.get('ASSET_STORE_DIR') or \
+        os.path.join(basedir, 'cache', 'assets')
+    ASSET_STORE_MAX_BYTES = int(os.environ.get('ASSET_STORE_MAX_BYTES') or 512 * 1024 * 1024)
+    # Remote sources come from user layers: larger downloads are cut off, and
+    # only ASSET_ALLOWED_HOSTS (comma-separated) are fetched when set; otherwise
+    # any host that resolves to public addresses only
+    ASSET_MAX_SOURCE_BYTES = int(os.environ.get('ASSET_MAX_SOURCE_BYTES') or 20 * 1024 * 1024)
+    ASSET_ALLOWED_HOSTS = [host.strip() for host in os.environ.get('ASSET_ALLOWED_HOSTS', '').split(',') if host.strip()]
+    # Server-side rendering; rendered images are stored under their composition hash,
+    # least recently used first out once they take more than RENDER_CACHE_MAX_BYTES
+    RENDER_CACHE_DIR = os.environ.get('RENDER_CACHE_DIR') or \
+        os.path.join(basedir, 'cache', 'renders')
+    RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES') or 256 * 1024 * 1024)
+    # Who refreshes the Reddit trending feed: 'request' (first caller after expiry),
+    # 'worker' (the `flask trending-worker` process) or 'thread' (a thread in each
+    # app process). With 'worker'/'thread' request handlers only read the cache.
+    TRENDING_REFRESHER = os.environ.get('TRENDING_REFRESHER', 'request')
+    TRENDING_REFRESH_INTERVAL = int(os.environ.get('TRENDING_REFRESH_INTERVAL') or 300)
+    # Trending sources fetched concurrently and merged; slow sources are dropped after the deadline
+    TRENDING_SUBREDDITS = [name.strip() for name in os.environ.get('TRENDING_SUBREDDITS', 'memes,dankmemes,wholesomememes').split(',') if name.strip()]
+    TRENDING_INCLUDE_GIPHY = os.environ.get('TRENDING_INCLUDE_GIPHY', '1') != '0'
+    TRENDING_DEADLINE = float(os.environ.get('TRENDING_DEADLINE') or 8)
+    # Autosaves (PUT/PATCH ?autosave=1) are buffered in Redis (written through without it)
+    # and written to the database at most DRAFT_FLUSH_INTERVAL seconds later; that is
+    # how much autosaved work a crash can lose. 0 leaves flushing to explicit saves
+    # and `flask flush-drafts`.
+    DRAFT_AUTOSAVE_BUFFER = os.environ.get('DRAFT_AUTOSAVE_BUFFER', '1') != '0'
+    DRAFT_FLUSH_INTERVAL = float(os.environ.get('DRAFT_FLUSH_INTERVAL') or 5)
+    # Rows fetched per round trip by /users/<id>/export; bounds its memory per request
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE') or 500)
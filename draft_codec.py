@@ -0,0 +1,65 @@
+import json
+import zlib
+from typing import Any, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib is always available
+    zstandard = None
+
+
+# First byte of a stored payload. Rows written before compression hold plain
+# JSON text, which never starts with one of these bytes.
+RAW = 0x00
+ZLIB = 0x01
+ZSTD = 0x02
+
+# Below this the marker and compression headers cost more than they save
+MIN_COMPRESS_BYTES = 256
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 9
+
+
+class DraftCodecError(Exception):
+    """Raised when a stored draft payload cannot be decoded."""
+
+
+def encode(value: Any) -> Optional[bytes]:
+    """Serialize draft data to compact JSON and compress it, prefixed with a format marker."""
+    if value is None:
+        return None
+    payload = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    if len(payload) < MIN_COMPRESS_BYTES:
+        return bytes([RAW]) + payload
+
+    if zstandard is not None:
+        marker, compressed = ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    else:
+        marker, compressed = ZLIB, zlib.compress(payload, ZLIB_LEVEL)
+    if len(compressed) >= len(payload):
+        return bytes([RAW]) + payload
+    return bytes([marker]) + compressed
+
+
+def decode(stored: Union[bytes, memoryview, str, None]) -> Any:
+    """Inverse of encode; also reads legacy rows that hold plain JSON."""
+    if stored is None:
+        return None
+    if isinstance(stored, str):
+        return json.loads(stored)
+    stored = bytes(stored)
+    if not stored:
+        return None
+
+    marker, body = stored[0], stored[1:]
+    if marker == RAW:
+        payload = body
+    elif marker == ZLIB:
+        payload = zlib.decompress(body)
+    elif marker == ZSTD:
+        if zstandard is None:
+            raise DraftCodecError('Draft was stored with zstd but the zstandard package is not installed')
+        payload = zstandard.ZstdDecompressor().decompress(body)
+    else:
+        payload = stored
+    return json.loads(payload)
@@ -1,4 +1,10 @@
 // API Types
+export interface ImageVariant {
+  width: number;
+  format: 'webp' | 'jpeg';
+  url: string;
+}
+
 export interface Template {
   id: number;
   name: string;
@@ -8,6 +14,7 @@ export interface Template {
     id: number;
     name: string;
   };
+  variants?: ImageVariant[];
   created_at: string;
 }
 
@@ -35,6 +42,7 @@ export interface Sticker {
     id: number;
     name: string;
   };
+  variants?: ImageVariant[];
 }
 
 export interface Font {
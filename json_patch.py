@@ -0,0 +1,144 @@
+import copy
+from typing import Any, List, Tuple
+
+
+# Bound the work a single request can ask for
+MAX_OPERATIONS = 1000
+
+OPERATIONS = ('add', 'remove', 'replace', 'move', 'copy', 'test')
+
+
+class JsonPatchError(Exception):
+    """Raised when a patch is malformed or cannot be applied to the document."""
+
+
+class JsonPatchTestFailed(JsonPatchError):
+    """Raised when a ``test`` operation does not match."""
+
+
+def parse_pointer(pointer: Any) -> List[str]:
+    """Split an RFC 6901 JSON Pointer into unescaped reference tokens."""
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f'Invalid JSON pointer: {pointer!r}')
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f'JSON pointer must start with "/": {pointer}')
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == '-':
+        return len(container)
+    if not token.isdigit() or (token != '0' and token.startswith('0')):
+        raise JsonPatchError(f'Invalid array index: {token}')
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f'Array index out of range: {token}')
+    return index
+
+
+def _resolve(document: Any, tokens: List[str]) -> Any:
+    target = document
+    for token in tokens:
+        if isinstance(target, dict):
+            if token not in target:
+                raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_index(target, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+    return target
+
+
+def _parent(document: Any, tokens: List[str]) -> Tuple[Any, str]:
+    if not tokens:
+        raise JsonPatchError('Operation not allowed on the document root')
+    return _resolve(document, tokens[:-1]), tokens[-1]
+
+
+def _add(document: Any, tokens: List[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    else:
+        raise JsonPatchError(f'Cannot add to a non-container at /{"/".join(tokens)}')
+    return document
+
+
+def _remove(document: Any, tokens: List[str]) -> Tuple[Any, Any]:
+    parent, token = _parent(document, tokens)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+        return document, parent.pop(token)
+    if isinstance(parent, list):
+        return document, parent.pop(_index(parent, token, allow_end=False))
+    raise JsonPatchError(f'Path not found: /{"/".join(tokens)}')
+
+
+def _equal(a: Any, b: Any) -> bool:
+    # JSON equality: true/1 and false/0 are different values
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def apply_patch(document: Any, patch: Any) -> Any:
+    """Apply an RFC 6902 patch and return the new document; the input is left untouched.
+
+    The patch is atomic: if any operation fails, JsonPatchError is raised and
+    no partial result is returned.
+    """
+    if not isinstance(patch, list):
+        raise JsonPatchError('Patch must be a list of operations')
+    if len(patch) > MAX_OPERATIONS:
+        raise JsonPatchError(f'Patch has more than {MAX_OPERATIONS} operations')
+
+    document = copy.deepcopy(document)
+    for number, operation in enumerate(patch):
+        if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+            raise JsonPatchError(f'Operation {number} has an invalid "op"')
+        op = operation['op']
+        if 'path' not in operation:
+            raise JsonPatchError(f'Operation {number} is missing "path"')
+        path = parse_pointer(operation['path'])
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise JsonPatchError(f'Operation {number} is missing "value"')
+
+        if op == 'add':
+            document = _add(document, path, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            document, _ = _remove(document, path)
+        elif op == 'replace':
+            if not path:
+                document = copy.deepcopy(operation['value'])
+                continue
+            _resolve(document, path)
+            document, _ = _remove(document, path)
+            document = _add(document, path, copy.deepcopy(operation['value']))
+        elif op == 'test':
+            if not _equal(_resolve(document, path), operation['value']):
+                raise JsonPatchTestFailed(f'Test failed at {operation["path"]}')
+        else:
+            if 'from' not in operation:
+                raise JsonPatchError(f'Operation {number} is missing "from"')
+            source = parse_pointer(operation['from'])
+            if op == 'move':
+                if path[:len(source)] == source and len(path) > len(source):
+                    raise JsonPatchError('Cannot move a value into one of its children')
+                document, value = _remove(document, source)
+            else:
+                value = copy.deepcopy(_resolve(document, source))
+            document = _add(document, path, value)
+    return document
+
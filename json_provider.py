@@ -0,0 +1,51 @@
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; Flask's json provider is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson.
+
+    Output matches the default provider's (sorted keys, compact or two-space
+    indent, HTTP dates for datetimes) except that non-ASCII text is emitted
+    as UTF-8 instead of ``\\u`` escapes. Calls with json.dumps options orjson
+    has no equivalent for are handed to the default provider.
+    """
+
+    def _encode(self, obj: Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # orjson only writes the compact and two-space indented layouts
+        if kwargs == {'separators': (',', ':')}:
+            return self._encode(obj).decode('utf-8')
+        if kwargs == {'indent': 2}:
+            return self._encode(obj, indent=True).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app) -> None:
+    """Install the provider named by JSON_PROVIDER ('orjson' or 'default')."""
+    if app.config.get('JSON_PROVIDER') == 'orjson' and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,70 @@
+"""Add template search index
+
+Revision ID: d8a24c6f0e13
+Revises: c3f1a9e4d2b7
+Create Date: 2026-10-17 11:03:27.184402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8a24c6f0e13'
+down_revision = 'c3f1a9e4d2b7'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS meme_template_fts USING fts5("
+    "name, content='meme_template', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS meme_template_fts_ai AFTER INSERT ON meme_template BEGIN "
+    "INSERT INTO meme_template_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS meme_template_fts_ad AFTER DELETE ON meme_template BEGIN "
+    "INSERT INTO meme_template_fts(meme_template_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS meme_template_fts_au AFTER UPDATE OF name ON meme_template BEGIN "
+    "INSERT INTO meme_template_fts(meme_template_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO meme_template_fts(rowid, name) VALUES (new.id, new.name); END",
+    # Backfill existing rows
+    "INSERT INTO meme_template_fts(meme_template_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS meme_template_fts_au",
+    "DROP TRIGGER IF EXISTS meme_template_fts_ad",
+    "DROP TRIGGER IF EXISTS meme_template_fts_ai",
+    "DROP TABLE IF EXISTS meme_template_fts",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_meme_template_name_tsv ON meme_template "
+    "USING gin (to_tsvector('simple', coalesce(name, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_meme_template_name_trgm ON meme_template "
+    "USING gin (name gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_meme_template_name_trgm",
+    "DROP INDEX IF EXISTS ix_meme_template_name_tsv",
+]
+
+
+def _statements(sqlite, postgres):
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite
+    if dialect == 'postgresql':
+        return postgres
+    return []
+
+
+def upgrade():
+    for statement in _statements(SQLITE_UPGRADE, POSTGRES_UPGRADE):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in _statements(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE):
+        op.execute(statement)
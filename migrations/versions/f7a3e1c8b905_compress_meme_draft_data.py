@@ -0,0 +1,42 @@
+"""Store meme_draft.data compressed and track its size
+
+Revision ID: f7a3e1c8b905
+Revises: e5b7c2d9a614
+Create Date: 2026-10-17 14:08:41.530126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a3e1c8b905'
+down_revision = 'e5b7c2d9a614'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing rows keep their plain JSON text; draft_codec reads it as a legacy
+    # format and rewrites the row compressed on the next save.
+    with op.batch_alter_table('meme_draft', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_size', sa.Integer(), nullable=True))
+        batch_op.alter_column('data',
+               existing_type=sa.JSON(),
+               type_=sa.LargeBinary(),
+               existing_nullable=True,
+               postgresql_using="convert_to(data::text, 'UTF8')")
+
+    op.execute('UPDATE meme_draft SET data_size = length(data) WHERE data IS NOT NULL')
+
+
+def downgrade():
+    # Compressed rows cannot be converted back in SQL; run with drafts saved
+    # before this revision only, or re-save them from an export.
+    with op.batch_alter_table('meme_draft', schema=None) as batch_op:
+        batch_op.alter_column('data',
+               existing_type=sa.LargeBinary(),
+               type_=sa.JSON(),
+               existing_nullable=True,
+               postgresql_using="convert_from(data, 'UTF8')::json")
+        batch_op.drop_column('data_size')
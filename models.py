@@ -1,6 +1,8 @@
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
 from extensions import db
+import draft_codec
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -15,12 +17,17 @@ class TemplateCategory(db.Model):
     templates = db.relationship('MemeTemplate', backref='category', lazy='dynamic')
 
 class MemeTemplate(db.Model):
+    # Composite indexes back keyset pagination ordered by (created_at, id)
+    __table_args__ = (
+        db.Index('ix_meme_template_created_at_id', 'created_at', 'id'),
+        db.Index('ix_meme_template_category_created_at_id', 'category_id', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), index=True)
     image_url = db.Column(db.String(256))
     category_id = db.Column(db.Integer, db.ForeignKey('template_category.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    fields = db.relationship('TemplateField', backref='template', lazy='dynamic')
+    fields = db.relationship('TemplateField', backref='template', order_by='TemplateField.id')
     memes = db.relationship('Meme', backref='template', lazy='dynamic')
 
 class TemplateField(db.Model):
@@ -52,13 +59,17 @@ class Font(db.Model):
     file_path = db.Column(db.String(256)) # Path to ttf/otf file
 
 class Meme(db.Model):
+    __table_args__ = (
+        db.Index('ix_meme_created_at_id', 'created_at', 'id'),
+        db.Index('ix_meme_user_created_at_id', 'user_id', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(128))
     image_url = db.Column(db.String(256)) # Final rendered image
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True) # Nullable for anonymous
     template_id = db.Column(db.Integer, db.ForeignKey('meme_template.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    layers = db.relationship('MemeLayer', backref='meme', lazy='dynamic')
+    layers = db.relationship('MemeLayer', backref='meme', order_by='MemeLayer.id')
 
 class MemeLayer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -74,12 +85,32 @@ class MemeLayer(db.Model):
     z_index = db.Column(db.Integer, default=0)
 
 class MemeDraft(db.Model):
+    __table_args__ = (
+        db.Index('ix_meme_draft_created_at_id', 'created_at', 'id'),
+        db.Index('ix_meme_draft_user_created_at_id', 'user_id', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(128))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     template_id = db.Column(db.Integer, db.ForeignKey('meme_template.id'), nullable=True)
-    data = db.Column(db.JSON) # Raw draft composition data
+    # Compressed draft composition JSON (see draft_codec); deferred so list
+    # queries never fetch it. Read and write it through ``data``.
+    data_blob = deferred(db.Column('data', db.LargeBinary))
+    # Stored (compressed) size of data_blob in bytes, for storage reporting
+    data_size = db.Column(db.Integer)
+    # Incremented on every update; UPDATEs are conditional on it (optimistic locking)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    __mapper_args__ = {'version_id_col': version}
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user = db.relationship('User', backref='drafts')
     template = db.relationship('MemeTemplate')
+
+    @property
+    def data(self):
+        return draft_codec.decode(self.data_blob)
+
+    @data.setter
+    def data(self, value):
+        self.data_blob = draft_codec.encode(value)
+        self.data_size = len(self.data_blob) if self.data_blob is not None else None
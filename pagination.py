@@ -0,0 +1,119 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+import redis
+from flask import request
+from sqlalchemy import tuple_
+
+import extensions
+
+
+MAX_CURSOR_PAGE_SIZE = 100
+COUNT_CACHE_TTL = 60
+MAX_LOCAL_COUNTS = 1024
+
+# Per-worker fallback for cached counts when Redis is not configured; keys include
+# client search terms, so it is an LRU bounded to MAX_LOCAL_COUNTS entries
+_local_counts: 'OrderedDict[str, Tuple[float, int]]' = OrderedDict()
+_local_counts_lock = threading.Lock()
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Build an opaque cursor pointing just past the given row."""
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a cursor produced by encode_cursor; raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def cached_count(query, cache_key: str, ttl: int = COUNT_CACHE_TTL) -> int:
+    """Row count for a query, cached for ``ttl`` seconds (approximate by design)."""
+    key = f'count:{cache_key}'
+    if extensions.redis_client:
+        try:
+            cached = extensions.redis_client.get(key)
+            if cached is not None:
+                return int(cached)
+            total = query.order_by(None).count()
+            extensions.redis_client.setex(key, ttl, total)
+            return total
+        except redis.RedisError:
+            pass
+
+    now = time.monotonic()
+    with _local_counts_lock:
+        cached = _local_counts.get(key)
+        if cached and cached[0] > now:
+            _local_counts.move_to_end(key)
+            return cached[1]
+    total = query.order_by(None).count()
+    with _local_counts_lock:
+        _local_counts[key] = (now + ttl, total)
+        _local_counts.move_to_end(key)
+        while len(_local_counts) > MAX_LOCAL_COUNTS:
+            _local_counts.popitem(last=False)
+    return total
+
+
+def serialize_page(serialize: Callable[[Any], Any], rows: List[Any], many: bool) -> List[Dict[str, Any]]:
+    return serialize(rows) if many else [serialize(row) for row in rows]
+
+
+def paginate(query, model, serialize: Callable[[Any], Any], cache_key: str, many: bool = False) -> Dict[str, Any]:
+    """Paginate a list endpoint from the request's query string.
+
+    Without ``cursor`` this is the original page/per_page contract with an exact
+    ``total`` (skippable with ``with_total=0``). With ``cursor`` (empty for the
+    first page) rows are walked newest first by ``(created_at, id)`` and the
+    response carries ``next_cursor``; ``total`` is only included on request and
+    comes from a short-lived cached count. Any ordering already on ``query``
+    (e.g. search rank) is replaced in cursor mode. With ``many=True``
+    ``serialize`` receives the whole page instead of one row at a time.
+    """
+    per_page = request.args.get('per_page', 10, type=int)
+    cursor = request.args.get('cursor')
+
+    if cursor is None:
+        page = request.args.get('page', 1, type=int)
+        with_total = request.args.get('with_total', 1, type=int) != 0
+        paginated = query.paginate(page=page, per_page=per_page, error_out=False, count=with_total)
+        return {
+            'page': page,
+            'per_page': per_page,
+            'total': paginated.total,
+            'items': serialize_page(serialize, paginated.items, many)
+        }
+
+    per_page = min(max(per_page, 1), MAX_CURSOR_PAGE_SIZE)
+    with_total = request.args.get('with_total', 0, type=int) != 0
+
+    page_query = query.order_by(None).order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        page_query = page_query.filter(tuple_(model.created_at, model.id) < (created_at, item_id))
+
+    rows = page_query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    result = {
+        'per_page': per_page,
+        'next_cursor': encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+        'items': serialize_page(serialize, rows, many)
+    }
+    if with_total:
+        result['total'] = cached_count(query, cache_key)
+    return result
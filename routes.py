@@ -1,7 +1,9 @@
-from flask import Blueprint, send_from_directory, jsonify, send_file
+from flask import Blueprint, jsonify
+from werkzeug.exceptions import NotFound
 import os
-import requests
-from config import Config
+from services.static_assets import serve_asset
+from services.cache import CacheTimeout
+from services.trending_service import get_trending_content
 
 main = Blueprint('main', __name__)
 
@@ -26,8 +28,8 @@ def home():
     
     # Serve the built SPA
     try:
-        return send_from_directory('static', 'index.html')
-    except:
+        return serve_asset('index.html')
+    except NotFound:
         # Fallback to old template if static build doesn't exist
         return '''
         <!DOCTYPE html>
@@ -86,36 +88,25 @@ def home():
 @main.route('/static/<path:filename>')
 def serve_static(filename):
     """Serve static files from the built frontend"""
-    return send_from_directory('static', filename)
+    return serve_asset(filename)
+
+@main.route('/assets/<path:filename>')
+def serve_bundle(filename):
+    """Serve the fingerprinted bundles index.html links to"""
+    return serve_asset(filename, prefix='assets/')
 
 @main.route('/memes')
 def get_memes():
-    # Fetch memes from Reddit API
-    # Using the Config might be overkill for this simple logic but good practice if we parameterized the subreddit
-    url = 'https://api.reddit.com/r/memes/hot'
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    
+    """Legacy trending list, served from the same cached feed as /api/v1/trending."""
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Extract relevant information from the response
-            memes = []
-            if 'data' in data and 'children' in data['data']:
-                for post in data['data']['children']:
-                    post_data = post.get('data', {})
-                    # Filter for images
-                    url_val = post_data.get('url', '')
-                    if url_val.endswith(('.jpg', '.png', '.gif', '.jpeg')):
-                        meme = {
-                            'title': post_data.get('title'),
-                            'image': url_val,
-                            'score': post_data.get('score')
-                        }
-                        memes.append(meme)
-            return jsonify(memes)
-        else:
-            return jsonify({'error': 'Failed to fetch memes from Reddit'}), 502
+        trending = get_trending_content()
+    except CacheTimeout as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
-         return jsonify({'error': str(e)}), 500
+        return jsonify({'error': f'Failed to fetch memes from Reddit: {e}'}), 502
+
+    memes = [
+        {'title': item.get('title'), 'image': item.get('image_url'), 'score': item.get('score')}
+        for item in trending
+    ]
+    return jsonify(memes)
@@ -1,5 +1,20 @@
 from marshmallow import Schema, fields, ValidationError, validate, post_load
+from flask import url_for
 from datetime import datetime
+from services.thumbnail_service import VARIANT_WIDTHS, VARIANT_FORMATS
+
+
+def image_variants(endpoint, **values):
+    """List the resized variants of a catalog image, srcset-style."""
+    return [
+        {
+            'width': width,
+            'format': fmt,
+            'url': url_for(endpoint, w=width, fmt=fmt, **values)
+        }
+        for fmt in VARIANT_FORMATS
+        for width in VARIANT_WIDTHS
+    ]
 
 
 class TemplateFieldSchema(Schema):
@@ -28,8 +43,14 @@ class TemplateSchema(Schema):
     category_id = fields.Int()
     category = fields.Nested(TemplateCategorySchema, dump_only=True)
     template_fields = fields.Nested(TemplateFieldSchema, many=True, dump_only=True, data_key='fields')
+    variants = fields.Method('get_variants', dump_only=True)
     created_at = fields.DateTime(dump_only=True)
 
+    def get_variants(self, obj):
+        if not obj.image_url:
+            return []
+        return image_variants('api_v1.get_template_image', template_id=obj.id)
+
 
 class TemplateDetailSchema(Schema):
     """Detailed schema including layers."""
@@ -54,6 +75,12 @@ class StickerSchema(Schema):
     image_url = fields.Url()
     category_id = fields.Int()
     category = fields.Nested(StickerCategorySchema, dump_only=True)
+    variants = fields.Method('get_variants', dump_only=True)
+
+    def get_variants(self, obj):
+        if not obj.image_url:
+            return []
+        return image_variants('api_v1.get_sticker_image', sticker_id=obj.id)
 
 
 class FontSchema(Schema):
@@ -109,6 +136,11 @@ class MemeCreateSchema(Schema):
     layers = fields.Nested(MemeLayerSchema, many=True)
 
 
+class MemeBatchCreateSchema(Schema):
+    """Schema for batch meme creation; items are validated individually."""
+    memes = fields.List(fields.Raw(allow_none=True), required=True, validate=validate.Length(min=1, max=500))
+
+
 class MemeSchema(Schema):
     """Schema for memes."""
     id = fields.Int(dump_only=True)
@@ -120,6 +152,13 @@ class MemeSchema(Schema):
     layers = fields.Nested(MemeLayerSchema, many=True)
 
 
+class MemeRenderSchema(Schema):
+    """Schema for server-side render requests."""
+    meme_id = fields.Int(required=True)
+    format = fields.Str(load_default='png', validate=validate.OneOf(['png', 'webp']))
+    filters = fields.Dict(load_default=None, allow_none=True)
+
+
 class DraftCreateSchema(Schema):
     """Schema for creating/updating drafts."""
     title = fields.Str(required=True)
@@ -0,0 +1,148 @@
+import re
+import sqlite3
+from typing import List
+
+from sqlalchemy import DDL, case, column, event, func, literal_column, or_, select, table, text
+
+from extensions import db
+from models import MemeTemplate
+
+
+# SQLite keeps an external-content FTS5 index over meme_template.name using the
+# trigram tokenizer, which gives case-insensitive substring/prefix matching and,
+# by OR-ing the query's trigrams, ranked typo-tolerant matches. Triggers keep it
+# in sync with inserts, updates and deletes.
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS meme_template_fts USING fts5("
+    "name, content='meme_template', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS meme_template_fts_ai AFTER INSERT ON meme_template BEGIN "
+    "INSERT INTO meme_template_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS meme_template_fts_ad AFTER DELETE ON meme_template BEGIN "
+    "INSERT INTO meme_template_fts(meme_template_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS meme_template_fts_au AFTER UPDATE OF name ON meme_template BEGIN "
+    "INSERT INTO meme_template_fts(meme_template_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO meme_template_fts(rowid, name) VALUES (new.id, new.name); END",
+]
+
+# Postgres indexes expressions over the name column, so nothing needs syncing
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_meme_template_name_tsv ON meme_template "
+    "USING gin (to_tsvector('simple', coalesce(name, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_meme_template_name_trgm ON meme_template "
+    "USING gin (name gin_trgm_ops)",
+]
+
+SQLITE_REBUILD = "INSERT INTO meme_template_fts(meme_template_fts) VALUES ('rebuild')"
+
+# Trigram tokenizer needs SQLite 3.34
+SQLITE_FTS_AVAILABLE = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+MAX_TRIGRAMS = 32
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+fts_table = table('meme_template_fts', column('rowid'), column('rank'))
+
+
+def _sqlite_fts_supported(ddl, target, bind, **kw):
+    return bind.dialect.name == 'sqlite' and SQLITE_FTS_AVAILABLE
+
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(MemeTemplate.__table__, 'after_create', DDL(statement).execute_if(callable_=_sqlite_fts_supported))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(MemeTemplate.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+event.listen(
+    MemeTemplate.__table__, 'before_drop',
+    DDL('DROP TABLE IF EXISTS meme_template_fts').execute_if(callable_=_sqlite_fts_supported)
+)
+
+
+def _trigrams(term: str) -> List[str]:
+    grams = []
+    for i in range(len(term) - 2):
+        gram = term[i:i + 3]
+        if gram not in grams:
+            grams.append(gram)
+    return grams[:MAX_TRIGRAMS]
+
+
+def _quote(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so the term matches literally (use with escape='\\')."""
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def sqlite_match_expression(search: str) -> str:
+    """FTS5 query: the whole term as a substring, OR any of its trigrams for typos."""
+    term = ' '.join(search.lower().split())
+    tokens = [_quote(term)] + [_quote(gram) for gram in _trigrams(term) if gram != term]
+    return ' OR '.join(tokens)
+
+
+def postgres_tsquery(search: str) -> str:
+    """Prefix tsquery matching every word of the search."""
+    words = re.findall(r'\w+', search.lower())
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def search_templates(query, search: str):
+    """Filter a MemeTemplate query by name, ordered best match first."""
+    search = search.strip()
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'postgresql' and re.search(r'\w', search):
+        vector = func.to_tsvector('simple', func.coalesce(MemeTemplate.name, ''))
+        tsquery = func.to_tsquery('simple', postgres_tsquery(search))
+        similarity = func.similarity(MemeTemplate.name, search)
+        return query.filter(or_(
+            vector.op('@@')(tsquery),
+            MemeTemplate.name.op('%')(search)
+        )).order_by(func.greatest(func.ts_rank(vector, tsquery), similarity).desc(), MemeTemplate.id)
+
+    if dialect == 'sqlite' and SQLITE_FTS_AVAILABLE and len(search) >= 3:
+        term = ' '.join(search.lower().split())
+        matches = select(
+            fts_table.c.rowid.label('id'),
+            fts_table.c.rank.label('rank')
+        ).where(
+            literal_column('meme_template_fts').op('MATCH')(sqlite_match_expression(search))
+        ).subquery()
+        query = query.join(matches, matches.c.id == MemeTemplate.id)
+
+        # OR-ing trigrams matches almost anything sharing one; keep names that
+        # contain a reasonable share of the query's trigrams
+        grams = _trigrams(term)
+        if len(grams) > 1:
+            name = func.lower(MemeTemplate.name)
+            hits = sum(case((func.instr(name, gram) > 0, 1), else_=0) for gram in grams)
+            query = query.filter(hits >= max(1, round(len(grams) * MIN_TRIGRAM_SIMILARITY)))
+        return query.order_by(matches.c.rank, MemeTemplate.id)
+
+    # Short terms (and databases without a search index) fall back to a substring
+    # scan, names starting with the term first
+    pattern = escape_like(search)
+    return query.filter(MemeTemplate.name.ilike(f'%{pattern}%', escape='\\')).order_by(
+        MemeTemplate.name.ilike(f'{pattern}%', escape='\\').desc(), MemeTemplate.name, MemeTemplate.id
+    )
+
+
+def rebuild_search_index() -> str:
+    """Create any missing search structures and repopulate the SQLite index."""
+    bind = db.session.get_bind()
+    if bind.dialect.name == 'sqlite' and SQLITE_FTS_AVAILABLE:
+        for statement in SQLITE_FTS_DDL:
+            db.session.execute(text(statement))
+        db.session.execute(text(SQLITE_REBUILD))
+        db.session.commit()
+        return 'sqlite-fts5'
+    if bind.dialect.name == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            db.session.execute(text(statement))
+        db.session.execute(text('ANALYZE meme_template'))
+        db.session.commit()
+        return 'postgres-tsvector-trgm'
+    return 'none'
@@ -0,0 +1,136 @@
+"""Row-to-dict serializers for the hot list endpoints.
+
+Each produces exactly what the matching schema dumps, from column tuples
+instead of ORM instances; tests/test_serializers.py keeps them in step.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from extensions import db
+from models import MemeTemplate, TemplateCategory, Sticker, StickerCategory, Meme, MemeLayer, MemeDraft
+from schemas import image_variants
+
+
+# Stand-in id for building variant URLs once per request
+_SENTINEL_ID = 2147483647
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def variant_builder(endpoint: str, id_arg: str) -> Callable[[int], List[Dict[str, Any]]]:
+    """Return ``item_id -> image_variants(endpoint, **{id_arg: item_id})`` with url_for called once."""
+    token = str(_SENTINEL_ID)
+    variants = image_variants(endpoint, **{id_arg: _SENTINEL_ID})
+
+    def build(item_id: int) -> List[Dict[str, Any]]:
+        value = str(item_id)
+        return [
+            {'width': v['width'], 'format': v['format'], 'url': v['url'].replace(token, value)}
+            for v in variants
+        ]
+    return build
+
+
+def template_rows():
+    """Columns behind TemplateSchema (its ``fields`` key is never dumped)."""
+    return db.session.query(
+        MemeTemplate.id, MemeTemplate.name, MemeTemplate.image_url, MemeTemplate.category_id,
+        MemeTemplate.created_at,
+        TemplateCategory.id.label('category_ref_id'), TemplateCategory.name.label('category_name')
+    ).outerjoin(TemplateCategory, MemeTemplate.category_id == TemplateCategory.id)
+
+
+def template_serializer() -> Callable[[Any], Dict[str, Any]]:
+    variants = variant_builder('api_v1.get_template_image', 'template_id')
+
+    def serialize(row) -> Dict[str, Any]:
+        return {
+            'id': row.id,
+            'name': row.name,
+            'image_url': row.image_url,
+            'category_id': row.category_id,
+            'category': {'id': row.category_ref_id, 'name': row.category_name} if row.category_ref_id is not None else None,
+            'variants': variants(row.id) if row.image_url else [],
+            'created_at': _isoformat(row.created_at)
+        }
+    return serialize
+
+
+def sticker_rows():
+    """Columns behind StickerSchema."""
+    return db.session.query(
+        Sticker.id, Sticker.name, Sticker.image_url, Sticker.category_id,
+        StickerCategory.id.label('category_ref_id'), StickerCategory.name.label('category_name')
+    ).outerjoin(StickerCategory, Sticker.category_id == StickerCategory.id)
+
+
+def sticker_serializer() -> Callable[[Any], Dict[str, Any]]:
+    variants = variant_builder('api_v1.get_sticker_image', 'sticker_id')
+
+    def serialize(row) -> Dict[str, Any]:
+        return {
+            'id': row.id,
+            'name': row.name,
+            'image_url': row.image_url,
+            'category_id': row.category_id,
+            'category': {'id': row.category_ref_id, 'name': row.category_name} if row.category_ref_id is not None else None,
+            'variants': variants(row.id) if row.image_url else []
+        }
+    return serialize
+
+
+def meme_rows():
+    """Columns behind MemeSchema; layers are fetched per page by serialize_memes."""
+    return db.session.query(Meme.id, Meme.title, Meme.image_url, Meme.user_id, Meme.template_id, Meme.created_at)
+
+
+def serialize_memes(rows) -> List[Dict[str, Any]]:
+    """Serialize a page of meme rows with their layers, loaded in one query."""
+    layers = defaultdict(list)
+    ids = [row.id for row in rows]
+    if ids:
+        layer_rows = db.session.execute(
+            select(
+                MemeLayer.meme_id, MemeLayer.id, MemeLayer.layer_type, MemeLayer.content,
+                MemeLayer.properties, MemeLayer.z_index
+            ).where(MemeLayer.meme_id.in_(ids)).order_by(MemeLayer.id)
+        )
+        for layer in layer_rows:
+            layers[layer.meme_id].append({
+                'id': layer.id,
+                'layer_type': layer.layer_type,
+                'content': layer.content,
+                'properties': layer.properties,
+                'z_index': layer.z_index
+            })
+
+    return [
+        {
+            'id': row.id,
+            'title': row.title,
+            'image_url': row.image_url,
+            'user_id': row.user_id,
+            'template_id': row.template_id,
+            'created_at': _isoformat(row.created_at),
+            'layers': layers[row.id]
+        }
+        for row in rows
+    ]
+
+
+def draft_rows():
+    """Columns shown in the drafts listing; the data payload is never read."""
+    return db.session.query(MemeDraft.id, MemeDraft.title, MemeDraft.created_at, MemeDraft.updated_at)
+
+
+def serialize_draft(row) -> Dict[str, Any]:
+    return {
+        'id': row.id,
+        'title': row.title,
+        'created_at': row.created_at.isoformat(),
+        'updated_at': row.updated_at.isoformat()
+    }
@@ -0,0 +1,314 @@
+import hashlib
+import ipaddress
+import mmap
+import os
+import shutil
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from flask import current_app
+from PIL import Image
+from werkzeug.security import safe_join
+
+from services.http_client import get_http_client
+
+
+# Per-source fetch locks are striped over a fixed pool instead of one per source
+LOCK_STRIPES = 64
+MAX_REDIRECTS = 3
+FETCH_DEADLINE = 10.0
+# A hit refreshes a blob's last access at most this often, so lookups stay reads
+TOUCH_INTERVAL = 60
+
+
+class AssetError(Exception):
+    """Raised when a source image cannot be fetched or read."""
+
+
+class AssetStore:
+    """Content-addressed on-disk cache of template and sticker source images.
+
+    Each source (remote URL or path under static/) is fetched once and stored
+    under the SHA-256 of its bytes, so sources sharing content share a file.
+    An SQLite index maps sources to digests and tracks last access; the least
+    recently used blobs are evicted once the store grows past ``max_bytes``.
+    Derived files (resized variants) are recorded against their blob, count
+    towards the same budget and are evicted along with it.
+    """
+
+    def __init__(self, root: str, max_bytes: int, static_folder: Optional[str] = None,
+                 max_source_bytes: int = 20 * 1024 * 1024, allowed_hosts: Iterable[str] = ()):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.static_folder = static_folder
+        self.max_source_bytes = max_source_bytes
+        self.allowed_hosts = {host.lower() for host in allowed_hosts}
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS blobs ('
+                'digest TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sources ('
+                'source TEXT PRIMARY KEY, digest TEXT NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS variants ('
+                'digest TEXT NOT NULL, name TEXT NOT NULL, size INTEGER NOT NULL, '
+                'PRIMARY KEY (digest, name))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_blobs_last_access ON blobs (last_access)')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(os.path.join(self.root, 'index.sqlite'), timeout=30)
+
+    def _lock_for(self, source: str) -> threading.Lock:
+        return self._locks[hash(source) % LOCK_STRIPES]
+
+    def blob_path(self, digest: str) -> str:
+        """Location of a stored blob."""
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def variant_path(self, digest: str, name: str) -> str:
+        """Location of a file derived from a stored blob."""
+        return os.path.join(self.root, 'variants', digest[:2], digest, name)
+
+    def lookup(self, source: str) -> Optional[str]:
+        """Digest of a source that is already stored, without fetching it."""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT sources.digest, blobs.last_access FROM sources JOIN blobs USING (digest) '
+                'WHERE source = ?', (source,)
+            ).fetchone()
+            if row is None or not os.path.exists(self.blob_path(row[0])):
+                return None
+            digest, last_access = row
+            now = time.time()
+            # LRU order only needs to be roughly right; skip the write on most hits
+            if now - last_access >= TOUCH_INTERVAL:
+                conn.execute('UPDATE blobs SET last_access = ? WHERE digest = ?', (now, digest))
+            return digest
+
+    def check_url(self, url: str) -> None:
+        """Refuse URLs the server must not fetch (AssetError).
+
+        With ``allowed_hosts`` only those hosts are fetched; otherwise every
+        address the host resolves to must be public, which keeps user-supplied
+        layer URLs away from loopback, private, link-local (cloud metadata) and
+        other internal addresses. The download itself re-checks the address it
+        connects to, since the host may resolve differently the second time.
+        """
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        if parts.scheme not in ('http', 'https') or not host:
+            raise AssetError(f'Invalid asset URL: {url}')
+        if self.allowed_hosts:
+            if host not in self.allowed_hosts:
+                raise AssetError(f'Host not allowed: {host}')
+            return
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)}
+        except (socket.gaierror, UnicodeError) as e:
+            raise AssetError(f'Could not resolve {host}: {e}')
+        for address in addresses:
+            if not ipaddress.ip_address(address.split('%')[0]).is_global:
+                raise AssetError(f'Refusing to fetch {url}: {host} resolves to a non-public address')
+
+    def _copy(self, chunks: Iterable[bytes], out, source: str) -> str:
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size > self.max_source_bytes:
+                raise AssetError(f'{source} is larger than {self.max_source_bytes} bytes')
+            digest.update(chunk)
+            out.write(chunk)
+        return digest.hexdigest()
+
+    def _download(self, source: str, fd: int) -> str:
+        """Copy a source into an open temp file, returning the SHA-256 of its bytes."""
+        with os.fdopen(fd, 'wb') as out:
+            if source.startswith(('http://', 'https://')):
+                url = source
+                try:
+                    # Redirects are followed by hand so every hop is checked
+                    client = get_http_client(public_only=not self.allowed_hosts)
+                    for _ in range(MAX_REDIRECTS + 1):
+                        self.check_url(url)
+                        with client.get(url, deadline=FETCH_DEADLINE, retries=0,
+                                        stream=True, allow_redirects=False) as response:
+                            if response.is_redirect:
+                                url = urljoin(url, response.headers['Location'])
+                                continue
+                            response.raise_for_status()
+                            length = response.headers.get('Content-Length')
+                            if length and length.isdigit() and int(length) > self.max_source_bytes:
+                                raise AssetError(f'{source} is larger than {self.max_source_bytes} bytes')
+                            return self._copy(response.iter_content(chunk_size=65536), out, source)
+                    raise AssetError(f'Too many redirects fetching {source}')
+                except requests.RequestException as e:
+                    raise AssetError(f'Could not fetch {source}: {e}')
+            path = safe_join(self.static_folder, source.lstrip('/')) if self.static_folder else None
+            if path is None:
+                raise AssetError(f'Invalid asset path: {source}')
+            try:
+                with open(path, 'rb') as f:
+                    return self._copy(iter(lambda: f.read(65536), b''), out, source)
+            except OSError as e:
+                raise AssetError(f'Could not read {source}: {e}')
+
+    @staticmethod
+    def _verify_image(path: str, source: str) -> None:
+        try:
+            with Image.open(path) as image:
+                image.verify()
+        except Exception as e:
+            raise AssetError(f'{source} is not a valid image: {e}')
+
+    def fetch(self, source: str) -> str:
+        """Ensure a source is stored locally and return its digest."""
+        digest = self.lookup(source)
+        if digest:
+            return digest
+
+        with self._lock_for(source):
+            # Another thread may have stored it while we waited
+            digest = self.lookup(source)
+            if digest:
+                return digest
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            try:
+                digest = self._download(source, fd)
+                # Only images go into the store
+                self._verify_image(tmp_path, source)
+                self._add(source, digest, tmp_path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+            return digest
+
+    def put(self, source: str, data: bytes) -> str:
+        """Store bytes produced locally (such as a render) under ``source``; returns their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._add(source, digest, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        return digest
+
+    def _add(self, source: str, digest: str, tmp_path: str) -> None:
+        """Move a downloaded or written file into place, index it and enforce the budget."""
+        path = self.blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO blobs (digest, size, last_access) VALUES (?, ?, ?)',
+                (digest, size, time.time())
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO sources (source, digest) VALUES (?, ?)',
+                (source, digest)
+            )
+        self.evict(keep=digest)
+
+    def add_variant(self, digest: str, name: str) -> None:
+        """Record a file written to ``variant_path(digest, name)`` against the budget."""
+        size = os.path.getsize(self.variant_path(digest, name))
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO variants (digest, name, size) VALUES (?, ?, ?)',
+                (digest, name, size)
+            )
+        self.evict(keep=digest)
+
+    def _total(self, conn: sqlite3.Connection) -> int:
+        return conn.execute(
+            'SELECT (SELECT COALESCE(SUM(size), 0) FROM blobs) + (SELECT COALESCE(SUM(size), 0) FROM variants)'
+        ).fetchone()[0]
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used blobs and their variants until the store fits its budget."""
+        removed = 0
+        with self._connect() as conn:
+            total = self._total(conn)
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute(
+                'SELECT digest, size + (SELECT COALESCE(SUM(size), 0) FROM variants WHERE variants.digest = blobs.digest) '
+                'FROM blobs ORDER BY last_access'
+            ).fetchall()
+            for digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if digest == keep:
+                    continue
+                try:
+                    os.unlink(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                shutil.rmtree(os.path.join(self.root, 'variants', digest[:2], digest), ignore_errors=True)
+                conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+                conn.execute('DELETE FROM variants WHERE digest = ?', (digest,))
+                conn.execute('DELETE FROM sources WHERE digest = ?', (digest,))
+                total -= size
+                removed += 1
+        return removed
+
+    @contextmanager
+    def open(self, source: str) -> Iterator[mmap.mmap]:
+        """Yield a read-only memory map of a source's bytes, fetching it if needed."""
+        digest = self.fetch(source)
+        try:
+            f = open(self.blob_path(digest), 'rb')
+        except FileNotFoundError:
+            # Evicted by another worker between fetch and open
+            with self._connect() as conn:
+                conn.execute('DELETE FROM sources WHERE digest = ?', (digest,))
+            f = open(self.blob_path(self.fetch(source)), 'rb')
+        with f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise AssetError(f'Empty asset: {source}')
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapped
+            finally:
+                mapped.close()
+
+    def usage(self) -> Dict[str, Any]:
+        """Current size of the store, variants included."""
+        with self._connect() as conn:
+            blobs = conn.execute('SELECT COUNT(*) FROM blobs').fetchone()[0]
+            variants = conn.execute('SELECT COUNT(*) FROM variants').fetchone()[0]
+            total = self._total(conn)
+        return {'blobs': blobs, 'variants': variants, 'bytes': total, 'max_bytes': self.max_bytes}
+
+
+def get_asset_store() -> AssetStore:
+    """Return the asset store for the current app, creating it on first use."""
+    store = current_app.extensions.get('asset_store')
+    if store is None:
+        store = AssetStore(
+            current_app.config['ASSET_STORE_DIR'],
+            current_app.config['ASSET_STORE_MAX_BYTES'],
+            static_folder=current_app.static_folder,
+            max_source_bytes=current_app.config['ASSET_MAX_SOURCE_BYTES'],
+            allowed_hosts=current_app.config['ASSET_ALLOWED_HOSTS']
+        )
+        current_app.extensions['asset_store'] = store
+    return store
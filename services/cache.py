@@ -0,0 +1,203 @@
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import redis
+from flask import current_app, has_app_context
+
+import extensions
+
+
+# How long a refresh may hold the lock before another worker may take over
+LOCK_TIMEOUT = 30
+# How long a request with nothing cached waits for another worker's refresh: as
+# long as that refresh may hold the lock, which outlasts the fetch deadlines
+# (TRENDING_DEADLINE, http_client.DEFAULT_DEADLINE)
+MISS_WAIT = float(LOCK_TIMEOUT)
+MISS_POLL_INTERVAL = 0.05
+MAX_LOCAL_ENTRIES = 1024
+
+_stats: Dict[str, Counter] = {}
+_stats_lock = threading.Lock()
+
+# Fallbacks used when Redis is not configured or unreachable
+_local_entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+# Refresh locks held in this process (lock key -> token), dropped on release
+_local_locks: Dict[str, str] = {}
+_local_locks_guard = threading.Lock()
+_RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+
+class CacheTimeout(Exception):
+    """Raised when nothing is cached and another worker's refresh did not finish in time."""
+
+
+def _record(namespace: str, event: str) -> None:
+    with _stats_lock:
+        _stats.setdefault(namespace, Counter())[event] += 1
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Per-namespace counts of hits, stale hits, misses and refreshes in this worker."""
+    with _stats_lock:
+        return {namespace: dict(counts) for namespace, counts in _stats.items()}
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def clear_local_cache() -> None:
+    """Drop entries held in the in-process fallback store."""
+    _local_entries.clear()
+
+
+def _read(key: str) -> Optional[Dict[str, Any]]:
+    if extensions.redis_client:
+        try:
+            raw = extensions.redis_client.get(key)
+            return json.loads(raw) if raw else None
+        except redis.RedisError:
+            pass
+    entry = _local_entries.get(key)
+    if entry and entry[0] > time.time():
+        return entry[1]
+    return None
+
+
+def _write(key: str, value: Any, soft_ttl: int, hard_ttl: int) -> None:
+    envelope = {'value': value, 'fresh_until': time.time() + soft_ttl}
+    if extensions.redis_client:
+        try:
+            extensions.redis_client.setex(key, hard_ttl, json.dumps(envelope))
+            return
+        except redis.RedisError:
+            pass
+    now = time.time()
+    if len(_local_entries) >= MAX_LOCAL_ENTRIES:
+        for stale_key in [k for k, (expires, _) in _local_entries.items() if expires <= now]:
+            _local_entries.pop(stale_key, None)
+        while len(_local_entries) >= MAX_LOCAL_ENTRIES:
+            _local_entries.pop(next(iter(_local_entries)), None)
+    _local_entries[key] = (now + hard_ttl, envelope)
+
+
+def _acquire(key: str) -> Optional[str]:
+    """Try to become the single refresher for a key; returns a token or None."""
+    lock_key = f'lock:{key}'
+    token = uuid.uuid4().hex
+    if extensions.redis_client:
+        try:
+            if extensions.redis_client.set(lock_key, token, nx=True, ex=LOCK_TIMEOUT):
+                return token
+            return None
+        except redis.RedisError:
+            pass
+    with _local_locks_guard:
+        if lock_key in _local_locks:
+            return None
+        _local_locks[lock_key] = token
+    return token
+
+
+def _release(key: str, token: str) -> None:
+    lock_key = f'lock:{key}'
+    if extensions.redis_client:
+        try:
+            extensions.redis_client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            return
+        except redis.RedisError:
+            pass
+    with _local_locks_guard:
+        if _local_locks.get(lock_key) == token:
+            del _local_locks[lock_key]
+
+
+def _refresh(namespace: str, key: str, token: str, fetch: Callable[[], Any], soft_ttl: int, hard_ttl: int) -> Any:
+    try:
+        value = fetch()
+        if value:
+            _write(key, value, soft_ttl, hard_ttl)
+        _record(namespace, 'refresh')
+        return value
+    except Exception:
+        _record(namespace, 'refresh_error')
+        raise
+    finally:
+        _release(key, token)
+
+
+def _refresh_in_background(namespace, key, token, fetch, soft_ttl, hard_ttl) -> None:
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def run():
+        try:
+            if app is not None:
+                with app.app_context():
+                    _refresh(namespace, key, token, fetch, soft_ttl, hard_ttl)
+            else:
+                _refresh(namespace, key, token, fetch, soft_ttl, hard_ttl)
+        except Exception:
+            # The stale value keeps being served; the next caller retries
+            pass
+
+    threading.Thread(target=run, name=f'refresh:{key}', daemon=True).start()
+
+
+def peek(key: str) -> Any:
+    """Cached value for a key regardless of freshness, or None; never fetches."""
+    envelope = _read(key)
+    return envelope['value'] if envelope is not None else None
+
+
+def store(namespace: str, key: str, value: Any, soft_ttl: int, hard_ttl: int) -> None:
+    """Write a value fetched outside the request path (e.g. by a scheduled refresher)."""
+    _write(key, value, soft_ttl, hard_ttl)
+    _record(namespace, 'refresh')
+
+
+def get_or_refresh(namespace: str, key: str, fetch: Callable[[], Any], soft_ttl: int, hard_ttl: int) -> Any:
+    """Read-through cache with single-flight refresh and stale-while-revalidate.
+
+    Values younger than ``soft_ttl`` are returned as hits. Between ``soft_ttl``
+    and ``hard_ttl`` the stale value is returned immediately and one caller
+    (across all workers, via a Redis lock) refreshes it in the background.
+    On a miss only the lock holder calls ``fetch``; everyone else waits for its
+    result instead of stampeding the upstream service, taking over if the
+    holder gives up, and raises CacheTimeout rather than fetching unguarded
+    if neither happens within MISS_WAIT.
+    """
+    envelope = _read(key)
+    if envelope is not None:
+        if envelope['fresh_until'] > time.time():
+            _record(namespace, 'hit')
+        else:
+            _record(namespace, 'stale')
+            token = _acquire(key)
+            if token:
+                _refresh_in_background(namespace, key, token, fetch, soft_ttl, hard_ttl)
+        return envelope['value']
+
+    _record(namespace, 'miss')
+    token = _acquire(key)
+    if token:
+        return _refresh(namespace, key, token, fetch, soft_ttl, hard_ttl)
+
+    # Someone else is fetching; wait for their result before giving up
+    deadline = time.monotonic() + MISS_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(MISS_POLL_INTERVAL)
+        envelope = _read(key)
+        if envelope is not None:
+            _record(namespace, 'wait_hit')
+            return envelope['value']
+        # The other fetch finished without storing anything (error or empty)
+        token = _acquire(key)
+        if token:
+            return _refresh(namespace, key, token, fetch, soft_ttl, hard_ttl)
+    _record(namespace, 'wait_timeout')
+    raise CacheTimeout(f'{key} is still being fetched by another worker')
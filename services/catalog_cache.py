@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+import redis
+from flask import Response, current_app, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import extensions
+from models import Font, Sticker, StickerCategory, TemplateCategory
+
+
+# Writes to any of these models invalidate every cached catalog response
+CATALOG_MODELS = (Font, Sticker, StickerCategory, TemplateCategory)
+
+VERSION_KEY = 'catalog:version'
+# How often a worker re-reads the shared version from Redis; bounds how long
+# another worker's write can go unseen
+VERSION_CHECK_INTERVAL = 1.0
+MAX_ENTRIES = 256
+
+
+class CatalogCache:
+    """Per-worker store of serialized catalog responses tagged with a catalog version."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.checked_at = 0.0
+        # key -> (version, body, compressed bodies by Content-Encoding)
+        self.responses: 'OrderedDict[str, Tuple[int, bytes, Dict[str, bytes]]]' = OrderedDict()
+
+    def current_version(self) -> int:
+        now = time.monotonic()
+        if extensions.redis_client and now - self.checked_at >= VERSION_CHECK_INTERVAL:
+            try:
+                shared = int(extensions.redis_client.get(VERSION_KEY) or 0)
+                with self.lock:
+                    self.version = max(self.version, shared)
+                    self.checked_at = now
+            except redis.RedisError:
+                pass
+        return self.version
+
+    def bump(self) -> int:
+        shared = None
+        if extensions.redis_client:
+            try:
+                shared = int(extensions.redis_client.incr(VERSION_KEY))
+            except redis.RedisError:
+                pass
+        with self.lock:
+            self.version = max(self.version + 1, shared or 0)
+            self.checked_at = time.monotonic()
+            return self.version
+
+    def get(self, key: str, version: int) -> Optional[Tuple[bytes, Dict[str, bytes]]]:
+        with self.lock:
+            entry = self.responses.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self.responses.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, key: str, version: int, body: bytes) -> Dict[str, bytes]:
+        variants: Dict[str, bytes] = {}
+        with self.lock:
+            self.responses[key] = (version, body, variants)
+            self.responses.move_to_end(key)
+            while len(self.responses) > MAX_ENTRIES:
+                self.responses.popitem(last=False)
+        return variants
+
+    def clear(self) -> None:
+        with self.lock:
+            self.responses.clear()
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Return the catalog cache for the current app, creating it on first use."""
+    cache = current_app.extensions.get('catalog_cache')
+    if cache is None:
+        cache = current_app.extensions.setdefault('catalog_cache', CatalogCache())
+    return cache
+
+
+def catalog_version() -> int:
+    """Current catalog version as seen by this worker."""
+    return get_catalog_cache().current_version()
+
+
+def bump_catalog_version() -> int:
+    """Invalidate cached catalog responses in this and (via Redis) every other worker."""
+    return get_catalog_cache().bump()
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_catalog_writes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CATALOG_MODELS):
+            session.info['catalog_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_on_commit(session):
+    if session.info.pop('catalog_changed', False) and has_app_context():
+        bump_catalog_version()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _reset_on_rollback(session):
+    session.info.pop('catalog_changed', None)
+
+
+def catalog_cached(view):
+    """Serve a catalog endpoint's serialized body from memory until the catalog changes."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config.get('CATALOG_CACHE_ENABLED', True):
+            return view(*args, **kwargs)
+
+        cache = get_catalog_cache()
+        key = request.full_path
+        # Read the version before querying so a concurrent write is never masked
+        version = cache.current_version()
+        entry = cache.get(key, version)
+        if entry is not None:
+            response = Response(entry[0], status=200, mimetype='application/json')
+            # The compression hook fills and reuses these next to the cached body
+            response.compressed_variants = entry[1]
+            return response
+
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.compressed_variants = cache.put(key, version, response.get_data())
+        return response
+    return wrapper
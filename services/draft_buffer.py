@@ -0,0 +1,233 @@
+import atexit
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import redis
+from flask import current_app
+from sqlalchemy.orm.exc import StaleDataError
+
+import extensions
+from extensions import db
+from models import MemeDraft
+
+
+ENTRY_KEY = 'draft:buffer:{}'
+DIRTY_KEY = 'draft:dirty'
+
+logger = logging.getLogger(__name__)
+
+
+class VersionConflict(Exception):
+    """Raised when an autosave is based on a version that is no longer current."""
+
+    def __init__(self, current: int):
+        super().__init__(f'Draft is at version {current}')
+        self.current = current
+
+
+def _redis():
+    return extensions.redis_client
+
+
+def _decode(raw) -> Optional[str]:
+    return raw.decode('utf-8') if isinstance(raw, bytes) else raw
+
+
+def _get_raw(draft_id: int) -> Optional[str]:
+    client = _redis()
+    if client:
+        try:
+            return _decode(client.get(ENTRY_KEY.format(draft_id)))
+        except redis.RedisError:
+            pass
+    return None
+
+
+def _encode(state: Dict[str, Any]) -> str:
+    return json.dumps(state, separators=(',', ':'), sort_keys=True)
+
+
+def _delete_if_unchanged(draft_id: int, raw: str) -> bool:
+    """Delete a buffered entry only if no newer autosave replaced it meanwhile."""
+    client = _redis()
+    if not client:
+        return False
+    key = ENTRY_KEY.format(draft_id)
+    try:
+        with client.pipeline() as pipe:
+            pipe.watch(key)
+            if _decode(pipe.get(key)) != raw:
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.delete(key)
+            pipe.srem(DIRTY_KEY, draft_id)
+            pipe.execute()
+            return True
+    except (redis.WatchError, redis.RedisError):
+        return False
+
+
+def _dirty_ids() -> List[int]:
+    client = _redis()
+    if client:
+        try:
+            return [int(member) for member in client.smembers(DIRTY_KEY)]
+        except redis.RedisError:
+            pass
+    return []
+
+
+def buffered_state(draft_id: int) -> Optional[Dict[str, Any]]:
+    """Latest autosaved state of a draft that has not reached the database yet."""
+    raw = _get_raw(draft_id)
+    return json.loads(raw) if raw else None
+
+
+def buffered_states(draft_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Buffered states for several drafts in one round trip."""
+    draft_ids = list(draft_ids)
+    client = _redis()
+    if not draft_ids or not client:
+        return {}
+    try:
+        raws = client.mget([ENTRY_KEY.format(draft_id) for draft_id in draft_ids])
+    except redis.RedisError:
+        return {}
+    return {draft_id: json.loads(raw) for draft_id, raw in zip(draft_ids, raws) if raw}
+
+
+def buffer_draft(draft_id: int, state: Dict[str, Any], row_version: int) -> bool:
+    """Buffer a new draft state if the draft is still at ``state['version'] - 1``.
+
+    The version check and the write are one WATCH/MULTI transaction, so of two
+    saves based on the same version exactly one is stored; the other raises
+    VersionConflict. Direct saves buffer their state too, as a claim on the
+    version, and settle() it once the row is written. ``row_version`` is the database row's version, current when
+    nothing newer is buffered. Returns False without buffering when Redis is
+    unavailable, so the caller writes through: a per-process buffer would hide
+    autosaves from the other workers. The flusher persists buffered states
+    within DRAFT_FLUSH_INTERVAL seconds.
+    """
+    client = _redis()
+    if not client:
+        return False
+    key = ENTRY_KEY.format(draft_id)
+    raw = _encode(state)
+    try:
+        with client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    buffered = _decode(pipe.get(key))
+                    current = max(json.loads(buffered)['version'], row_version) if buffered else row_version
+                    if current != state['version'] - 1:
+                        pipe.unwatch()
+                        raise VersionConflict(current)
+                    pipe.multi()
+                    pipe.set(key, raw)
+                    pipe.sadd(DIRTY_KEY, draft_id)
+                    pipe.execute()
+                    break
+                except redis.WatchError:
+                    # Another autosave landed first; re-check against it
+                    continue
+    except redis.RedisError as e:
+        logger.warning('Draft %s not buffered, writing through: %s', draft_id, e)
+        return False
+    ensure_flusher(current_app._get_current_object())
+    return True
+
+
+def settle(draft_id: int, state: Dict[str, Any]) -> None:
+    """Drop a buffered state once it has been written directly, unless a newer one replaced it."""
+    _delete_if_unchanged(draft_id, _encode(state))
+
+
+def discard(draft_id: int) -> None:
+    """Forget any buffered state (e.g. after the draft is deleted or saved directly)."""
+    client = _redis()
+    if client:
+        try:
+            pipe = client.pipeline()
+            pipe.delete(ENTRY_KEY.format(draft_id))
+            pipe.srem(DIRTY_KEY, draft_id)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+
+
+def flush_draft(draft_id: int) -> bool:
+    """Persist the buffered state of one draft; returns True if the database was written."""
+    raw = _get_raw(draft_id)
+    if not raw:
+        return False
+    state = json.loads(raw)
+
+    draft = db.session.get(MemeDraft, draft_id)
+    written = False
+    # Buffered versions always run ahead of the row they were based on; anything
+    # else means the row was saved directly since and the buffer is obsolete
+    if draft is not None and draft.version < state['version']:
+        draft.title = state['title']
+        draft.template_id = state['template_id']
+        draft.data = state['data']
+        draft.updated_at = datetime.fromisoformat(state['updated_at'])
+        draft.version = state['version']
+        try:
+            db.session.commit()
+            written = True
+        except StaleDataError:
+            db.session.rollback()
+            logger.warning('Draft %s changed while flushing; keeping the database copy', draft_id)
+
+    _delete_if_unchanged(draft_id, raw)
+    return written
+
+
+def flush_drafts() -> int:
+    """Persist every buffered draft; returns how many rows were written."""
+    written = 0
+    for draft_id in _dirty_ids():
+        try:
+            written += flush_draft(draft_id)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning('Failed to flush draft %s: %s', draft_id, e)
+    return written
+
+
+def run_flusher(app, interval: float, stop_event: threading.Event) -> None:
+    while not stop_event.wait(interval):
+        with app.app_context():
+            flush_drafts()
+            db.session.remove()
+
+
+_flusher_lock = threading.Lock()
+
+
+def ensure_flusher(app) -> None:
+    """Start this process's flusher thread the first time something is buffered."""
+    if 'draft_flusher' in app.extensions or app.config['DRAFT_FLUSH_INTERVAL'] <= 0:
+        return
+    with _flusher_lock:
+        if 'draft_flusher' in app.extensions:
+            return
+        stop_event = threading.Event()
+        threading.Thread(
+            target=run_flusher,
+            args=(app, app.config['DRAFT_FLUSH_INTERVAL'], stop_event),
+            name='draft-flusher',
+            daemon=True
+        ).start()
+        app.extensions['draft_flusher'] = stop_event
+
+        def flush_on_exit():
+            with app.app_context():
+                flush_drafts()
+
+        atexit.register(flush_on_exit)
@@ -0,0 +1,195 @@
+import math
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+
+# Editor defaults and slider limits (see getFilterString in KonvaCanvas.tsx)
+DEFAULT_FILTERS = {
+    'brightness': 100,
+    'contrast': 100,
+    'saturation': 100,
+    'blur': 0,
+    'hueRotate': 0,
+}
+
+FILTER_LIMITS = {
+    'brightness': (0, 200),
+    'contrast': (0, 200),
+    'saturation': (0, 200),
+    'blur': (0, 100),
+    'hueRotate': (0, 360),
+}
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """Fill in defaults and clamp values to the editor's slider ranges.
+
+    Values that are not finite numbers (including NaN, which would slip
+    through the clamp) fall back to the default.
+    """
+    result = {}
+    for name, default in DEFAULT_FILTERS.items():
+        low, high = FILTER_LIMITS[name]
+        try:
+            value = float((filters or {}).get(name, default))
+        except (TypeError, ValueError):
+            value = float(default)
+        if not math.isfinite(value):
+            value = float(default)
+        result[name] = min(max(value, low), high)
+    return result
+
+
+def is_identity(filters: Dict[str, float]) -> bool:
+    """True when the filters leave an image unchanged."""
+    return all(filters[name] == default for name, default in DEFAULT_FILTERS.items())
+
+
+def color_transform(filters: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """Fuse brightness, contrast, saturate and hue-rotate into one affine transform.
+
+    Returns ``(matrix, offset)`` such that ``rgb @ matrix.T + offset`` applies the
+    CSS filter chain to 0-255 RGB values. Blur is linear and commutes with the
+    colour matrices, so it can be applied separately. The browser clamps after
+    each step; this path clamps once at the end, which only differs when an
+    intermediate step pushes a channel out of range.
+    """
+    brightness = filters['brightness'] / 100
+    contrast = filters['contrast'] / 100
+    s = filters['saturation'] / 100
+
+    saturate = np.array([
+        [0.213 + 0.787 * s, 0.715 - 0.715 * s, 0.072 - 0.072 * s],
+        [0.213 - 0.213 * s, 0.715 + 0.285 * s, 0.072 - 0.072 * s],
+        [0.213 - 0.213 * s, 0.715 - 0.715 * s, 0.072 + 0.928 * s],
+    ], dtype=np.float32)
+
+    angle = math.radians(filters['hueRotate'])
+    cos, sin = math.cos(angle), math.sin(angle)
+    hue = np.array([
+        [0.213 + cos * 0.787 - sin * 0.213, 0.715 - cos * 0.715 - sin * 0.715, 0.072 - cos * 0.072 + sin * 0.928],
+        [0.213 - cos * 0.213 + sin * 0.143, 0.715 + cos * 0.285 + sin * 0.140, 0.072 - cos * 0.072 - sin * 0.283],
+        [0.213 - cos * 0.213 - sin * 0.787, 0.715 - cos * 0.715 + sin * 0.715, 0.072 + cos * 0.928 + sin * 0.072],
+    ], dtype=np.float32)
+
+    matrix = (hue @ saturate) * (contrast * brightness)
+    # The contrast offset is grey, which the saturate and hue matrices preserve
+    offset = np.full(3, 255 * (0.5 - 0.5 * contrast), dtype=np.float32)
+    return matrix, offset
+
+
+def _box_sizes(sigma: float, passes: int = 3) -> List[int]:
+    """Box widths whose repeated application approximates a Gaussian of ``sigma``."""
+    ideal = math.sqrt(12 * sigma * sigma / passes + 1)
+    lower = int(math.floor(ideal))
+    if lower % 2 == 0:
+        lower -= 1
+    upper = lower + 2
+    m = round((12 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    return [lower if i < m else upper for i in range(passes)]
+
+
+def _box_blur_axis(pixels: np.ndarray, size: int, axis: int) -> np.ndarray:
+    """Running-mean filter along one axis using a cumulative sum, edge-extended."""
+    radius = size // 2
+    if radius == 0:
+        return pixels
+    pad = [(0, 0)] * pixels.ndim
+    pad[axis] = (radius + 1, radius)
+    sums = np.cumsum(np.pad(pixels, pad, mode='edge'), axis=axis, dtype=np.float32)
+    length = pixels.shape[axis]
+
+    head = [slice(None)] * pixels.ndim
+    tail = [slice(None)] * pixels.ndim
+    head[axis] = slice(size, size + length)
+    tail[axis] = slice(0, length)
+    out = sums[tuple(head)]
+    out -= sums[tuple(tail)]
+    out *= 1.0 / size
+    return out
+
+
+def gaussian_blur(pixels: np.ndarray, sigma: float) -> np.ndarray:
+    """Blur an (N, H, W, C) float array; CSS blur() takes the Gaussian sigma in px.
+
+    Three box passes per axis approximate the Gaussian, so the cost does not
+    grow with the radius.
+    """
+    if sigma <= 0:
+        return pixels
+    for size in _box_sizes(sigma):
+        pixels = _box_blur_axis(pixels, size, axis=1)
+        pixels = _box_blur_axis(pixels, size, axis=2)
+    return pixels
+
+
+def apply_filters_array(pixels: np.ndarray, filters: Union[Dict[str, Any], Sequence[Dict[str, Any]]]) -> np.ndarray:
+    """Apply editor filters to a uint8 (H, W, C) image or (N, H, W, C) batch.
+
+    ``filters`` is either one filters object for the whole batch or one per
+    image. Channels beyond RGB (alpha) are only blurred. Returns a new uint8
+    array of the same shape.
+    """
+    single = pixels.ndim == 3
+    batch = pixels[np.newaxis] if single else pixels
+    count = batch.shape[0]
+
+    if isinstance(filters, dict) or filters is None:
+        per_image = [normalize_filters(filters)] * count
+    else:
+        per_image = [normalize_filters(f) for f in filters]
+        if len(per_image) != count:
+            raise ValueError('Expected one filters object per image')
+
+    work = batch.astype(np.float32)
+    rgb = work[..., :3]
+
+    if not all(is_identity(f) for f in per_image):
+        transforms = [color_transform(f) for f in per_image]
+        matrices = np.stack([m for m, _ in transforms])
+        offsets = np.stack([o for _, o in transforms])
+        # One fused pass: every pixel of every image through its image's matrix
+        rgb[...] = np.matmul(rgb, matrices.transpose(0, 2, 1)[:, np.newaxis])
+        rgb += offsets[:, np.newaxis, np.newaxis, :]
+
+    # Blur image by image: the intermediates stay cache-sized and sigmas may differ
+    for i, f in enumerate(per_image):
+        if f['blur'] > 0:
+            work[i:i + 1] = gaussian_blur(work[i:i + 1], f['blur'])
+
+    np.clip(work, 0, 255, out=work)
+    np.rint(work, out=work)
+    result = work.astype(np.uint8)
+    return result[0] if single else result
+
+
+def apply_filters(image: Image.Image, filters: Optional[Dict[str, Any]]) -> Image.Image:
+    """Apply editor filters to a PIL image."""
+    normalized = normalize_filters(filters)
+    if is_identity(normalized):
+        return image
+    mode = 'RGBA' if 'A' in image.getbands() else 'RGB'
+    pixels = np.asarray(image.convert(mode))
+    return Image.fromarray(apply_filters_array(pixels, normalized))
+
+
+def apply_filters_batch(images: List[Image.Image], filters: Union[Dict[str, Any], Sequence[Dict[str, Any]]]) -> List[Image.Image]:
+    """Apply filters to many images, stacking same-sized images into one array pass."""
+    per_image = [filters] * len(images) if isinstance(filters, dict) or filters is None else list(filters)
+    if len(per_image) != len(images):
+        raise ValueError('Expected one filters object per image')
+
+    groups: Dict[Tuple[Tuple[int, int], str], List[int]] = {}
+    for i, image in enumerate(images):
+        mode = 'RGBA' if 'A' in image.getbands() else 'RGB'
+        groups.setdefault((image.size, mode), []).append(i)
+
+    results: List[Optional[Image.Image]] = [None] * len(images)
+    for (_, mode), indexes in groups.items():
+        stacked = np.stack([np.asarray(images[i].convert(mode)) for i in indexes])
+        filtered = apply_filters_array(stacked, [per_image[i] for i in indexes])
+        for i, pixels in zip(indexes, filtered):
+            results[i] = Image.fromarray(pixels)
+    return results
@@ -1,48 +1,38 @@
-import requests
-import time
-from functools import wraps
-from typing import List, Dict, Any
-import extensions
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
 from config import Config
+from services.http_client import get_http_client, DEFAULT_DEADLINE
+from services.cache import get_or_refresh
 
 
-def retry_with_backoff(max_retries=3, backoff_factor=1):
-    """Decorator for retrying with exponential backoff."""
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            retries = 0
-            while retries < max_retries:
-                try:
-                    return func(*args, **kwargs)
-                except requests.RequestException as e:
-                    retries += 1
-                    if retries >= max_retries:
-                        raise
-                    wait_time = backoff_factor * (2 ** (retries - 1))
-                    time.sleep(wait_time)
-            return None
-        return wrapper
-    return decorator
-
-
-@retry_with_backoff(max_retries=3, backoff_factor=1)
-def search_gifs(query: str, limit: int = 20) -> List[Dict[str, Any]]:
-    """Search for GIFs on Giphy."""
+# Searches are cached in fixed blocks of this many results; any offset/limit
+# window is assembled from the blocks it overlaps
+GIF_BLOCK_SIZE = 25
+# Giphy rejects offsets beyond this
+MAX_GIF_OFFSET = 4999
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search, used for cache keys and upstream calls."""
+    return ' '.join(query.lower().split())
+
+
+def search_gifs_page(query: str, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """Search for GIFs on Giphy; returns one page of results and the total match count."""
     api_key = Config.GIPHY_API_KEY
     if not api_key:
-        return []
+        return [], 0
     
-    url = 'https://api.giphy.com/v1/gifs/search'
+    url = f'{Config.GIPHY_API_URL}/v1/gifs/search'
     params = {
         'api_key': api_key,
         'q': query,
         'limit': limit,
-        'offset': 0,
+        'offset': offset,
         'rating': 'g'  # Keep it family-friendly
     }
     
-    response = requests.get(url, params=params, timeout=10)
+    response = get_http_client().get(url, params=params)
     response.raise_for_status()
     
     data = response.json()
@@ -60,27 +50,85 @@ def search_gifs(query: str, limit: int = 20) -> List[Dict[str, Any]]:
             }
             gifs.append(gif_data)
     
-    return gifs
+    total = data.get('pagination', {}).get('total_count', offset + len(gifs))
+    return gifs, total
 
 
-def get_cached_gifs(query: str, cache_ttl=1800) -> List[Dict[str, Any]]:
-    """Get cached GIF search results."""
-    cache_key = f'gifs:{query}'
-    
-    if extensions.redis_client:
-        cached = extensions.redis_client.get(cache_key)
-        if cached:
-            import json
-            return json.loads(cached)
-    
-    gifs = search_gifs(query)
-    
-    if extensions.redis_client and gifs:
-        import json
-        extensions.redis_client.setex(
-            cache_key, 
-            cache_ttl, 
-            json.dumps(gifs)
-        )
+def search_gifs(query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    """Search for GIFs on Giphy."""
+    return search_gifs_page(query, limit=limit, offset=offset)[0]
+
+
+def _parse_giphy_datetime(value: Optional[str]) -> Optional[float]:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_giphy_trending(limit: int = 25, deadline: float = DEFAULT_DEADLINE) -> List[Dict[str, Any]]:
+    """Fetch trending GIFs from Giphy in the trending item shape (ranked, no score)."""
+    api_key = Config.GIPHY_API_KEY
+    if not api_key:
+        return []
+
+    url = f'{Config.GIPHY_API_URL}/v1/gifs/trending'
+    params = {'api_key': api_key, 'limit': limit, 'rating': 'g'}
+    response = get_http_client().get(url, params=params, deadline=deadline)
+    response.raise_for_status()
+
+    items = []
+    for gif in response.json().get('data', []):
+        image_url = gif.get('images', {}).get('fixed_height', {}).get('url', '')
+        if not image_url:
+            continue
+        items.append({
+            'id': gif.get('id'),
+            'title': gif.get('title', ''),
+            'image_url': image_url,
+            'score': None,
+            'author': gif.get('username') or None,
+            'created_at': _parse_giphy_datetime(gif.get('trending_datetime')) or _parse_giphy_datetime(gif.get('import_datetime')),
+            'subreddit': None,
+            'source': 'giphy'
+        })
+    return items
+
+
+def _cached_block(query: str, block: int, cache_ttl: int, stale_ttl: int) -> Dict[str, Any]:
+    def fetch():
+        items, total = search_gifs_page(query, limit=GIF_BLOCK_SIZE, offset=block * GIF_BLOCK_SIZE)
+        return {'items': items, 'total': total}
+
+    return get_or_refresh(
+        'gifs',
+        f'gifs:{query}:{block}',
+        fetch,
+        soft_ttl=cache_ttl,
+        hard_ttl=cache_ttl + stale_ttl
+    )
+
+
+def get_cached_gifs(query: str, limit: int = 20, offset: int = 0, cache_ttl=1800, stale_ttl=1800) -> Dict[str, Any]:
+    """Get a window of GIF search results assembled from cached blocks.
     
-    return gifs
+    Returns ``items``, the upstream ``total`` and ``next_offset`` (None on the
+    last page).
+    """
+    query = normalize_query(query)
+    offset = max(0, offset)
+    end = min(offset + limit, MAX_GIF_OFFSET + 1)
+    items: List[Dict[str, Any]] = []
+    total = 0
+    for block in range(offset // GIF_BLOCK_SIZE, (end - 1) // GIF_BLOCK_SIZE + 1):
+        cached = _cached_block(query, block, cache_ttl, stale_ttl)
+        total = cached['total']
+        start = block * GIF_BLOCK_SIZE
+        items.extend(cached['items'][max(0, offset - start):end - start])
+        # A short block is the end of the results
+        if len(cached['items']) < GIF_BLOCK_SIZE:
+            break
+
+    next_offset = offset + len(items)
+    has_more = len(items) == limit and next_offset < min(total, MAX_GIF_OFFSET + 1)
+    return {'items': items, 'total': total, 'next_offset': next_offset if has_more else None}
@@ -0,0 +1,234 @@
+import ipaddress
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Overall budget for one logical call, including every retry and wait
+DEFAULT_DEADLINE = 10.0
+DEFAULT_RETRIES = 2
+# Full-jitter backoff: the n-th retry waits uniform(0, BACKOFF_BASE * 2**n) seconds
+BACKOFF_BASE = 0.25
+MAX_CONNECTIONS_PER_HOST = 10
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+LATENCY_SAMPLES = 512
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised when a call's overall deadline runs out before it succeeds."""
+
+
+class NonPublicAddressError(ConnectionError):
+    """Raised when a public-only client's connection lands on an internal address."""
+
+
+def _check_public_peer(sock) -> None:
+    address = sock.getpeername()[0]
+    if not ipaddress.ip_address(address.split('%')[0]).is_global:
+        raise NonPublicAddressError(f'Refusing to talk to non-public address {address}')
+
+
+class _PublicHTTPConnection(HTTPConnection):
+    def connect(self):
+        super().connect()
+        _check_public_peer(self.sock)
+
+
+class _PublicHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        super().connect()
+        _check_public_peer(self.sock)
+
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PublicHTTPConnection
+
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicHTTPSConnection
+
+
+class PublicAddressAdapter(HTTPAdapter):
+    """Adapter that drops any connection whose peer is not a public address.
+
+    The check runs on the connected socket, before a request is sent on it, so
+    it covers the address actually used: a host that resolves to a public
+    address for a pre-flight check and to an internal one for the connection
+    (DNS rebinding) is still refused.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _PublicHTTPConnectionPool,
+            'https': _PublicHTTPSConnectionPool,
+        }
+
+
+class _HostPool:
+    """Keep-alive session, concurrency limit and counters for one upstream host."""
+
+    def __init__(self, max_connections: int, public_only: bool = False):
+        self.session = requests.Session()
+        adapter_class = HTTPAdapter
+        if public_only:
+            adapter_class = PublicAddressAdapter
+            # A proxy from the environment would make the connection for us, unchecked
+            self.session.trust_env = False
+        self.adapter = adapter_class(pool_connections=1, pool_maxsize=max_connections, max_retries=0)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.lock = threading.Lock()
+        self.counts = {'requests': 0, 'errors': 0, 'retries': 0, 'new_connections': 0, 'deadline_exceeded': 0}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def connections_opened(self, url: str) -> int:
+        return self.adapter.poolmanager.connection_from_url(url).num_connections
+
+    def record(self, **changes) -> None:
+        with self.lock:
+            for name, amount in changes.items():
+                self.counts[name] += amount
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            counts = dict(self.counts)
+            latencies = sorted(self.latencies)
+        counts['reused_connections'] = max(0, counts['requests'] - counts['new_connections'])
+        if latencies:
+            counts['latency_ms'] = {
+                'p50': round(latencies[len(latencies) // 2] * 1000, 1),
+                'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1),
+            }
+        return counts
+
+
+class HTTPClient:
+    """Pooled HTTP client shared by every upstream integration.
+
+    Each host gets its own keep-alive pool and a cap on concurrent requests.
+    A call has one overall deadline: retries on connection errors and
+    retryable statuses wait a jittered backoff only if the budget left allows
+    another attempt, and every attempt's timeout is clipped to what remains.
+    With ``public_only`` connections to anything but public addresses fail.
+    """
+
+    def __init__(self, max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST, public_only: bool = False):
+        self.max_connections_per_host = max_connections_per_host
+        self.public_only = public_only
+        self._hosts: Dict[str, _HostPool] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, url: str) -> _HostPool:
+        parts = urlsplit(url)
+        host = f'{parts.scheme}://{parts.netloc}'
+        pool = self._hosts.get(host)
+        if pool is None:
+            with self._lock:
+                pool = self._hosts.setdefault(host, _HostPool(self.max_connections_per_host, self.public_only))
+        return pool
+
+    def request(self, method: str, url: str, deadline: float = DEFAULT_DEADLINE,
+                retries: int = DEFAULT_RETRIES, **kwargs) -> requests.Response:
+        """Send a request, retrying within ``deadline`` seconds.
+
+        Returns the last response even if its status is an error, so callers
+        keep using ``raise_for_status``. Raises DeadlineExceeded when no
+        attempt could be completed in time. With ``stream=True`` the body is
+        left unread and the caller must close the response.
+        """
+        pool = self._pool(url)
+        expires = time.monotonic() + deadline
+        attempt = 0
+        while True:
+            remaining = expires - time.monotonic()
+            if remaining <= 0 or not pool.slots.acquire(timeout=remaining):
+                pool.record(deadline_exceeded=1)
+                raise DeadlineExceeded(f'{method} {url} exceeded its {deadline}s deadline')
+
+            error = None
+            response = None
+            started = time.monotonic()
+            try:
+                opened = pool.connections_opened(url)
+                timeout = max(0.001, expires - started)
+                response = pool.session.request(method, url, timeout=timeout, **kwargs)
+                # Read the body now so the connection goes back to the pool
+                if not kwargs.get('stream'):
+                    response.content
+            except requests.RequestException as e:
+                error = e
+            finally:
+                pool.slots.release()
+
+            elapsed = time.monotonic() - started
+            with pool.lock:
+                pool.counts['requests'] += 1
+                pool.counts['new_connections'] += max(0, pool.connections_opened(url) - opened)
+                pool.latencies.append(elapsed)
+                if error is not None or response.status_code >= 500:
+                    pool.counts['errors'] += 1
+
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            if not retryable or attempt >= retries:
+                if error is not None:
+                    raise error
+                return response
+
+            wait = random.uniform(0, BACKOFF_BASE * (2 ** attempt))
+            retry_after = response.headers.get('Retry-After') if response is not None else None
+            if retry_after and retry_after.isdigit():
+                wait = max(wait, float(retry_after))
+            # Only wait if a meaningful attempt still fits in the budget
+            if time.monotonic() + wait >= expires - min(elapsed, 1.0):
+                if error is not None:
+                    raise error
+                return response
+
+            if response is not None:
+                response.close()
+            time.sleep(wait)
+            attempt += 1
+            pool.record(retries=1)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host request, retry, connection-reuse and latency figures."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: pool.stats() for host, pool in hosts.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            for pool in self._hosts.values():
+                pool.session.close()
+            self._hosts.clear()
+
+
+_clients: Dict[bool, HTTPClient] = {}
+_client_lock = threading.Lock()
+
+
+def get_http_client(public_only: bool = False) -> HTTPClient:
+    """Process-wide client so every caller shares the same pools.
+
+    ``public_only`` selects the client for user-supplied URLs, which refuses
+    to connect to loopback, private and link-local addresses.
+    """
+    client = _clients.get(public_only)
+    if client is None:
+        with _client_lock:
+            client = _clients.setdefault(public_only, HTTPClient(public_only=public_only))
+    return client
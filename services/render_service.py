@@ -0,0 +1,312 @@
+import hashlib
+import io
+import json
+import math
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+from flask import current_app
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import Meme, Font
+from services.asset_store import AssetStore, get_asset_store, AssetError
+from services.filter_service import apply_filters, normalize_filters
+
+
+# Bump when the compositing logic changes so stale renders are not served.
+RENDER_VERSION = 1
+
+# The editor draws the template background at a fixed size and stores layer
+# coordinates relative to it (see KonvaCanvas.tsx).
+CANVAS_SIZE = (400, 400)
+
+FORMATS = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+}
+
+# Bounds for client-supplied layer properties; values outside are clamped
+MAX_FONT_SIZE = 400
+MAX_STROKE_WIDTH = 50
+MAX_SHADOW_BLUR = 100
+MAX_LAYER_SIZE = 4 * max(CANVAS_SIZE)
+MAX_OFFSET = 10 * max(CANVAS_SIZE)
+# Longer text is cut off; it could never fit on the canvas
+MAX_TEXT_LENGTH = 2000
+
+
+class RenderError(Exception):
+    """Raised when a meme cannot be rendered."""
+
+
+class MemeNotFoundError(RenderError):
+    """Raised when the meme to render does not exist."""
+
+
+class InvalidLayerError(RenderError):
+    """Raised when a layer property is malformed."""
+
+
+def _number(props: Dict[str, Any], key: str, default: float, low: float, high: float) -> float:
+    """A numeric layer property clamped to [low, high]; missing, empty or 0 gives ``default``."""
+    value = props.get(key)
+    if value is None or value == '' or value == 0:
+        return default
+    if isinstance(value, bool):
+        raise InvalidLayerError(f'Layer property {key} must be a number, not {value!r}')
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidLayerError(f'Layer property {key} must be a number, not {value!r}')
+    if not math.isfinite(number):
+        raise InvalidLayerError(f'Layer property {key} must be finite')
+    return min(max(number, low), high)
+
+
+def normalize_layers(layers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return layers in paint order with only the fields that affect output."""
+    indexed = sorted(enumerate(layers), key=lambda item: (item[1].get('z_index') or 0, item[0]))
+    return [
+        {
+            'layer_type': layer.get('layer_type'),
+            'content': layer.get('content') or '',
+            'properties': layer.get('properties') or {},
+            'z_index': layer.get('z_index') or 0,
+        }
+        for _, layer in indexed
+    ]
+
+
+def composition_key(template_url: Optional[str], layers: List[Dict[str, Any]], fmt: str,
+                    filters: Optional[Dict[str, Any]] = None) -> str:
+    """Hash a composition so identical memes share one rendered file."""
+    payload = json.dumps({
+        'version': RENDER_VERSION,
+        'template': template_url,
+        'size': CANVAS_SIZE,
+        'format': fmt,
+        'layers': normalize_layers(layers),
+        'filters': normalize_filters(filters),
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_render_store() -> AssetStore:
+    """Return the render cache for the current app, creating it on first use.
+
+    Renders are kept in their own store so that RENDER_CACHE_MAX_BYTES bounds
+    them with LRU eviction, whatever compositions and filters clients ask for.
+    """
+    store = current_app.extensions.get('render_store')
+    if store is None:
+        store = AssetStore(current_app.config['RENDER_CACHE_DIR'], current_app.config['RENDER_CACHE_MAX_BYTES'])
+        current_app.extensions['render_store'] = store
+    return store
+
+
+def render_path(key: str, fmt: str) -> Optional[str]:
+    """Location of a rendered file, or None if it was never rendered or has been evicted."""
+    store = get_render_store()
+    digest = store.lookup(f'{key}.{fmt}')
+    return store.blob_path(digest) if digest else None
+
+
+def load_source_image(source: str) -> Image.Image:
+    """Load a template or sticker image through the local asset store."""
+    try:
+        with get_asset_store().open(source) as data:
+            image = Image.open(data)
+            image.load()
+    except (AssetError, OSError) as e:
+        raise RenderError(f'Could not load image {source}: {e}')
+    return image.convert('RGBA')
+
+
+@lru_cache(maxsize=64)
+def _load_font(path: Optional[str], size: int) -> ImageFont.ImageFont:
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size)
+
+
+def _parse_color(value: Optional[str], default: str) -> Tuple[int, int, int, int]:
+    try:
+        return Image.new('RGBA', (1, 1), value or default).getpixel((0, 0))
+    except ValueError:
+        return Image.new('RGBA', (1, 1), default).getpixel((0, 0))
+
+
+def _render_text(layer: Dict[str, Any], font_paths: Dict[str, str]) -> Tuple[Image.Image, Tuple[int, int]]:
+    props = layer['properties']
+    text = layer['content'][:MAX_TEXT_LENGTH]
+    if props.get('uppercase'):
+        text = text.upper()
+
+    font_size = int(_number(props, 'fontSize', 16, 1, MAX_FONT_SIZE))
+    # Text past MAX_LAYER_SIZE is clipped anyway; drop it before the font rasterises it
+    max_chars = 4 * MAX_LAYER_SIZE // font_size
+    text = '\n'.join(line[:max_chars] for line in text.split('\n')[:MAX_LAYER_SIZE // font_size + 1])
+    family = props.get('fontFamily') or 'Arial'
+    font = _load_font(font_paths.get(family), font_size)
+    stroke_width = int(_number(props, 'strokeWidth', 0, 0, MAX_STROKE_WIDTH))
+    shadow_blur = int(_number(props, 'shadowBlur', 0, 0, MAX_SHADOW_BLUR))
+    shadow_x = int(_number(props, 'shadowOffsetX', 0, -max(CANVAS_SIZE), max(CANVAS_SIZE)))
+    shadow_y = int(_number(props, 'shadowOffsetY', 0, -max(CANVAS_SIZE), max(CANVAS_SIZE)))
+    align = props.get('textAlign') or 'left'
+
+    measure = ImageDraw.Draw(Image.new('RGBA', (1, 1)))
+    left, top, right, bottom = measure.multiline_textbbox(
+        (0, 0), text, font=font, align=align, stroke_width=stroke_width
+    )
+    pad = stroke_width + shadow_blur * 2 + max(abs(shadow_x), abs(shadow_y))
+    # Text running past MAX_LAYER_SIZE is clipped rather than allocated
+    size = (min(max(right, 1), MAX_LAYER_SIZE) + pad * 2, min(max(bottom, 1), MAX_LAYER_SIZE) + pad * 2)
+    element = Image.new('RGBA', size, (0, 0, 0, 0))
+
+    if props.get('shadowColor') and shadow_blur:
+        shadow = Image.new('RGBA', size, (0, 0, 0, 0))
+        r, g, b, _ = _parse_color(props['shadowColor'], '#000000')
+        ImageDraw.Draw(shadow).multiline_text(
+            (pad + shadow_x, pad + shadow_y),
+            text, font=font, fill=(r, g, b, 128), align=align
+        )
+        element = Image.alpha_composite(element, shadow.filter(ImageFilter.GaussianBlur(shadow_blur / 2)))
+
+    ImageDraw.Draw(element).multiline_text(
+        (pad, pad), text, font=font, align=align,
+        fill=_parse_color(props.get('color'), '#000000'),
+        stroke_width=stroke_width,
+        stroke_fill=_parse_color(props.get('strokeColor'), '#000000') if stroke_width else None,
+    )
+    return element, (-pad, -pad)
+
+
+def _render_image(layer: Dict[str, Any]) -> Tuple[Image.Image, Tuple[int, int]]:
+    props = layer['properties']
+    width = int(_number(props, 'width', 100, 1, MAX_LAYER_SIZE))
+    height = int(_number(props, 'height', 100, 1, MAX_LAYER_SIZE))
+    element = load_source_image(layer['content']).resize((width, height), Image.LANCZOS)
+
+    # Konva flips with a negative scale around the layer origin, so a flipped
+    # image extends to the left of / above its x, y position.
+    offset_x, offset_y = 0, 0
+    if props.get('flipH'):
+        element = element.transpose(Image.FLIP_LEFT_RIGHT)
+        offset_x = -width
+    if props.get('flipV'):
+        element = element.transpose(Image.FLIP_TOP_BOTTOM)
+        offset_y = -height
+    return element, (offset_x, offset_y)
+
+
+def _place(canvas: Image.Image, element: Image.Image, origin: Tuple[int, int], props: Dict[str, Any]) -> None:
+    """Composite an element at its origin, honouring opacity and rotation about the origin."""
+    # Unlike the other properties an explicit 0 is meaningful here
+    opacity = _number(props, 'opacity', 1, 0, 1) if props.get('opacity') != 0 else 0
+    if opacity < 1:
+        alpha = element.getchannel('A').point(lambda a: int(a * opacity))
+        element.putalpha(alpha)
+
+    offset_x, offset_y = origin
+    rotation = _number(props, 'rotation', 0, -1e6, 1e6) % 360
+    if rotation:
+        theta = math.radians(rotation)
+        cos, sin = math.cos(theta), math.sin(theta)
+        w, h = element.size
+        corners = [
+            (x * cos - y * sin, x * sin + y * cos)
+            for x, y in ((offset_x, offset_y), (offset_x + w, offset_y),
+                         (offset_x, offset_y + h), (offset_x + w, offset_y + h))
+        ]
+        element = element.rotate(-rotation, resample=Image.BICUBIC, expand=True)
+        offset_x = min(x for x, _ in corners)
+        offset_y = min(y for _, y in corners)
+
+    x = int(round(_number(props, 'x', 0, -MAX_OFFSET, MAX_OFFSET) + offset_x))
+    y = int(round(_number(props, 'y', 0, -MAX_OFFSET, MAX_OFFSET) + offset_y))
+    layer = Image.new('RGBA', canvas.size, (0, 0, 0, 0))
+    layer.paste(element, (x, y))
+    canvas.alpha_composite(layer)
+
+
+def compose(template_url: Optional[str], layers: List[Dict[str, Any]],
+            filters: Optional[Dict[str, Any]] = None) -> Image.Image:
+    """Composite a template background and its layers, then apply the editor filters."""
+    canvas = Image.new('RGBA', CANVAS_SIZE, (255, 255, 255, 255))
+    if template_url:
+        background = load_source_image(template_url).resize(CANVAS_SIZE, Image.LANCZOS)
+        canvas.alpha_composite(background)
+
+    font_paths = None
+    for layer in normalize_layers(layers):
+        props = layer['properties']
+        if props.get('visible') is False:
+            continue
+        if layer['layer_type'] == 'text':
+            if font_paths is None:
+                font_paths = {f.name: f.file_path for f in Font.query.all()}
+            element, origin = _render_text(layer, font_paths)
+        elif layer['layer_type'] in ('sticker', 'image'):
+            element, origin = _render_image(layer)
+        else:
+            continue
+        _place(canvas, element, origin, props)
+
+    # The editor applies its CSS filter to the whole stage, layers included
+    return apply_filters(canvas, filters)
+
+
+def encode(image: Image.Image, fmt: str) -> bytes:
+    """Encode a rendered image to PNG or WebP bytes."""
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, format='WEBP', quality=90, method=4)
+    else:
+        image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_composition(template_url: Optional[str], layers: List[Dict[str, Any]], fmt: str = 'png',
+                       filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Render a composition, reusing a previously rendered file when one exists."""
+    if fmt not in FORMATS:
+        raise RenderError(f'Unsupported format: {fmt}')
+
+    key = composition_key(template_url, layers, fmt, filters)
+    path = render_path(key, fmt)
+    if path is not None:
+        return {'key': key, 'format': fmt, 'path': path, 'cached': True}
+
+    data = encode(compose(template_url, layers, filters), fmt)
+    # The store writes atomically, so concurrent renders of a key never expose a partial file
+    store = get_render_store()
+    path = store.blob_path(store.put(f'{key}.{fmt}', data))
+    return {'key': key, 'format': fmt, 'path': path, 'cached': False}
+
+
+def render_meme(meme_id: int, fmt: str = 'png', filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Render a stored meme from its template and layers."""
+    meme = Meme.query.options(
+        joinedload(Meme.template), selectinload(Meme.layers)
+    ).filter_by(id=meme_id).first()
+    if meme is None:
+        raise MemeNotFoundError(f'Meme {meme_id} not found')
+
+    template_url = meme.template.image_url if meme.template else None
+    layers = [
+        {
+            'layer_type': layer.layer_type,
+            'content': layer.content,
+            'properties': layer.properties,
+            'z_index': layer.z_index,
+        }
+        for layer in meme.layers
+    ]
+    result = render_composition(template_url, layers, fmt, filters)
+    result['meme_id'] = meme.id
+    return result
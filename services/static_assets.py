@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from typing import Any, Dict, Optional
+
+from flask import Response, current_app, request, send_file
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+from compression import negotiate
+
+try:
+    import brotli
+except ImportError:  # optional; only .gz siblings are written without it
+    brotli = None
+
+
+MANIFEST_NAME = 'asset-manifest.json'
+PRECOMPRESS_EXTENSIONS = {'.js', '.css', '.html', '.svg', '.json', '.map', '.txt'}
+PRECOMPRESS_MIN_BYTES = 1024
+# Precompressed variants served, most preferred first
+PRECOMPRESSED_ENCODINGS = ('br', 'gzip')
+# Vite writes content-hashed bundles as assets/<name>-<8 char hash>.<ext>
+HASHED_RE = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.\w+(\.map)?$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def is_hashed(relpath: str) -> bool:
+    """Whether ``relpath`` is a fingerprinted build file whose content never changes."""
+    return bool(HASHED_RE.match(relpath))
+
+
+def _write_if_smaller(path: str, data: bytes, original_size: int) -> bool:
+    if len(data) >= original_size:
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def precompress_static(static_dir: str) -> Dict[str, Any]:
+    """Write .br/.gz siblings for compressible build files and the asset manifest.
+
+    The manifest maps each file's path (relative to ``static_dir``) to a content
+    ETag, its size, whether it is fingerprinted, and the precompressed siblings
+    that ended up smaller than the original.
+    """
+    manifest: Dict[str, Any] = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, static_dir).replace(os.sep, '/')
+            if relpath == MANIFEST_NAME or os.path.splitext(name)[1] in ('.br', '.gz'):
+                continue
+            with open(path, 'rb') as f:
+                data = f.read()
+            encodings = {}
+            if os.path.splitext(name)[1] in PRECOMPRESS_EXTENSIONS and len(data) >= PRECOMPRESS_MIN_BYTES:
+                if _write_if_smaller(path + '.gz', gzip.compress(data, 9, mtime=0), len(data)):
+                    encodings['gzip'] = relpath + '.gz'
+                if brotli is not None and _write_if_smaller(path + '.br', brotli.compress(data), len(data)):
+                    encodings['br'] = relpath + '.br'
+            manifest[relpath] = {
+                'etag': hashlib.sha256(data).hexdigest()[:20],
+                'size': len(data),
+                'hashed': is_hashed(relpath),
+                'encodings': encodings,
+            }
+    with open(os.path.join(static_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest() -> Dict[str, Any]:
+    """The static folder's asset manifest, re-read only when the file changes."""
+    path = os.path.join(current_app.static_folder, MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    cached = current_app.extensions.get('static_manifest')
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(path) as f:
+                cached = (mtime, json.load(f))
+        except (OSError, ValueError):
+            cached = (mtime, {})
+        current_app.extensions['static_manifest'] = cached
+    return cached[1]
+
+
+def serve_asset(filename: str, prefix: str = '') -> Response:
+    """Serve a file from the static folder, precompressed and with cache headers.
+
+    Fingerprinted files are cached for a year as immutable; everything else
+    (index.html in particular) must be revalidated, which the content ETag
+    turns into a 304. Raises NotFound for missing files.
+    """
+    relpath = prefix + filename
+    path = safe_join(current_app.static_folder, relpath)
+    if path is None or not os.path.isfile(path):
+        raise NotFound()
+
+    entry: Optional[Dict[str, Any]] = load_manifest().get(relpath)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    if entry is None:
+        response = send_file(path, mimetype=mimetype, conditional=True)
+    else:
+        available = entry['encodings']
+        encoding = negotiate(request.accept_encodings, [enc for enc in PRECOMPRESSED_ENCODINGS if enc in available])
+        etag = entry['etag']
+        if encoding is not None:
+            path = safe_join(current_app.static_folder, available[encoding])
+            etag = f'{etag}-{encoding}'
+            if path is None or not os.path.isfile(path):
+                encoding, path, etag = None, safe_join(current_app.static_folder, relpath), entry['etag']
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+        if available:
+            response.vary.add('Accept-Encoding')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+
+    if is_hashed(relpath):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+    return response
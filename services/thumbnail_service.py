@@ -0,0 +1,131 @@
+import os
+import tempfile
+from typing import List, Dict, Any, Optional
+
+from PIL import Image
+
+from services.asset_store import get_asset_store, AssetError
+
+
+# Fixed set of derivative widths; requests are served the nearest one
+VARIANT_WIDTHS = (100, 200, 400, 800)
+
+VARIANT_FORMATS = {
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+
+class VariantError(Exception):
+    """Raised when a derivative image cannot be produced."""
+
+
+def nearest_width(width: Optional[int]) -> int:
+    """Smallest variant width that is at least ``width`` (largest if none is)."""
+    if not width:
+        return VARIANT_WIDTHS[-1]
+    for candidate in VARIANT_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return VARIANT_WIDTHS[-1]
+
+
+def variant_name(width: int, fmt: str) -> str:
+    return f'{width}.{fmt}'
+
+
+def variant_path(digest: str, width: int, fmt: str) -> str:
+    """Derivatives live next to their original in the asset store."""
+    return get_asset_store().variant_path(digest, variant_name(width, fmt))
+
+
+def _save(image: Image.Image, path: str, fmt: str) -> None:
+    if fmt == 'jpeg':
+        if image.mode in ('RGBA', 'LA', 'P'):
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        options = {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        options = {'format': 'WEBP', 'quality': 80, 'method': 4}
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        image.save(f, **options)
+    os.replace(tmp_path, path)
+
+
+def generate_variants(source: str, overwrite: bool = False) -> List[Dict[str, Any]]:
+    """Produce every width/format derivative of a source image with a single decode."""
+    store = get_asset_store()
+    try:
+        digest = store.fetch(source)
+        wanted = [
+            (width, fmt) for width in VARIANT_WIDTHS for fmt in VARIANT_FORMATS
+            if overwrite or not os.path.exists(variant_path(digest, width, fmt))
+        ]
+        if wanted:
+            with store.open(source) as data:
+                original = Image.open(data)
+                # Let JPEG decode at reduced scale when only small widths are needed
+                largest = max(width for width, _ in wanted)
+                original.draft('RGB', (largest, max(1, original.height * largest // max(original.width, 1))))
+                original.load()
+    except (AssetError, OSError) as e:
+        raise VariantError(f'Could not load {source}: {e}')
+
+    variants = []
+    current = None
+    # Downscale progressively from the largest width to keep resampling cheap
+    for width in sorted({width for width, _ in wanted}, reverse=True):
+        base = current or original
+        target = min(width, original.width)
+        if base.width != target:
+            height = max(1, round(base.height * target / base.width))
+            current = base.resize((target, height), Image.LANCZOS)
+        else:
+            current = base
+        for fmt in VARIANT_FORMATS:
+            if (width, fmt) in wanted:
+                _save(current, variant_path(digest, width, fmt), fmt)
+                store.add_variant(digest, variant_name(width, fmt))
+
+    for width in VARIANT_WIDTHS:
+        for fmt in VARIANT_FORMATS:
+            variants.append({'width': width, 'format': fmt, 'path': variant_path(digest, width, fmt)})
+    return variants
+
+
+def get_variant(source: str, width: Optional[int] = None, fmt: str = 'webp') -> Dict[str, Any]:
+    """Return the nearest stored variant of a source, generating it on first use."""
+    if fmt not in VARIANT_FORMATS:
+        raise VariantError(f'Unsupported format: {fmt}')
+
+    width = nearest_width(width)
+    store = get_asset_store()
+    # Serve an existing variant straight from disk; only a missing one needs the original
+    digest = store.lookup(source)
+    path = variant_path(digest, width, fmt) if digest else None
+    if path is None or not os.path.exists(path):
+        try:
+            digest = store.fetch(source)
+        except AssetError as e:
+            raise VariantError(str(e))
+        path = variant_path(digest, width, fmt)
+        if not os.path.exists(path):
+            generate_variants(source)
+
+    return {
+        'path': path,
+        'width': width,
+        'format': fmt,
+        'mimetype': VARIANT_FORMATS[fmt],
+        # Derived from the original's content hash, so it changes only when the bytes do
+        'etag': f'{digest[:32]}-{width}-{fmt}',
+    }
@@ -0,0 +1,117 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Callable, Tuple
+
+from flask import current_app, has_app_context
+
+from config import Config
+from services.cache import get_or_refresh, peek, store
+from services.giphy_service import fetch_giphy_trending
+from services.reddit_service import fetch_reddit_hot_feed
+
+
+TRENDING_KEY = 'trending:feed'
+PER_SOURCE_LIMIT = 25
+
+logger = logging.getLogger(__name__)
+
+# Shared by every aggregation so concurrent refreshes cannot pile up threads
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='trending')
+
+
+def _setting(name: str):
+    return current_app.config.get(name, getattr(Config, name)) if has_app_context() else getattr(Config, name)
+
+
+def trending_sources() -> List[Tuple[str, Callable[[float], List[Dict[str, Any]]]]]:
+    """Configured sources as (name, fetch(deadline)) pairs."""
+    sources = [
+        (f'reddit:{name}', lambda deadline, name=name: fetch_reddit_hot_feed(
+            subreddit=name, limit=PER_SOURCE_LIMIT, deadline=deadline))
+        for name in _setting('TRENDING_SUBREDDITS')
+    ]
+    if _setting('TRENDING_INCLUDE_GIPHY'):
+        sources.append(('giphy', lambda deadline: fetch_giphy_trending(limit=PER_SOURCE_LIMIT, deadline=deadline)))
+    return sources
+
+
+def _normalized(items: List[Dict[str, Any]]) -> List[Tuple[float, Dict[str, Any]]]:
+    """Score each item 0..1 within its own source so sources are comparable.
+
+    Reddit scores are divided by the source's best score; sources without
+    scores (Giphy) are ranked by position.
+    """
+    scores = [item.get('score') for item in items]
+    best = max((score for score in scores if score), default=0)
+    if best > 0:
+        return [((item.get('score') or 0) / best, item) for item in items]
+    count = len(items)
+    return [(1 - index / count, item) for index, item in enumerate(items)]
+
+
+def merge_trending(results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Merge per-source lists, keep the best-scored copy of each image, best first."""
+    best: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    for items in results:
+        for score, item in _normalized(items):
+            url = item.get('image_url')
+            if url and (url not in best or score > best[url][0]):
+                best[url] = (score, item)
+    ranked = sorted(best.values(), key=lambda entry: entry[0], reverse=True)
+    return [item for _, item in ranked]
+
+
+def aggregate_trending(deadline: float = None) -> List[Dict[str, Any]]:
+    """Fetch every source concurrently and merge whatever arrives within ``deadline``."""
+    deadline = deadline or _setting('TRENDING_DEADLINE')
+    expires = time.monotonic() + deadline
+    # A source that waits for a free thread only gets what is left of the budget
+    futures = {
+        _executor.submit(lambda fetch=fetch: fetch(max(0.1, expires - time.monotonic()))): name
+        for name, fetch in trending_sources()
+    }
+    done, pending = wait(futures, timeout=max(0, expires - time.monotonic()))
+
+    results = []
+    errors = []
+    for future in done:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            errors.append(e)
+            logger.warning('Trending source %s failed: %s', futures[future], e)
+    for future in pending:
+        future.cancel()
+        logger.warning('Trending source %s missed the %ss deadline', futures[future], deadline)
+
+    if not results and errors:
+        raise errors[0]
+    return merge_trending(results)
+
+
+def refresh_trending_content(cache_ttl=3600, stale_ttl=3600) -> List[Dict[str, Any]]:
+    """Fetch the trending feed now and store it for request handlers to read."""
+    memes = aggregate_trending()
+    if memes:
+        store('trending', TRENDING_KEY, memes, soft_ttl=cache_ttl, hard_ttl=cache_ttl + stale_ttl)
+    return memes
+
+
+def get_trending_content(cache_ttl=3600, stale_ttl=3600) -> List[Dict[str, Any]]:
+    """Get the aggregated trending feed with caching.
+
+    Served stale for up to ``stale_ttl`` seconds past ``cache_ttl`` while a
+    single worker refreshes it. When a scheduled refresher owns the feed
+    (``TRENDING_REFRESHER`` of 'worker' or 'thread') this only reads the cache
+    and returns an empty list until the first refresh lands.
+    """
+    if _setting('TRENDING_REFRESHER') != 'request':
+        return peek(TRENDING_KEY) or []
+    return get_or_refresh(
+        'trending',
+        TRENDING_KEY,
+        aggregate_trending,
+        soft_ttl=cache_ttl,
+        hard_ttl=cache_ttl + stale_ttl
+    )
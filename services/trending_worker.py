@@ -0,0 +1,56 @@
+import threading
+from typing import Optional
+
+from services.trending_service import refresh_trending_content
+
+
+def run_trending_worker(app, interval: int, stop_event: Optional[threading.Event] = None,
+                        iterations: Optional[int] = None) -> None:
+    """Refresh the trending feed every ``interval`` seconds until stopped.
+
+    Failures are logged and retried on the next tick; the previously stored
+    feed keeps being served in the meantime.
+    """
+    stop_event = stop_event or threading.Event()
+    runs = 0
+    while not stop_event.is_set():
+        with app.app_context():
+            try:
+                memes = refresh_trending_content()
+                app.logger.info('Refreshed trending feed (%d items)', len(memes))
+            except Exception as e:
+                app.logger.warning('Trending refresh failed: %s', e)
+        runs += 1
+        if iterations is not None and runs >= iterations:
+            break
+        stop_event.wait(interval)
+
+
+def start_trending_thread(app) -> threading.Event:
+    """Run the refresher in a daemon thread of this process; set the returned event to stop it."""
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=run_trending_worker,
+        args=(app, app.config['TRENDING_REFRESH_INTERVAL'], stop_event),
+        name='trending-refresher',
+        daemon=True
+    )
+    thread.start()
+    app.extensions['trending_refresher'] = stop_event
+    return stop_event
+
+
+_refresher_lock = threading.Lock()
+
+
+def ensure_trending_thread(app) -> None:
+    """Start this process's refresher the first time it serves a request.
+
+    CLI commands, the reloader's watcher process and test apps never serve
+    requests (or are testing), so they never start one.
+    """
+    if 'trending_refresher' in app.extensions or app.testing:
+        return
+    with _refresher_lock:
+        if 'trending_refresher' not in app.extensions:
+            start_trending_thread(app)
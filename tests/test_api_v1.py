@@ -1,5 +1,13 @@
 import unittest
 import json
+import io
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+from PIL import Image
+from sqlalchemy import event
 from datetime import datetime
 from app import create_app
 from extensions import db
@@ -7,6 +15,9 @@ from models import (
     User, MemeTemplate, TemplateCategory, TemplateField,
     Sticker, StickerCategory, Font, Meme, MemeLayer, MemeDraft
 )
+from services.asset_store import AssetStore, AssetError, get_asset_store
+from services.render_service import get_render_store
+import pagination
 from config import Config
 
 
@@ -33,6 +44,28 @@ class APITestCase(unittest.TestCase):
         db.drop_all()
         self.app_context.pop()
 
+    @contextmanager
+    def count_queries(self):
+        """Collect the SQL statements executed inside the block."""
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    def use_render_cache(self):
+        """Point the render cache and asset store at a throwaway directory."""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.app.config['RENDER_CACHE_DIR'] = f'{cache_dir}/renders'
+        self.app.config['ASSET_STORE_DIR'] = f'{cache_dir}/assets'
+        return cache_dir
+
     def setup_test_data(self):
         """Create test data."""
         # Categories
@@ -145,6 +178,47 @@ class APITestCase(unittest.TestCase):
         data = json.loads(response.data)
         self.assertGreater(len(data['items']), 0)
 
+    def test_search_templates(self):
+        """Test GET /api/v1/templates?search= uses ranked indexed search."""
+        cat = TemplateCategory.query.first()
+        for name in ('Distracted Boyfriend', 'Expanding Brain', 'Fake News'):
+            db.session.add(MemeTemplate(name=name, image_url='https://example.com/t.jpg', category=cat))
+        db.session.commit()
+
+        def names(search):
+            response = self.client.get(f'/api/v1/templates?search={search}')
+            self.assertEqual(response.status_code, 200)
+            return [item['name'] for item in json.loads(response.data)['items']]
+
+        self.assertEqual(names('drake'), ['Drake Hotline Bling'])
+        self.assertEqual(names('BRAIN'), ['Expanding Brain'])
+        self.assertEqual(names('Dis'), ['Distracted Boyfriend'])
+        self.assertEqual(names('ex'), ['Expanding Brain'])
+        self.assertEqual(names('ws'), ['Fake News'])
+        # LIKE wildcards are literal
+        self.assertEqual(names('%25'), [])
+        self.assertEqual(names('_'), [])
+        # Typo tolerance
+        self.assertEqual(names('drak hotlin'), ['Drake Hotline Bling'])
+        self.assertEqual(names('distracted boifriend'), ['Distracted Boyfriend'])
+        self.assertEqual(names('zzzz'), [])
+
+    def test_search_index_follows_updates(self):
+        """Test the search index is kept in sync on update and delete."""
+        template = MemeTemplate.query.first()
+        template.name = 'Woman Yelling At Cat'
+        db.session.commit()
+
+        data = json.loads(self.client.get('/api/v1/templates?search=yelling').data)
+        self.assertEqual([item['id'] for item in data['items']], [template.id])
+        data = json.loads(self.client.get('/api/v1/templates?search=drake').data)
+        self.assertEqual(data['items'], [])
+
+        db.session.delete(template)
+        db.session.commit()
+        data = json.loads(self.client.get('/api/v1/templates?search=yelling').data)
+        self.assertEqual(data['items'], [])
+
     def test_get_template_by_id(self):
         """Test GET /api/v1/templates/<id>."""
         template = MemeTemplate.query.first()
@@ -155,11 +229,86 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(data['name'], template.name)
         self.assertIn('fields', data)
 
+    def test_get_templates_query_count(self):
+        """Test template listing loads categories without a query per row."""
+        cat = TemplateCategory.query.first()
+        for i in range(30):
+            db.session.add(MemeTemplate(name=f'Template {i}', image_url=f'https://example.com/{i}.jpg', category=cat))
+        db.session.commit()
+        db.session.expunge_all()
+
+        with self.count_queries() as statements:
+            response = self.client.get('/api/v1/templates?per_page=30')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)['items']), 30)
+        self.assertLessEqual(len(statements), 2)
+
+    def test_get_template_by_id_query_count(self):
+        """Test template detail loads category and fields in a fixed number of queries."""
+        template = MemeTemplate.query.first()
+        template_id = template.id
+        for i in range(5):
+            db.session.add(TemplateField(template=template, name=f'Field {i}'))
+        db.session.commit()
+        db.session.expunge_all()
+
+        with self.count_queries() as statements:
+            response = self.client.get(f'/api/v1/templates/{template_id}')
+        self.assertEqual(len(json.loads(response.data)['fields']), 6)
+        self.assertLessEqual(len(statements), 2)
+
     def test_get_template_not_found(self):
         """Test GET /api/v1/templates/<id> with invalid ID."""
         response = self.client.get('/api/v1/templates/9999')
         self.assertEqual(response.status_code, 404)
 
+    def test_get_templates_lists_variants(self):
+        """Test templates expose a srcset-style variant list."""
+        response = self.client.get('/api/v1/templates')
+        variants = json.loads(response.data)['items'][0]['variants']
+        self.assertIn({'width': 100, 'format': 'webp', 'url': variants[0]['url']}, variants)
+        self.assertTrue(variants[0]['url'].startswith('/api/v1/templates/'))
+
+    def test_get_template_image_variant(self):
+        """Test GET /api/v1/templates/<id>/image serves the nearest variant."""
+        cache_dir = self.use_render_cache()
+        self.app.static_folder = cache_dir
+        Image.new('RGB', (640, 480), (200, 10, 10)).save(os.path.join(cache_dir, 'tmpl.png'))
+        template = MemeTemplate(name='Local', image_url='tmpl.png')
+        db.session.add(template)
+        db.session.commit()
+
+        response = self.client.get(f'/api/v1/templates/{template.id}/image?w=150&fmt=webp')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/webp')
+        self.assertEqual(Image.open(io.BytesIO(response.data)).size, (200, 150))
+        self.assertIn('max-age', response.headers['Cache-Control'])
+
+        etag = response.headers['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        cached = self.client.get(f'/api/v1/templates/{template.id}/image?w=150&fmt=webp',
+                                 headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+
+        # Stored variants are served without going back to the original
+        with mock.patch.object(AssetStore, 'fetch', side_effect=AssetError('unreachable')):
+            again = self.client.get(f'/api/v1/templates/{template.id}/image?w=150&fmt=webp')
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.headers['ETag'], etag)
+        usage = get_asset_store().usage()
+        self.assertEqual(usage['variants'], 8)
+        self.assertGreater(usage['bytes'], os.path.getsize(os.path.join(cache_dir, 'tmpl.png')))
+
+        jpeg = self.client.get(f'/api/v1/templates/{template.id}/image?w=5000&fmt=jpeg')
+        self.assertEqual(jpeg.mimetype, 'image/jpeg')
+        self.assertEqual(Image.open(io.BytesIO(jpeg.data)).size, (640, 480))
+
+    def test_get_template_image_invalid_format(self):
+        """Test GET /api/v1/templates/<id>/image with an unsupported format."""
+        template = MemeTemplate.query.first()
+        response = self.client.get(f'/api/v1/templates/{template.id}/image?fmt=gif')
+        self.assertEqual(response.status_code, 400)
+
     # Stickers test
     def test_get_stickers(self):
         """Test GET /api/v1/stickers."""
@@ -191,6 +340,33 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['name'], 'Impact')
 
+    def test_catalog_responses_cached_until_catalog_changes(self):
+        """Test cached catalog hits skip the database until a catalog write."""
+        first = self.client.get('/api/v1/fonts')
+        with self.count_queries() as statements:
+            second = self.client.get('/api/v1/fonts')
+        self.assertEqual(statements, [])
+        self.assertEqual(first.data, second.data)
+
+        db.session.add(Font(name='Comic Sans', file_path='fonts/Comic.ttf'))
+        db.session.commit()
+
+        data = json.loads(self.client.get('/api/v1/fonts').data)
+        self.assertEqual(sorted(f['name'] for f in data), ['Comic Sans', 'Impact'])
+
+    def test_catalog_cache_keyed_by_query(self):
+        """Test filtered sticker listings are cached separately."""
+        all_stickers = json.loads(self.client.get('/api/v1/stickers').data)
+        filtered = json.loads(self.client.get('/api/v1/stickers?category_id=9999').data)
+        self.assertEqual(len(all_stickers), 1)
+        self.assertEqual(filtered, [])
+
+        sticker = Sticker.query.first()
+        sticker.name = 'Cool Shades'
+        db.session.commit()
+        data = json.loads(self.client.get('/api/v1/stickers').data)
+        self.assertEqual(data[0]['name'], 'Cool Shades')
+
     # Asset categories test
     def test_get_asset_categories(self):
         """Test GET /api/v1/assets/categories."""
@@ -229,6 +405,20 @@ class APITestCase(unittest.TestCase):
         # Will be 200 or 502 depending on API key availability
         self.assertIn(response.status_code, [200, 502])
 
+    def test_get_gifs_with_offset(self):
+        """Test GET /api/v1/gifs?offset= returns a page envelope with next_offset."""
+        def fake_page(query, limit=20, offset=0):
+            return [{'id': str(i), 'title': query, 'source': 'giphy'} for i in range(offset, offset + limit)], 100
+
+        with mock.patch('services.giphy_service.search_gifs_page', side_effect=fake_page):
+            response = self.client.get('/api/v1/gifs?query=Offset%20Cat&offset=10&limit=5')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([item['id'] for item in data['items']], ['10', '11', '12', '13', '14'])
+        self.assertEqual(data['items'][0]['title'], 'offset cat')
+        self.assertEqual(data['next_offset'], 15)
+        self.assertEqual(data['total'], 100)
+
     # Meme tests
     def test_get_memes(self):
         """Test GET /api/v1/memes."""
@@ -241,6 +431,71 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(len(data['items']), 1)
         self.assertEqual(data['items'][0]['title'], 'Test Meme')
 
+    def test_get_memes_query_count(self):
+        """Test a page of 50 memes with 10 layers each costs a fixed number of queries."""
+        for i in range(50):
+            meme = Meme(title=f'Meme {i}')
+            db.session.add(meme)
+            for z in range(10):
+                db.session.add(MemeLayer(meme=meme, layer_type='text', content=f'Layer {z}', z_index=z))
+        db.session.commit()
+        db.session.expunge_all()
+
+        with self.count_queries() as statements:
+            response = self.client.get('/api/v1/memes?per_page=50')
+        data = json.loads(response.data)
+        self.assertEqual(len(data['items']), 50)
+        self.assertTrue(all(len(item['layers']) in (1, 10) for item in data['items']))
+        # page count, page rows, one batched layer load
+        self.assertLessEqual(len(statements), 3)
+
+    def test_get_memes_cursor_pagination(self):
+        """Test GET /api/v1/memes walks every meme once with ?cursor=."""
+        base = datetime(2024, 1, 1)
+        for i in range(24):
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            db.session.add(Meme(title=f'Meme {i}', created_at=base.replace(hour=i // 2)))
+        db.session.commit()
+
+        seen = []
+        cursor = ''
+        while cursor is not None:
+            response = self.client.get(f'/api/v1/memes?per_page=5&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            self.assertNotIn('total', data)
+            seen.extend(item['id'] for item in data['items'])
+            cursor = data['next_cursor']
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+        data = json.loads(self.client.get('/api/v1/memes?cursor=&with_total=1').data)
+        self.assertEqual(data['total'], 25)
+
+    def test_get_memes_invalid_cursor(self):
+        """Test GET /api/v1/memes rejects a malformed cursor."""
+        response = self.client.get('/api/v1/memes?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+    def test_cached_counts_bounded(self):
+        """Test the per-worker count cache keeps only the most recently used keys."""
+        pagination._local_counts.clear()
+        with mock.patch.object(pagination, 'MAX_LOCAL_COUNTS', 3):
+            for i in range(5):
+                response = self.client.get(f'/api/v1/templates?cursor=&with_total=1&search=term{i}')
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(pagination._local_counts), [f'count:templates:None:term{i}' for i in (2, 3, 4)])
+
+    def test_get_memes_without_total(self):
+        """Test GET /api/v1/memes?with_total=0 skips the count query."""
+        with self.count_queries() as statements:
+            response = self.client.get('/api/v1/memes?with_total=0')
+        data = json.loads(response.data)
+        self.assertIsNone(data['total'])
+        self.assertEqual(len(data['items']), 1)
+        self.assertFalse(any('count(' in s.lower() for s in statements))
+
     def test_get_meme_by_id(self):
         """Test GET /api/v1/memes/<id>."""
         meme = Meme.query.first()
@@ -281,6 +536,51 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(data['title'], 'New Meme')
         self.assertIn('id', data)
 
+    def test_create_memes_batch(self):
+        """Test POST /api/v1/memes/batch creates valid items and reports the rest in order."""
+        template = MemeTemplate.query.first()
+        layer = {'layer_type': 'text', 'content': 'Hi'}
+        payload = {'memes': [
+            {'title': 'First', 'template_id': template.id, 'layers': [layer, dict(layer, z_index=2)]},
+            {'image_url': 'https://example.com/no-title.jpg'},
+            {'title': 'Bad template', 'template_id': 9999},
+            {'title': 'Last', 'layers': [layer]},
+        ]}
+
+        with self.count_queries() as queries:
+            response = self.client.post('/api/v1/memes/batch', json=payload)
+        self.assertEqual(response.status_code, 207)
+        data = json.loads(response.data)
+        self.assertEqual((data['created'], data['failed']), (2, 2))
+
+        results = data['results']
+        self.assertEqual([r['index'] for r in results], [0, 1, 2, 3])
+        self.assertIn('title', results[1]['errors'])
+        self.assertIn('template_id', results[2]['errors'])
+        self.assertIsNone(results[2]['id'])
+
+        first = db.session.get(Meme, results[0]['id'])
+        self.assertEqual(first.title, 'First')
+        self.assertEqual([l.z_index for l in first.layers], [0, 2])
+        self.assertEqual(len(db.session.get(Meme, results[3]['id']).layers), 1)
+        # Reference checks, one meme insert and one layer insert regardless of batch size
+        self.assertLessEqual(len(queries), 6)
+
+    def test_create_memes_batch_validation(self):
+        """Test POST /api/v1/memes/batch rejects an empty or all-invalid batch."""
+        self.assertEqual(self.client.post('/api/v1/memes/batch', json={'memes': []}).status_code, 400)
+        response = self.client.post('/api/v1/memes/batch', json={'memes': [{'layers': []}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.data)['failed'], 1)
+
+        response = self.client.post('/api/v1/memes/batch', json={'memes': [1, {'title': 'Kept'}, 'x', None]})
+        self.assertEqual(response.status_code, 207)
+        results = json.loads(response.data)['results']
+        self.assertEqual([r.get('errors') for r in results], [
+            {'0': ['Must be an object.']}, None, {'2': ['Must be an object.']}, {'3': ['Must be an object.']}
+        ])
+        self.assertEqual(Meme.query.filter_by(title='Kept').count(), 1)
+
     def test_create_meme_validation(self):
         """Test POST /api/v1/memes with invalid data."""
         payload = {
@@ -295,6 +595,160 @@ class APITestCase(unittest.TestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    # Render tests
+    def test_render_meme(self):
+        """Test POST /api/v1/memes/render with text-only layers."""
+        self.use_render_cache()
+        meme = Meme(title='Text Only')
+        db.session.add(meme)
+        db.session.flush()
+        db.session.add(MemeLayer(
+            meme=meme, layer_type='text', content='Hello',
+            properties={'x': 10, 'y': 10, 'fontSize': 24, 'color': '#FF0000'}
+        ))
+        db.session.commit()
+
+        response = self.client.post(
+            '/api/v1/memes/render',
+            data=json.dumps({'meme_id': meme.id, 'format': 'webp'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertFalse(data['cached'])
+        self.assertTrue(data['url'].endswith('.webp'))
+
+        image = self.client.get(data['url'])
+        self.assertEqual(image.status_code, 200)
+        self.assertEqual(image.mimetype, 'image/webp')
+        self.assertIn('immutable', image.headers['Cache-Control'])
+
+        not_modified = self.client.get(data['url'], headers={'If-None-Match': f'"{data["key"]}"'})
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_render_meme_identical_compositions_share_cache(self):
+        """Test identical memes are rendered once and served from cache."""
+        self.use_render_cache()
+        meme_ids = []
+        for title in ('First', 'Second'):
+            meme = Meme(title=title)
+            db.session.add(meme)
+            db.session.flush()
+            db.session.add(MemeLayer(meme=meme, layer_type='text', content='Same', properties={'x': 5, 'y': 5}))
+            meme_ids.append(meme.id)
+        db.session.commit()
+
+        results = [
+            json.loads(self.client.post(
+                '/api/v1/memes/render',
+                data=json.dumps({'meme_id': meme_id}),
+                content_type='application/json'
+            ).data)
+            for meme_id in meme_ids
+        ]
+        self.assertEqual(results[0]['key'], results[1]['key'])
+        self.assertFalse(results[0]['cached'])
+        self.assertTrue(results[1]['cached'])
+
+    def test_render_meme_malformed_properties(self):
+        """Test POST /api/v1/memes/render rejects non-numeric layer properties."""
+        self.use_render_cache()
+        for properties in ({'fontSize': '20px'}, {'x': 'left'}, {'rotation': [90]}, {'opacity': 'half'}):
+            meme = Meme(title='Malformed')
+            db.session.add(meme)
+            db.session.flush()
+            db.session.add(MemeLayer(meme=meme, layer_type='text', content='Hi', properties=properties))
+            db.session.commit()
+
+            response = self.client.post('/api/v1/memes/render', json={'meme_id': meme.id})
+            self.assertEqual(response.status_code, 400, properties)
+            self.assertIn('must be a number', json.loads(response.data)['message'])
+
+    def test_render_meme_oversized_properties_clamped(self):
+        """Test POST /api/v1/memes/render clamps huge sizes instead of allocating them."""
+        cache_dir = self.use_render_cache()
+        self.app.static_folder = cache_dir
+        Image.new('RGB', (20, 20), (0, 0, 255)).save(os.path.join(cache_dir, 'sticker.png'))
+        meme = Meme(title='Huge')
+        db.session.add(meme)
+        db.session.flush()
+        db.session.add_all([
+            MemeLayer(meme=meme, layer_type='sticker', content='sticker.png',
+                      properties={'width': 100000, 'height': 100000, 'x': -1e9, 'rotation': 1e12}),
+            MemeLayer(meme=meme, layer_type='text', content='Big',
+                      properties={'fontSize': '100000', 'strokeWidth': 1e6, 'shadowBlur': 1e6,
+                                  'shadowColor': '#000', 'shadowOffsetX': -1e6}),
+        ])
+        db.session.commit()
+
+        with mock.patch('services.render_service.Image.Image.resize', autospec=True,
+                        side_effect=Image.Image.resize) as resize:
+            response = self.client.post('/api/v1/memes/render', json={'meme_id': meme.id})
+        self.assertEqual(response.status_code, 200)
+        sizes = [call.args[1] for call in resize.call_args_list]
+        self.assertIn((1600, 1600), sizes)
+        rendered = Image.open(io.BytesIO(self.client.get(json.loads(response.data)['url']).data))
+        self.assertEqual(rendered.size, (400, 400))
+
+    def test_render_meme_long_text_capped(self):
+        """Test POST /api/v1/memes/render cuts off huge text instead of allocating for it."""
+        self.use_render_cache()
+        meme = Meme(title='Wall of text')
+        db.session.add(meme)
+        db.session.flush()
+        db.session.add(MemeLayer(meme=meme, layer_type='text', content='W' * 1000000, properties={'fontSize': 400}))
+        db.session.commit()
+
+        with mock.patch('services.render_service.Image.new', side_effect=Image.new) as new:
+            response = self.client.post('/api/v1/memes/render', json={'meme_id': meme.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(max(max(call.args[1]) for call in new.call_args_list), 1600)
+
+    def test_render_cache_budget(self):
+        """Test renders are evicted least recently used first once over RENDER_CACHE_MAX_BYTES."""
+        self.use_render_cache()
+        meme = Meme(title='Filtered')
+        db.session.add(meme)
+        db.session.flush()
+        db.session.add(MemeLayer(meme=meme, layer_type='text', content='Hi', properties={'x': 5, 'y': 5}))
+        db.session.commit()
+
+        response = self.client.post('/api/v1/memes/render', json={'meme_id': meme.id, 'filters': None})
+        self.assertEqual(response.status_code, 200)
+        size = get_render_store().usage()['bytes']
+        self.app.config['RENDER_CACHE_MAX_BYTES'] = size * 3
+        self.app.extensions.pop('render_store')
+
+        urls = []
+        for brightness in range(101, 111):
+            response = self.client.post('/api/v1/memes/render',
+                                        json={'meme_id': meme.id, 'filters': {'brightness': brightness}})
+            self.assertEqual(response.status_code, 200)
+            urls.append(json.loads(response.data)['url'])
+        self.assertLessEqual(get_render_store().usage()['bytes'], size * 3)
+        self.assertEqual(self.client.get(urls[0]).status_code, 404)
+        self.assertEqual(self.client.get(urls[-1]).status_code, 200)
+
+    def test_render_meme_not_found(self):
+        """Test POST /api/v1/memes/render with an unknown meme."""
+        self.use_render_cache()
+        response = self.client.post(
+            '/api/v1/memes/render',
+            data=json.dumps({'meme_id': 9999}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_render_meme_invalid_format(self):
+        """Test POST /api/v1/memes/render with an unsupported format."""
+        meme = Meme.query.first()
+        response = self.client.post(
+            '/api/v1/memes/render',
+            data=json.dumps({'meme_id': meme.id, 'format': 'bmp'}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
     # Draft tests
     def test_create_draft(self):
         """Test POST /api/v1/memes/draft."""
@@ -362,6 +816,65 @@ class APITestCase(unittest.TestCase):
         data = json.loads(response.data)
         self.assertEqual(data['title'], 'Updated Draft')
 
+    def test_patch_draft(self):
+        """Test PATCH /api/v1/memes/draft/<id> applies a JSON Patch and bumps the version."""
+        draft = MemeDraft(title='Patch me', data={'layers': [{'text': 'Hello'}], 'filters': {}})
+        db.session.add(draft)
+        db.session.commit()
+        self.assertEqual(draft.version, 1)
+
+        patch = [
+            {'op': 'replace', 'path': '/layers/0/text', 'value': 'Hello!'},
+            {'op': 'add', 'path': '/layers/-', 'value': {'text': 'Bottom'}},
+            {'op': 'add', 'path': '/filters/blur', 'value': 2},
+        ]
+        response = self.client.patch(f'/api/v1/memes/draft/{draft.id}', json={'version': 1, 'patch': patch})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['version'], 2)
+
+        data = json.loads(self.client.get(f'/api/v1/memes/draft/{draft.id}').data)
+        self.assertEqual(data['data'], {'layers': [{'text': 'Hello!'}, {'text': 'Bottom'}], 'filters': {'blur': 2}})
+        self.assertEqual(data['version'], 2)
+
+        # Raw patch array with the version in If-Match
+        response = self.client.patch(
+            f'/api/v1/memes/draft/{draft.id}', json=[{'op': 'remove', 'path': '/filters/blur'}],
+            headers={'If-Match': '"2"'}
+        )
+        self.assertEqual(json.loads(response.data)['version'], 3)
+
+    def test_patch_draft_conflicts(self):
+        """Test PATCH /api/v1/memes/draft/<id> rejects stale versions and bad patches."""
+        draft = MemeDraft(title='Patch me', data={'title': 'a'})
+        db.session.add(draft)
+        db.session.commit()
+        url = f'/api/v1/memes/draft/{draft.id}'
+        replace = [{'op': 'replace', 'path': '/title', 'value': 'b'}]
+
+        self.assertEqual(self.client.patch(url, json={'version': 1, 'patch': replace}).status_code, 200)
+        # A second writer still on version 1 loses
+        response = self.client.patch(url, json={'version': 1, 'patch': replace})
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('version 2', json.loads(response.data)['message'])
+
+        self.assertEqual(self.client.patch(url, json=replace).status_code, 428)
+        bad_path = [{'op': 'remove', 'path': '/missing'}]
+        self.assertEqual(self.client.patch(url, json={'version': 2, 'patch': bad_path}).status_code, 422)
+        failed_test = [{'op': 'test', 'path': '/title', 'value': 'a'}]
+        self.assertEqual(self.client.patch(url, json={'version': 2, 'patch': failed_test}).status_code, 409)
+        # Full replacement can opt in to the same check
+        response = self.client.put(url, json={'title': 'x', 'data': {}, 'version': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(db.session.get(MemeDraft, draft.id).data, {'title': 'b'})
+
+        # A malformed version is an error, never an unversioned overwrite
+        for version in ('abc', None, True, 1.5, [2]):
+            response = self.client.put(url, json={'title': 'x', 'data': {}, 'version': version})
+            self.assertEqual(response.status_code, 400, version)
+        self.assertEqual(self.client.put(url, json={'title': 'x', 'data': {}}, headers={'If-Match': '"v2"'}).status_code, 400)
+        self.assertEqual(self.client.patch(url, json={'version': 'two', 'patch': replace}).status_code, 400)
+        self.assertEqual(db.session.get(MemeDraft, draft.id).data, {'title': 'b'})
+
     def test_delete_draft(self):
         """Test DELETE /api/v1/memes/draft/<id>."""
         # Create a draft first
@@ -401,6 +914,24 @@ class APITestCase(unittest.TestCase):
         self.assertIn('items', data)
         self.assertGreater(len(data['items']), 0)
 
+    def test_draft_data_compressed_and_deferred(self):
+        """Test draft payloads are stored compressed and never loaded by the list endpoint."""
+        composition = {'layers': [{'type': 'image', 'src': 'data:image/png;base64,' + 'AAAA' * 5000}]}
+        response = self.client.post('/api/v1/memes/draft', json={'title': 'Big', 'user_id': 1, 'data': composition})
+        draft_id = json.loads(response.data)['id']
+
+        draft = db.session.get(MemeDraft, draft_id)
+        self.assertLess(draft.data_size * 5, len(json.dumps(composition)))
+        self.assertEqual(json.loads(self.client.get(f'/api/v1/memes/draft/{draft_id}').data)['data'], composition)
+
+        with self.count_queries() as statements:
+            self.client.get('/api/v1/memes/drafts?per_page=50')
+        page_query = next(s for s in statements if 'LIMIT' in s)
+        self.assertNotIn('meme_draft.data AS', page_query)
+
+        stats = json.loads(self.client.get('/api/v1/stats/drafts?user_id=1').data)
+        self.assertEqual(stats, [{'user_id': 1, 'drafts': 1, 'stored_bytes': draft.data_size}])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,197 @@
+import unittest
+import io
+import os
+import random
+import shutil
+import socket
+import tempfile
+import time
+from unittest import mock
+from PIL import Image
+from services.asset_store import AssetStore, AssetError, TOUCH_INTERVAL
+
+
+def png(seed, side=10):
+    """Small PNG of noise, about 100 + 3 * side**2 bytes."""
+    image = Image.frombytes('RGB', (side, side), random.Random(seed).randbytes(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def resolves_to(*addresses):
+    return mock.patch('services.asset_store.socket.getaddrinfo', return_value=[
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, 0)) for address in addresses
+    ])
+
+
+def remote_response(chunks, headers=None):
+    response = mock.MagicMock()
+    response.__enter__.return_value = response
+    response.is_redirect = False
+    response.headers = headers or {}
+    response.iter_content.return_value = chunks
+    return response
+
+
+def remote_get(response=None):
+    """Patch the shared HTTP client; returns the patched ``get``."""
+    client = mock.patch('services.asset_store.get_http_client').start().return_value
+    client.get.return_value = response
+    return client.get
+
+
+class AssetStoreTestCase(unittest.TestCase):
+    """Test cases for the content-addressed asset store."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.static, ignore_errors=True)
+        self.store = AssetStore(self.root, max_bytes=1000, static_folder=self.static)
+        self.addCleanup(mock.patch.stopall)
+
+    def write_static(self, name, data):
+        with open(os.path.join(self.static, name), 'wb') as f:
+            f.write(data)
+
+    def last_access(self, digest):
+        with self.store._connect() as conn:
+            return conn.execute('SELECT last_access FROM blobs WHERE digest = ?', (digest,)).fetchone()[0]
+
+    def test_fetch_stores_by_content_hash(self):
+        self.write_static('a.png', png(1))
+        self.write_static('b.png', png(1))
+
+        digest_a = self.store.fetch('a.png')
+        digest_b = self.store.fetch('/b.png')
+
+        self.assertEqual(digest_a, digest_b)
+        self.assertTrue(os.path.exists(self.store.blob_path(digest_a)))
+        self.assertEqual(self.store.usage()['blobs'], 1)
+
+    def test_open_returns_memory_map(self):
+        self.write_static('a.png', png(1))
+        with self.store.open('a.png') as data:
+            self.assertEqual(data[:], png(1))
+
+    def test_remote_source_fetched_once(self):
+        image = png(2)
+        response = remote_response([image[:50], image[50:]])
+
+        get = remote_get(response)
+        with resolves_to('93.184.216.34'):
+            self.store.fetch('https://example.com/t.jpg')
+            with self.store.open('https://example.com/t.jpg') as data:
+                self.assertEqual(data[:], image)
+
+        self.assertEqual(get.call_count, 1)
+
+    def test_lru_eviction(self):
+        for seed, name in enumerate(('old.png', 'recent.png', 'new.png')):
+            self.write_static(name, png(seed))
+
+        old = self.store.fetch('old.png')
+        recent = self.store.fetch('recent.png')
+        self.store.fetch('recent.png')  # touch
+        new = self.store.fetch('new.png')
+
+        self.assertLessEqual(self.store.usage()['bytes'], 1000)
+        self.assertFalse(os.path.exists(self.store.blob_path(old)))
+        self.assertTrue(os.path.exists(self.store.blob_path(recent)))
+        self.assertTrue(os.path.exists(self.store.blob_path(new)))
+
+    def test_lookup_touches_at_most_once_per_interval(self):
+        self.write_static('a.png', png(1))
+        digest = self.store.fetch('a.png')
+        with mock.patch('services.asset_store.time.time', return_value=time.time() + 10):
+            self.store.lookup('a.png')
+        self.assertLess(self.last_access(digest), time.time() + 5)
+        later = time.time() + TOUCH_INTERVAL + 10
+        with mock.patch('services.asset_store.time.time', return_value=later):
+            self.store.lookup('a.png')
+        self.assertEqual(self.last_access(digest), later)
+
+    def test_variants_count_towards_budget(self):
+        self.write_static('old.png', png(1))
+        self.write_static('new.png', png(2))
+        old = self.store.fetch('old.png')
+        path = self.store.variant_path(old, '100.webp')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(b'v' * 300)
+        self.store.add_variant(old, '100.webp')
+        usage = self.store.usage()
+        self.assertEqual((usage['variants'], usage['bytes']), (1, len(png(1)) + 300))
+
+        # The new blob fits only once the old one goes, variants and all
+        new = self.store.fetch('new.png')
+        self.assertFalse(os.path.exists(path))
+        self.assertIsNone(self.store.lookup('old.png'))
+        self.assertEqual(self.store.lookup('new.png'), new)
+        self.assertEqual(self.store.usage()['variants'], 0)
+
+    def test_internal_addresses_rejected(self):
+        get = remote_get()
+        for address in ('127.0.0.1', '10.0.0.5', '169.254.169.254', '::1', 'fd00::1'):
+            with resolves_to('93.184.216.34', address), self.assertRaises(AssetError):
+                self.store.fetch('http://internal.example/meta')
+        with self.assertRaises(AssetError):
+            self.store.fetch('file:///etc/passwd')
+        get.assert_not_called()
+
+    def test_redirect_to_internal_address_rejected(self):
+        redirect = remote_response([])
+        redirect.is_redirect = True
+        redirect.headers = {'Location': 'http://169.254.169.254/latest/meta-data/'}
+        get = remote_get(redirect)
+        with mock.patch('services.asset_store.socket.getaddrinfo', side_effect=[
+                    [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('93.184.216.34', 0))],
+                    [(socket.AF_INET, socket.SOCK_STREAM, 6, '', ('169.254.169.254', 0))],
+                ]):
+            with self.assertRaises(AssetError):
+                self.store.fetch('https://example.com/t.jpg')
+        self.assertEqual(get.call_count, 1)
+
+    def test_allowed_hosts(self):
+        store = AssetStore(self.root, max_bytes=1000, allowed_hosts=['i.imgur.com'])
+        with self.assertRaises(AssetError):
+            store.check_url('https://example.com/t.jpg')
+        store.check_url('https://I.imgur.com/t.jpg')
+
+    def test_oversized_source_rejected(self):
+        store = AssetStore(self.root, max_bytes=10000, static_folder=self.static, max_source_bytes=300)
+        with resolves_to('93.184.216.34'):
+            get = remote_get(remote_response([b'x' * 200] * 10))
+            with self.assertRaises(AssetError):
+                store.fetch('https://example.com/big.jpg')
+            declared = get.return_value = remote_response([], headers={'Content-Length': str(10 ** 9)})
+            with self.assertRaises(AssetError):
+                store.fetch('https://example.com/huge.jpg')
+            declared.iter_content.assert_not_called()
+        self.write_static('big.png', png(3, side=20))
+        with self.assertRaises(AssetError):
+            store.fetch('big.png')
+        self.assertEqual(store.usage()['blobs'], 0)
+        self.assertFalse([f for f in os.listdir(self.root) if f.endswith('.tmp')])
+
+    def test_non_image_rejected(self):
+        self.write_static('page.png', b'<html>not an image</html>')
+        with self.assertRaises(AssetError):
+            self.store.fetch('page.png')
+        self.assertEqual(self.store.usage()['blobs'], 0)
+
+    def test_path_outside_static_rejected(self):
+        with self.assertRaises(AssetError):
+            self.store.fetch('../secret.txt')
+
+    def test_missing_source(self):
+        with self.assertRaises(AssetError):
+            self.store.fetch('missing.png')
+        self.assertEqual(os.listdir(self.root).count('index.sqlite'), 1)
+        self.assertFalse([f for f in os.listdir(self.root) if f.endswith('.tmp')])
+
+
+if __name__ == '__main__':
+    unittest.main()
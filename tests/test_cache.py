@@ -0,0 +1,113 @@
+import unittest
+import threading
+import time
+from unittest import mock
+import extensions
+from services.cache import get_or_refresh, cache_stats, reset_cache_stats, clear_local_cache, _local_locks, CacheTimeout
+
+
+class CacheTestCase(unittest.TestCase):
+    """Test cases for the single-flight, stale-while-revalidate cache (local fallback)."""
+
+    def setUp(self):
+        self.redis_patch = mock.patch.object(extensions, 'redis_client', None)
+        self.redis_patch.start()
+        self.addCleanup(self.redis_patch.stop)
+        clear_local_cache()
+        reset_cache_stats()
+        self.calls = 0
+
+    def fetch(self, delay=0, value='fresh'):
+        def run():
+            self.calls += 1
+            time.sleep(delay)
+            return [value, self.calls]
+        return run
+
+    def test_hit_after_miss(self):
+        first = get_or_refresh('test', 'k', self.fetch(), soft_ttl=60, hard_ttl=120)
+        second = get_or_refresh('test', 'k', self.fetch(), soft_ttl=60, hard_ttl=120)
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(cache_stats()['test'], {'miss': 1, 'refresh': 1, 'hit': 1})
+
+    def test_concurrent_misses_fetch_once(self):
+        results = []
+
+        def worker():
+            results.append(get_or_refresh('test', 'k', self.fetch(delay=0.2), soft_ttl=60, hard_ttl=120))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(cache_stats()['test']['wait_hit'], 9)
+
+    def test_stale_value_served_while_refreshing(self):
+        get_or_refresh('test', 'k', self.fetch(value='old'), soft_ttl=0, hard_ttl=120)
+
+        start = time.monotonic()
+        stale = get_or_refresh('test', 'k', self.fetch(delay=0.3, value='new'), soft_ttl=60, hard_ttl=120)
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(stale[0], 'old')
+
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline and cache_stats()['test'].get('refresh', 0) < 2:
+            time.sleep(0.05)
+        fresh = get_or_refresh('test', 'k', self.fetch(value='unused'), soft_ttl=60, hard_ttl=120)
+        self.assertEqual(fresh[0], 'new')
+        self.assertEqual(cache_stats()['test']['stale'], 1)
+
+    def test_failed_fetch_not_cached(self):
+        def failing():
+            raise RuntimeError('upstream down')
+
+        with self.assertRaises(RuntimeError):
+            get_or_refresh('test', 'k', failing, soft_ttl=60, hard_ttl=120)
+        # Lock was released, so the next caller fetches again
+        self.assertEqual(get_or_refresh('test', 'k', self.fetch(), soft_ttl=60, hard_ttl=120)[0], 'fresh')
+        self.assertEqual(cache_stats()['test']['refresh_error'], 1)
+
+    def test_empty_results_not_cached(self):
+        get_or_refresh('test', 'k', lambda: [], soft_ttl=60, hard_ttl=120)
+        self.assertEqual(get_or_refresh('test', 'k', self.fetch(), soft_ttl=60, hard_ttl=120)[0], 'fresh')
+
+    def test_waiters_time_out_instead_of_fetching(self):
+        outcomes = []
+
+        def worker(delay):
+            try:
+                outcomes.append(get_or_refresh('test', 'k', self.fetch(delay=delay), soft_ttl=60, hard_ttl=120))
+            except CacheTimeout:
+                outcomes.append('timeout')
+
+        with mock.patch('services.cache.MISS_WAIT', 0.1):
+            holder = threading.Thread(target=worker, args=(0.5,))
+            holder.start()
+            time.sleep(0.05)
+            waiters = [threading.Thread(target=worker, args=(0,)) for _ in range(5)]
+            for t in waiters:
+                t.start()
+            for t in waiters + [holder]:
+                t.join()
+
+        # Only the lock holder reached the upstream
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(outcomes.count('timeout'), 5)
+        self.assertEqual(cache_stats()['test']['wait_timeout'], 5)
+
+    def test_local_locks_dropped_after_refresh(self):
+        for i in range(50):
+            get_or_refresh('test', f'k{i}', self.fetch(), soft_ttl=60, hard_ttl=120)
+        with self.assertRaises(RuntimeError):
+            get_or_refresh('test', 'failing', mock.Mock(side_effect=RuntimeError), soft_ttl=60, hard_ttl=120)
+        self.assertEqual(_local_locks, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+import unittest
+import io
+import json
+from datetime import datetime
+from unittest import mock
+from app import create_app
+from config import Config
+from extensions import db
+from models import MemeTemplate, TemplateCategory, TemplateField, Sticker, StickerCategory, Font
+from catalog_import import import_catalog, copy_buffer, CatalogImporter
+from services.catalog_cache import catalog_version
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+
+
+def jsonl(records):
+    return io.StringIO(''.join(json.dumps(record) + '\n' for record in records))
+
+
+class CatalogImportTestCase(unittest.TestCase):
+    """Test cases for the bulk catalog import."""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def records(self, suffix='.jpg'):
+        templates = [
+            {'name': f'Template {i}', 'image_url': f'https://example.com/{i}{suffix}',
+             'category': ['Classic', 'Modern'][i % 2],
+             'fields': [{'name': 'Top Text', 'x_pos': 10, 'y_pos': 10, 'width': 380, 'height': 80}]}
+            for i in range(25)
+        ]
+        return templates + [
+            {'type': 'sticker', 'name': 'Troll Face', 'image_url': 'stickers/trollface.png', 'category': 'Faces'},
+            {'type': 'font', 'name': 'Impact', 'file_path': 'fonts/Impact.ttf'},
+        ]
+
+    def test_import_jsonl(self):
+        version = catalog_version()
+        stats, errors = import_catalog(jsonl(self.records()), 'jsonl', batch_size=10)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(stats['inserted'], 27)
+        self.assertEqual(MemeTemplate.query.count(), 25)
+        self.assertEqual(TemplateField.query.count(), 25)
+        self.assertEqual({c.name for c in TemplateCategory.query}, {'Classic', 'Modern'})
+        self.assertEqual(Sticker.query.one().category.name, 'Faces')
+        self.assertEqual(StickerCategory.query.count(), 1)
+        self.assertEqual(Font.query.one().file_path, 'fonts/Impact.ttf')
+        self.assertGreater(catalog_version(), version)
+
+    def test_reimport_is_idempotent(self):
+        import_catalog(jsonl(self.records()), 'jsonl', batch_size=10)
+        stats, _ = import_catalog(jsonl(self.records()), 'jsonl', batch_size=10)
+        self.assertEqual(stats['inserted'], 0)
+        self.assertEqual(stats['updated'], 0)
+        self.assertEqual(stats['unchanged'], 27)
+        self.assertEqual(MemeTemplate.query.count(), 25)
+        self.assertEqual(TemplateField.query.count(), 25)
+
+        stats, _ = import_catalog(jsonl(self.records(suffix='.png')), 'jsonl', batch_size=10)
+        self.assertEqual(stats['updated'], 25)
+        self.assertTrue(MemeTemplate.query.first().image_url.endswith('.png'))
+
+    def test_invalid_rows_skipped(self):
+        stream = io.StringIO('{"name": "Good"}\n{not json\n{"type": "widget", "name": "x"}\n{"image_url": "a"}\n')
+        stats, errors = import_catalog(stream, 'jsonl')
+        self.assertEqual(stats['inserted'], 1)
+        self.assertEqual(stats['skipped'], 3)
+        self.assertEqual([error.split(':')[0] for error in errors], ['line 2', 'line 3', 'line 4'])
+
+    def test_import_csv(self):
+        stream = io.StringIO(
+            'type,name,image_url,category,fields\n'
+            'template,Drake,https://example.com/d.jpg,Classic,"[{""name"": ""Top""}, {""name"": ""Bottom""}]"\n'
+            'sticker,Cool,stickers/cool.png,Objects,\n'
+        )
+        stats, errors = import_catalog(stream, 'csv')
+        self.assertEqual(errors, [])
+        self.assertEqual(stats['inserted'], 2)
+        self.assertEqual([f.name for f in MemeTemplate.query.one().fields], ['Top', 'Bottom'])
+
+    def test_invalid_fields_skipped(self):
+        font = Font(name='Impact')
+        db.session.add(font)
+        db.session.commit()
+        bad_fields = [
+            [{'name': 'Top', 'x_pos': '10'}],
+            [{'name': 'Top', 'width': True}],
+            [{'name': 'Top', 'height': 2 ** 40}],
+            [{'name': ['Top']}],
+            [{'name': 'Top', 'default_color': 'white'}],
+            [{'name': 'Top', 'default_font_id': font.id + 1}],
+        ]
+        records = [{'name': f'Bad {i}', 'fields': fields} for i, fields in enumerate(bad_fields)]
+        records += [
+            {'name': 'Bad category', 'category': {'name': 'Classic'}},
+            {'name': 'Good', 'fields': [{'name': 'Top', 'x_pos': 1, 'default_font_id': font.id}]},
+        ]
+        stats, errors = import_catalog(jsonl(records), 'jsonl')
+
+        self.assertEqual((stats['inserted'], stats['skipped']), (1, 7))
+        self.assertEqual(len(errors), 7)
+        self.assertIn('fields[0].x_pos', errors[0])
+        self.assertIn('unknown font ids', errors[-1])
+        self.assertEqual([t.name for t in MemeTemplate.query], ['Good'])
+        self.assertEqual(TemplateField.query.one().default_font_id, font.id)
+
+    def test_database_errors_reported_per_row(self):
+        db.session.execute(db.text(
+            "CREATE TRIGGER reject_font BEFORE INSERT ON font WHEN NEW.name = 'Broken' "
+            "BEGIN SELECT RAISE(ABORT, 'broken font'); END"
+        ))
+        db.session.commit()
+        records = self.records()[:3] + [{'type': 'font', 'name': 'Broken', 'file_path': 'fonts/b.ttf'}]
+        stats, errors = import_catalog(jsonl(records), 'jsonl')
+
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('line 4: rejected by the database'))
+        self.assertIn('broken font', errors[0])
+        self.assertEqual((stats['inserted'], stats['skipped']), (3, 1))
+        self.assertEqual(MemeTemplate.query.count(), 3)
+        self.assertEqual(TemplateField.query.count(), 3)
+        self.assertEqual(Font.query.count(), 0)
+
+    def test_fields_rewritten_only_when_changed(self):
+        import_catalog(jsonl(self.records()), 'jsonl')
+        field_ids = [f.id for f in TemplateField.query.order_by(TemplateField.id)]
+
+        import_catalog(jsonl(self.records()), 'jsonl')
+        self.assertEqual([f.id for f in TemplateField.query.order_by(TemplateField.id)], field_ids)
+
+        records = self.records()
+        records[0]['fields'][0]['width'] = 200
+        stats, _ = import_catalog(jsonl(records), 'jsonl')
+        self.assertEqual((stats['updated'], stats['unchanged']), (1, 26))
+        template = MemeTemplate.query.filter_by(name='Template 0').one()
+        self.assertEqual([f.width for f in template.fields], [200])
+        self.assertEqual(TemplateField.query.count(), 25)
+
+    def test_copy_buffer_keeps_null_apart_from_empty(self):
+        buffer = copy_buffer(['a', 'b', 'c', 'd', 'e'], [
+            {'a': None, 'b': 'x', 'c': None, 'd': 3, 'e': '\\N'},
+            {'a': 'say "hi"', 'b': '', 'c': 'two\nlines', 'd': 1.5, 'e': datetime(2024, 1, 2, 3, 4, 5)},
+        ])
+        self.assertEqual(buffer.getvalue(), (
+            '\\N,"x",\\N,3,"\\N"\n'
+            '"say ""hi""","","two\nlines",1.5,"2024-01-02 03:04:05"\n'
+        ))
+
+    def test_copy_rows_uses_null_marker(self):
+        copied = []
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def copy_expert(self, sql, buffer):
+                copied.append((sql, buffer.getvalue()))
+
+        connection = mock.MagicMock()
+        connection.connection.driver_connection.cursor.return_value = Cursor()
+        importer = CatalogImporter()
+        with mock.patch.object(db.session, 'connection', return_value=connection):
+            importer.copy_rows(MemeTemplate.__table__, [
+                {'image_url': None, 'category_id': None, 'name': 'Bare'},
+                {'image_url': 'https://example.com/a.jpg', 'category_id': 2, 'name': 'Full'},
+            ])
+
+        sql, data = copied[0]
+        self.assertEqual(sql, "COPY meme_template (image_url, category_id, name, created_at) "
+                              "FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+        bare, full = data.splitlines()
+        self.assertTrue(bare.startswith('\\N,\\N,"Bare",'))
+        self.assertTrue(full.startswith('"https://example.com/a.jpg",2,"Full",'))
+
+
+if __name__ == '__main__':
+    unittest.main()
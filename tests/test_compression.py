@@ -0,0 +1,142 @@
+import unittest
+import gzip
+import json
+import zlib
+from unittest import mock
+from flask import Response
+from app import create_app
+from extensions import db
+from models import Font, MemeDraft
+import compression
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+
+
+class CompressionTestCase(unittest.TestCase):
+    """Test cases for negotiated response compression."""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+
+        @self.app.route('/test/stream')
+        def stream():
+            return Response((json.dumps({'n': i, 'pad': 'x' * 100}) + '\n' for i in range(50)),
+                            mimetype='application/x-ndjson')
+
+        @self.app.route('/test/image')
+        def image():
+            return Response(b'\x89PNG' + b'\x00' * 4096, mimetype='image/png')
+
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        draft = MemeDraft(title='Large', data={'layers': [{'type': 'text', 'text': 'Caption'}] * 200})
+        db.session.add(draft)
+        db.session.add_all([Font(name=f'Font {i}', file_path=f'fonts/font-{i}.ttf') for i in range(40)])
+        db.session.commit()
+        self.draft_url = f'/api/v1/memes/draft/{draft.id}'
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def stats(self):
+        return json.loads(self.client.get('/api/v1/stats/compression').data)
+
+    def test_gzip_negotiated(self):
+        plain = self.client.get(self.draft_url)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+
+        with mock.patch.object(compression, 'brotli', None), mock.patch.object(compression, 'zstandard', None):
+            response = self.client.get(self.draft_url, headers={'Accept-Encoding': 'br, gzip;q=0.8'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response.headers['Content-Length']), len(response.data))
+        self.assertLess(len(response.data) * 5, len(plain.data))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+        gzip_stats = self.stats()['encodings']['gzip']
+        self.assertEqual(gzip_stats['bytes_in'], len(plain.data))
+        self.assertEqual(gzip_stats['bytes_saved'], len(plain.data) - len(response.data))
+
+    def assert_round_trip(self, encoding, decompress, stream_decoder):
+        plain = self.client.get(self.draft_url)
+        response = self.client.get(self.draft_url, headers={'Accept-Encoding': f'{encoding}, gzip;q=0.8'})
+        self.assertEqual(response.headers['Content-Encoding'], encoding)
+        self.assertLess(len(response.data) * 5, len(plain.data))
+        self.assertEqual(decompress(response.data), plain.data)
+        self.assertEqual(self.stats()['encodings'][encoding]['bytes_in'], len(plain.data))
+
+        # Streamed chunks decode as they arrive
+        response = self.client.get('/test/stream', headers={'Accept-Encoding': encoding}, buffered=False)
+        self.assertEqual(response.headers['Content-Encoding'], encoding)
+        self.assertTrue(stream_decoder(next(iter(response.response))).startswith(b'{"n": 0'))
+        response.close()
+
+    @unittest.skipUnless(compression.brotli, 'brotli is not installed')
+    def test_brotli_negotiated(self):
+        brotli = compression.brotli
+        self.assertEqual(compression.available_encodings()[0], 'br')
+        self.assert_round_trip('br', brotli.decompress, brotli.Decompressor().process)
+
+    @unittest.skipUnless(compression.zstandard, 'zstandard is not installed')
+    def test_zstd_negotiated(self):
+        def decompress(data):
+            # Streamed frames carry no content size, so decode through a decompressobj
+            return compression.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+        self.assertIn('zstd', compression.available_encodings())
+        self.assert_round_trip('zstd', decompress, decompress)
+
+    def test_negotiation(self):
+        class Accept:
+            def __init__(self, qualities):
+                self.qualities = qualities
+
+            def quality(self, key):
+                return self.qualities.get(key, 0)
+
+        with mock.patch.object(compression, 'brotli', object()), mock.patch.object(compression, 'zstandard', None):
+            self.assertEqual(compression.negotiate(Accept({'gzip': 1, 'br': 1})), 'br')
+            self.assertEqual(compression.negotiate(Accept({'gzip': 1, 'br': 0.5})), 'gzip')
+            self.assertIsNone(compression.negotiate(Accept({'deflate': 1})))
+
+    def test_skips_small_and_images(self):
+        headers = {'Accept-Encoding': 'gzip'}
+        self.assertNotIn('Content-Encoding', self.client.get('/api/v1/memes/drafts', headers=headers).headers)
+        self.assertNotIn('Content-Encoding', self.client.get('/test/image', headers=headers).headers)
+        self.assertNotIn('Content-Encoding', self.client.get(self.draft_url, headers={'Accept-Encoding': 'gzip;q=0'}).headers)
+        self.assertEqual(self.stats()['skipped'], {'small': 1, 'type': 1, 'not_accepted': 1})
+
+    def test_streamed_response(self):
+        plain = self.client.get('/test/stream').data
+        response = self.client.get('/test/stream', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response.headers)
+
+        # Each chunk is flushed, so the client can decode rows as they arrive
+        decoder = zlib.decompressobj(31)
+        first = decoder.decompress(next(iter(response.response)))
+        self.assertTrue(first.startswith(b'{"n": 0'))
+        response.close()
+        self.assertEqual(gzip.decompress(self.client.get('/test/stream', headers={'Accept-Encoding': 'gzip'}).data), plain)
+
+    def test_cached_bodies_compressed_once(self):
+        headers = {'Accept-Encoding': 'gzip'}
+        first = self.client.get('/api/v1/fonts', headers=headers)
+        second = self.client.get('/api/v1/fonts', headers=headers)
+        self.assertEqual(first.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(self.stats()['encodings']['gzip']['cache_hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
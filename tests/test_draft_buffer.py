@@ -0,0 +1,279 @@
+import unittest
+import json
+import time
+from unittest import mock
+import redis
+from sqlalchemy import event
+import api_v1
+from app import create_app
+import extensions
+from extensions import db
+from models import MemeDraft
+from services import draft_buffer
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+    # Tests flush explicitly instead of waiting for the background thread
+    DRAFT_FLUSH_INTERVAL = 0
+
+
+class FakeRedis:
+    """Just enough of redis-py for the draft buffer, WATCH/MULTI included."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.writes = {}
+
+    def _touch(self, key):
+        self.writes[key] = self.writes.get(key, 0) + 1
+
+    def get(self, key):
+        value = self.values.get(key)
+        return value.encode('utf-8') if value is not None else None
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value):
+        self.values[key] = value
+        self._touch(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+        self._touch(key)
+
+    def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(str(member).encode('utf-8'))
+
+    def srem(self, key, member):
+        self.sets.get(key, set()).discard(str(member).encode('utf-8'))
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.reset()
+
+    def reset(self):
+        self.watched = None
+        self.queued = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.reset()
+
+    def watch(self, key):
+        self.watched = {key: self.client.writes.get(key, 0)}
+
+    def unwatch(self):
+        self.reset()
+
+    def multi(self):
+        self.queued = []
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+
+        def call(*args):
+            # Immediate while watching, like redis-py; queued otherwise
+            if self.watched is not None and self.queued is None:
+                return command(*args)
+            if self.queued is None:
+                self.queued = []
+            self.queued.append((command, args))
+        return call
+
+    def execute(self):
+        watched, queued = self.watched or {}, self.queued or []
+        self.reset()
+        if any(self.client.writes.get(key, 0) != seen for key, seen in watched.items()):
+            raise redis.WatchError('Watched variable changed.')
+        return [command(*args) for command, args in queued]
+
+
+class DraftBufferTestCase(unittest.TestCase):
+    """Test cases for write-behind draft autosaves."""
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        self.redis_patch = mock.patch.object(extensions, 'redis_client', self.redis)
+        self.redis_patch.start()
+        self.addCleanup(self.redis_patch.stop)
+
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        draft = MemeDraft(title='Draft', data={'layers': []})
+        db.session.add(draft)
+        db.session.commit()
+        self.draft_id = draft.id
+        self.url = f'/api/v1/memes/draft/{draft.id}'
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def count_updates(self):
+        updates = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('UPDATE'):
+                updates.append(statement)
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        self.addCleanup(event.remove, engine, 'before_cursor_execute', before_cursor_execute)
+        return updates
+
+    def stored(self):
+        db.session.expire_all()
+        return db.session.get(MemeDraft, self.draft_id)
+
+    def test_autosaves_are_coalesced(self):
+        updates = self.count_updates()
+        for i in range(10):
+            response = self.client.put(f'{self.url}?autosave=1', json={'title': f'Draft {i}'})
+            self.assertEqual(response.status_code, 200)
+            body = json.loads(response.data)
+            self.assertTrue(body['buffered'])
+            self.assertEqual(body['version'], i + 2)
+        self.assertEqual(updates, [])
+        self.assertEqual(self.stored().title, 'Draft')
+
+        # Reads see the latest buffered state
+        data = json.loads(self.client.get(self.url).data)
+        self.assertEqual((data['title'], data['version']), ('Draft 9', 11))
+        items = json.loads(self.client.get('/api/v1/memes/drafts').data)['items']
+        self.assertEqual(items[0]['title'], 'Draft 9')
+
+        self.assertEqual(draft_buffer.flush_drafts(), 1)
+        self.assertEqual(len(updates), 1)
+        self.assertEqual((self.stored().title, self.stored().version), ('Draft 9', 11))
+        self.assertIsNone(draft_buffer.buffered_state(self.draft_id))
+        self.assertEqual(draft_buffer.flush_drafts(), 0)
+
+    def test_patch_autosave_builds_on_buffer(self):
+        self.client.put(f'{self.url}?autosave=1', json={'data': {'layers': [{'text': 'a'}]}})
+        patch = [{'op': 'add', 'path': '/layers/-', 'value': {'text': 'b'}}]
+        response = self.client.patch(f'{self.url}?autosave=1', json={'version': 2, 'patch': patch})
+        self.assertEqual(json.loads(response.data)['version'], 3)
+        # Stale versions are checked against the buffered state, not the row
+        response = self.client.patch(f'{self.url}?autosave=1', json={'version': 1, 'patch': patch})
+        self.assertEqual(response.status_code, 409)
+
+        draft_buffer.flush_drafts()
+        self.assertEqual(self.stored().data, {'layers': [{'text': 'a'}, {'text': 'b'}]})
+
+    def test_explicit_save_writes_through(self):
+        self.client.put(f'{self.url}?autosave=1', json={'title': 'Autosaved', 'data': {'layers': [1]}})
+        response = self.client.put(self.url, json={'title': 'Saved', 'version': 2})
+        body = json.loads(response.data)
+        self.assertFalse(body['buffered'])
+        self.assertEqual(body['version'], 3)
+
+        draft = self.stored()
+        self.assertEqual((draft.title, draft.data, draft.version), ('Saved', {'layers': [1]}, 3))
+        self.assertIsNone(draft_buffer.buffered_state(self.draft_id))
+
+    def test_flush_skips_superseded_buffer(self):
+        self.client.put(f'{self.url}?autosave=1', json={'title': 'Autosaved'})
+        draft = self.stored()
+        draft.title = 'Saved elsewhere'
+        draft.version = 5
+        db.session.commit()
+
+        self.assertEqual(draft_buffer.flush_drafts(), 0)
+        self.assertEqual(self.stored().title, 'Saved elsewhere')
+        self.assertIsNone(draft_buffer.buffered_state(self.draft_id))
+
+    def test_delete_discards_buffer(self):
+        self.client.put(f'{self.url}?autosave=1', json={'title': 'Autosaved'})
+        self.assertEqual(self.client.delete(self.url).status_code, 200)
+        self.assertIsNone(draft_buffer.buffered_state(self.draft_id))
+        self.assertEqual(draft_buffer.flush_drafts(), 0)
+
+    def test_buffer_disabled(self):
+        self.app.config['DRAFT_AUTOSAVE_BUFFER'] = False
+        body = json.loads(self.client.put(f'{self.url}?autosave=1', json={'title': 'Now'}).data)
+        self.assertFalse(body['buffered'])
+        self.assertEqual(self.stored().title, 'Now')
+
+    def put_interleaved(self, first_url, second_url):
+        """Two PUTs of version 1 where the second runs after the first has read the draft."""
+        real_draft_state = api_v1.draft_state
+        responses, pending = [], ['second']
+
+        def interleaved(draft):
+            state = real_draft_state(draft)
+            if pending:
+                pending.pop()
+                responses.append(self.client.put(second_url, json={'title': 'Second', 'version': 1}))
+            return state
+
+        with mock.patch.object(api_v1, 'draft_state', interleaved):
+            responses.append(self.client.put(first_url, json={'title': 'First', 'version': 1}))
+        return responses
+
+    def test_same_version_autosaves_conflict(self):
+        responses = self.put_interleaved(f'{self.url}?autosave=1', f'{self.url}?autosave=1')
+        self.assertEqual(sorted(response.status_code for response in responses), [200, 409])
+        self.assertEqual(draft_buffer.buffered_state(self.draft_id)['title'], 'Second')
+        self.assertIn('version 2', json.loads(responses[1].data)['message'])
+
+    def test_same_version_save_and_autosave_conflict(self):
+        for first, second in ((self.url, f'{self.url}?autosave=1'), (f'{self.url}?autosave=1', self.url)):
+            with self.subTest(first=first):
+                draft = self.stored()
+                draft.title, draft.version = 'Draft', 1
+                db.session.commit()
+                draft_buffer.discard(self.draft_id)
+
+                responses = self.put_interleaved(first, second)
+                self.assertEqual([response.status_code for response in responses], [200, 409])
+                # Whatever was acknowledged ends up in the database
+                draft_buffer.flush_drafts()
+                self.assertEqual((self.stored().title, self.stored().version), ('Second', 2))
+
+    def test_without_redis_writes_through(self):
+        with mock.patch.object(extensions, 'redis_client', None):
+            body = json.loads(self.client.put(f'{self.url}?autosave=1', json={'title': 'Direct', 'version': 1}).data)
+        self.assertFalse(body['buffered'])
+        self.assertEqual((self.stored().title, self.stored().version), ('Direct', 2))
+        self.assertEqual(self.redis.values, {})
+
+    def test_redis_error_writes_through(self):
+        with mock.patch.object(self.redis, 'pipeline', side_effect=redis.ConnectionError('down')):
+            body = json.loads(self.client.put(f'{self.url}?autosave=1', json={'title': 'Direct'}).data)
+        self.assertFalse(body['buffered'])
+        self.assertEqual(self.stored().title, 'Direct')
+
+    def test_flusher_thread_bounds_delay(self):
+        self.app.config['DRAFT_FLUSH_INTERVAL'] = 0.05
+        self.client.put(f'{self.url}?autosave=1', json={'title': 'Background'})
+        self.addCleanup(self.app.extensions['draft_flusher'].set)
+
+        deadline = time.monotonic() + 2
+        while draft_buffer.buffered_state(self.draft_id) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.stored().title, 'Background')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import json
+import zlib
+from unittest import mock
+import draft_codec
+from draft_codec import encode, decode, DraftCodecError
+
+
+class DraftCodecTestCase(unittest.TestCase):
+    """Test cases for compressed draft payload storage."""
+
+    def test_small_payload_stored_raw(self):
+        stored = encode({'layers': []})
+        self.assertEqual(stored[0], draft_codec.RAW)
+        self.assertEqual(decode(stored), {'layers': []})
+
+    def test_large_payload_compressed(self):
+        data = {'layers': [{'type': 'image', 'src': 'data:image/png;base64,' + 'iVBORw0KGgo' * 2000}] * 3}
+        stored = encode(data)
+        self.assertIn(stored[0], (draft_codec.ZLIB, draft_codec.ZSTD))
+        self.assertLess(len(stored) * 5, len(json.dumps(data)))
+        self.assertEqual(decode(stored), data)
+
+    def test_zlib_fallback(self):
+        data = {'text': 'caption ' * 200}
+        with mock.patch.object(draft_codec, 'zstandard', None):
+            stored = encode(data)
+            self.assertEqual(stored[0], draft_codec.ZLIB)
+            self.assertEqual(decode(stored), data)
+
+    def test_legacy_json_rows(self):
+        self.assertEqual(decode('{"layers": [1]}'), {'layers': [1]})
+        self.assertEqual(decode(b'{"layers": [1]}'), {'layers': [1]})
+        self.assertIsNone(decode(None))
+        self.assertIsNone(encode(None))
+
+    def test_zstd_without_package(self):
+        with mock.patch.object(draft_codec, 'zstandard', None):
+            with self.assertRaises(DraftCodecError):
+                decode(bytes([draft_codec.ZSTD]) + zlib.compress(b'{}'))
+
+
+if __name__ == '__main__':
+    unittest.main()
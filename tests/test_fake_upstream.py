@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+from config import Config
+from benchmarks.fake_upstream import start_fake_upstream
+from services.giphy_service import search_gifs_page
+from services.reddit_service import fetch_reddit_hot_feed
+
+
+class FakeUpstreamTestCase(unittest.TestCase):
+    """Test the upstream services against the bundled fake Reddit/Giphy server."""
+
+    def setUp(self):
+        self.server = start_fake_upstream(posts=40, seed=0)
+        patches = [
+            mock.patch.object(Config, 'REDDIT_API_URL', self.server.base_url),
+            mock.patch.object(Config, 'GIPHY_API_URL', self.server.base_url),
+            mock.patch.object(Config, 'GIPHY_API_KEY', 'fake'),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reddit_feed(self):
+        memes = fetch_reddit_hot_feed(subreddit='dankmemes', limit=30)
+        # Video posts in the fixture are filtered out
+        self.assertTrue(20 < len(memes) < 30)
+        self.assertEqual(len({meme['image_url'] for meme in memes}), len(memes))
+        self.assertEqual(memes[0]['subreddit'], 'dankmemes')
+
+    def test_giphy_pages(self):
+        gifs, total = search_gifs_page('cat', limit=25, offset=4190)
+        self.assertEqual(total, 4200)
+        self.assertEqual(len(gifs), 10)
+
+    def test_simulated_errors(self):
+        self.server.state.error_rate = 1.0
+        with self.assertRaises(Exception):
+            fetch_reddit_hot_feed(limit=5, deadline=1)
+        self.assertGreater(self.server.state.errors, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
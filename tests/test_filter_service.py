@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from PIL import Image
+from services.filter_service import (
+    normalize_filters, is_identity, apply_filters, apply_filters_array, apply_filters_batch
+)
+
+
+class FilterServiceTestCase(unittest.TestCase):
+    """Test cases for the NumPy editor filter pipeline."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.pixels = rng.integers(0, 256, (32, 24, 4), dtype=np.uint8)
+        self.image = Image.fromarray(self.pixels)
+
+    def test_normalize_filters_defaults_and_clamps(self):
+        filters = normalize_filters({'brightness': 500, 'blur': -3, 'hueRotate': 'x'})
+        self.assertEqual(filters['brightness'], 200)
+        self.assertEqual(filters['blur'], 0)
+        self.assertEqual(filters['hueRotate'], 0)
+        self.assertEqual(filters['contrast'], 100)
+
+    def test_normalize_filters_rejects_non_finite(self):
+        filters = normalize_filters({'brightness': 'nan', 'contrast': float('inf'), 'blur': '-Infinity'})
+        self.assertEqual(filters, normalize_filters(None))
+        self.assertTrue(is_identity(filters))
+
+    def test_identity_filters_leave_image_unchanged(self):
+        self.assertIs(apply_filters(self.image, {}), self.image)
+        result = apply_filters_array(self.pixels, {'hueRotate': 360})
+        self.assertTrue(np.array_equal(result, self.pixels))
+
+    def test_brightness(self):
+        result = apply_filters_array(self.pixels, {'brightness': 50})
+        expected = np.rint(self.pixels[..., :3] * 0.5)
+        self.assertLessEqual(np.abs(result[..., :3] - expected).max(), 1)
+        self.assertTrue(np.array_equal(result[..., 3], self.pixels[..., 3]))
+
+    def test_zero_saturation_is_greyscale(self):
+        result = apply_filters_array(self.pixels, {'saturation': 0})
+        self.assertLessEqual(np.ptp(result[..., :3].astype(int), axis=2).max(), 1)
+
+    def test_zero_contrast_is_mid_grey(self):
+        result = apply_filters_array(self.pixels, {'contrast': 0})
+        self.assertTrue(np.all(result[..., :3] == 128))
+
+    def test_blur_smooths_image(self):
+        result = apply_filters_array(self.pixels, {'blur': 2})
+        self.assertLess(result.astype(float).std(), self.pixels.astype(float).std())
+
+    def test_batch_matches_single(self):
+        images = [self.image, self.image.convert('RGB'), self.image]
+        filters = [{'brightness': 120}, {'contrast': 80, 'blur': 1}, {'hueRotate': 90}]
+        batch = apply_filters_batch(images, filters)
+        for image, f, result in zip(images, filters, batch):
+            self.assertEqual(result.mode, image.mode)
+            self.assertTrue(np.array_equal(np.asarray(result), np.asarray(apply_filters(image, f))))
+
+    def test_batch_requires_filters_per_image(self):
+        with self.assertRaises(ValueError):
+            apply_filters_batch([self.image, self.image], [{}])
+
+
+if __name__ == '__main__':
+    unittest.main()
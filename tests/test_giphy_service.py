@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+import extensions
+from services import giphy_service
+from services.cache import clear_local_cache, reset_cache_stats
+from services.giphy_service import get_cached_gifs, normalize_query, GIF_BLOCK_SIZE
+
+
+TOTAL = 60
+
+
+def fake_page(query, limit=20, offset=0):
+    items = [
+        {'id': f'{query}-{i}', 'title': '', 'url': '', 'embed_url': '', 'image_url': '', 'source': 'giphy'}
+        for i in range(offset, min(offset + limit, TOTAL))
+    ]
+    return items, TOTAL
+
+
+class GifCacheTestCase(unittest.TestCase):
+    """Test cases for the block-cached, paginated GIF search."""
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(extensions, 'redis_client', None),
+            mock.patch.object(giphy_service, 'search_gifs_page', side_effect=fake_page),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.upstream = giphy_service.search_gifs_page
+        clear_local_cache()
+        reset_cache_stats()
+
+    def ids(self, page):
+        return [int(item['id'].split('-')[-1]) for item in page['items']]
+
+    def test_query_normalized(self):
+        self.assertEqual(normalize_query('  Funny   CAT '), 'funny cat')
+        for query in ('Cat', 'cat ', 'cat'):
+            get_cached_gifs(query, limit=20)
+        self.assertEqual(self.upstream.call_count, 1)
+
+    def test_windows_assembled_from_blocks(self):
+        page = get_cached_gifs('cat', limit=20, offset=20)
+        self.assertEqual(self.ids(page), list(range(20, 40)))
+        self.assertEqual(page['next_offset'], 40)
+        self.assertEqual(self.upstream.call_count, 2)
+
+        # Fully covered by the two cached blocks
+        page = get_cached_gifs('cat', limit=50, offset=0)
+        self.assertEqual(self.ids(page), list(range(50)))
+        self.assertEqual(self.upstream.call_count, 2)
+        for call in self.upstream.call_args_list:
+            self.assertEqual(call.kwargs['limit'], GIF_BLOCK_SIZE)
+
+    def test_last_page(self):
+        page = get_cached_gifs('cat', limit=20, offset=50)
+        self.assertEqual(self.ids(page), list(range(50, 60)))
+        self.assertIsNone(page['next_offset'])
+        self.assertEqual(page['total'], TOTAL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import threading
+import time
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.http_client import HTTPClient
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            failing = server.failures > 0
+            if failing:
+                server.failures -= 1
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        body = b'{"ok": true}'
+        self.send_response(503 if failing else 200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTPClientTestCase(unittest.TestCase):
+    """Test cases for the shared pooled HTTP client."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), UpstreamHandler)
+        self.server.lock = threading.Lock()
+        self.server.hits = self.server.active = self.server.peak = self.server.failures = 0
+        self.server.delay = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hot'
+        self.host = f'http://127.0.0.1:{self.server.server_port}'
+        self.client = HTTPClient(max_connections_per_host=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_reused(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(self.url).json(), {'ok': True})
+        stats = self.client.stats()[self.host]
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['new_connections'], 1)
+        self.assertEqual(stats['reused_connections'], 4)
+        self.assertIn('p95', stats['latency_ms'])
+
+    def test_retries_retryable_status(self):
+        self.server.failures = 2
+        response = self.client.get(self.url, retries=2, deadline=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(self.client.stats()[self.host]['retries'], 2)
+
+    def test_returns_last_error_when_retries_exhausted(self):
+        self.server.failures = 5
+        response = self.client.get(self.url, retries=1, deadline=5)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits, 2)
+
+    def test_deadline_bounds_call(self):
+        self.server.delay = 1.0
+        start = time.monotonic()
+        with self.assertRaises(requests.Timeout):
+            self.client.get(self.url, deadline=0.2)
+        self.assertLess(time.monotonic() - start, 0.9)
+
+    def test_per_host_concurrency_limit(self):
+        self.server.delay = 0.1
+        threads = [threading.Thread(target=self.client.get, args=(self.url,)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(self.server.hits, 6)
+        self.assertLessEqual(self.server.peak, 2)
+
+    def test_public_only_refuses_internal_peer(self):
+        # Whatever a pre-flight DNS check saw, the connection itself lands on loopback
+        client = HTTPClient(public_only=True)
+        self.addCleanup(client.close)
+        with self.assertRaises(requests.ConnectionError):
+            client.get(self.url, retries=0)
+        self.assertEqual(self.server.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from json_patch import apply_patch, parse_pointer, JsonPatchError, JsonPatchTestFailed
+
+
+class JsonPatchTestCase(unittest.TestCase):
+    """Test cases for the RFC 6902 JSON Patch implementation."""
+
+    def test_pointer_escapes(self):
+        self.assertEqual(parse_pointer('/a~1b/m~0n/0'), ['a/b', 'm~n', '0'])
+        self.assertEqual(parse_pointer(''), [])
+        with self.assertRaises(JsonPatchError):
+            parse_pointer('a/b')
+
+    def test_operations(self):
+        doc = {'foo': ['bar', 'baz'], 'obj': {'x': 1}}
+        result = apply_patch(doc, [
+            {'op': 'add', 'path': '/foo/1', 'value': 'qux'},
+            {'op': 'remove', 'path': '/foo/0'},
+            {'op': 'replace', 'path': '/obj/x', 'value': 2},
+            {'op': 'move', 'from': '/obj/x', 'path': '/moved'},
+            {'op': 'copy', 'from': '/foo', 'path': '/copy'},
+            {'op': 'test', 'path': '/copy/1', 'value': 'baz'},
+        ])
+        self.assertEqual(result, {'foo': ['qux', 'baz'], 'obj': {}, 'moved': 2, 'copy': ['qux', 'baz']})
+        # The input document is never modified
+        self.assertEqual(doc, {'foo': ['bar', 'baz'], 'obj': {'x': 1}})
+
+    def test_errors(self):
+        doc = {'list': [1], 'flag': True}
+        cases = [
+            [{'op': 'remove', 'path': '/missing'}],
+            [{'op': 'add', 'path': '/list/5', 'value': 1}],
+            [{'op': 'add', 'path': '/list/01', 'value': 1}],
+            [{'op': 'replace', 'path': '/nope', 'value': 1}],
+            [{'op': 'move', 'from': '/list', 'path': '/list/0'}],
+            [{'op': 'frobnicate', 'path': '/list'}],
+            [{'op': 'add', 'path': '/x'}],
+            {'op': 'add'},
+        ]
+        for patch in cases:
+            with self.assertRaises(JsonPatchError, msg=patch):
+                apply_patch(doc, patch)
+
+    def test_test_operation_uses_json_equality(self):
+        with self.assertRaises(JsonPatchTestFailed):
+            apply_patch({'flag': True}, [{'op': 'test', 'path': '/flag', 'value': 1}])
+        apply_patch({'n': 1}, [{'op': 'test', 'path': '/n', 'value': 1.0}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -61,12 +61,11 @@ class ModelTestCase(unittest.TestCase):
         db.session.add(l2)
         db.session.commit()
         
-        self.assertEqual(m.layers.count(), 2)
+        self.assertEqual(len(m.layers), 2)
         
-        # Order is not guaranteed without order_by, but usually insertion order in simple cases
-        # Let's check filter
-        text_layer = m.layers.filter_by(layer_type='text').first()
-        self.assertEqual(text_layer.content, 'Top Text')
+        # Layers are ordered by id, i.e. insertion order
+        self.assertEqual([l.layer_type for l in m.layers], ['text', 'sticker'])
+        self.assertEqual(m.layers[0].content, 'Top Text')
 
 if __name__ == '__main__':
     unittest.main()
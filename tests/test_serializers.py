@@ -0,0 +1,114 @@
+import unittest
+import json
+from datetime import datetime
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from extensions import db
+from models import (
+    MemeTemplate, TemplateCategory, Sticker, StickerCategory, Meme, MemeLayer, MemeDraft
+)
+from schemas import TemplateSchema, StickerSchema, MemeSchema
+from serializers import (
+    template_rows, template_serializer, sticker_rows, sticker_serializer,
+    meme_rows, serialize_memes, draft_rows, serialize_draft
+)
+from json_provider import OrjsonProvider
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+    CATALOG_CACHE_ENABLED = False
+
+
+class SerializersTestCase(unittest.TestCase):
+    """Test cases for the column-tuple serializers and the orjson provider."""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        category = TemplateCategory(name='Classic')
+        sticker_category = StickerCategory(name='Faces')
+        db.session.add_all([category, sticker_category])
+        db.session.flush()
+        db.session.add_all([
+            MemeTemplate(name='Drake', image_url='https://example.com/drake.jpg', category_id=category.id),
+            MemeTemplate(name='Blank', image_url=None),
+            Sticker(name='Sunglasses', image_url='stickers/sunglass.png', category_id=sticker_category.id),
+            Sticker(name='Loose', image_url='stickers/loose.png'),
+        ])
+        meme = Meme(title='Café meme', image_url='https://example.com/m.jpg', user_id=None, template_id=1)
+        meme.layers = [
+            MemeLayer(layer_type='text', content='Top', properties={'x': 1, 'color': '#fff'}, z_index=1),
+            MemeLayer(layer_type='sticker', content='stickers/sunglass.png', properties=None),
+        ]
+        db.session.add_all([meme, Meme(title='No layers', created_at=datetime(2024, 1, 1, 12, 0, 0, 5))])
+        db.session.add(MemeDraft(title='Draft', data={'layers': []}))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_matches_schemas(self):
+        with self.app.test_request_context('/'):
+            serialize = template_serializer()
+            self.assertEqual(
+                [serialize(row) for row in template_rows().order_by(MemeTemplate.id)],
+                TemplateSchema(many=True).dump(MemeTemplate.query.order_by(MemeTemplate.id).all())
+            )
+            serialize = sticker_serializer()
+            self.assertEqual(
+                [serialize(row) for row in sticker_rows().order_by(Sticker.id)],
+                StickerSchema(many=True).dump(Sticker.query.order_by(Sticker.id).all())
+            )
+            self.assertEqual(
+                serialize_memes(meme_rows().order_by(Meme.id).all()),
+                MemeSchema(many=True).dump(Meme.query.order_by(Meme.id).all())
+            )
+            draft = MemeDraft.query.first()
+            self.assertEqual(serialize_draft(draft_rows().first()), {
+                'id': draft.id, 'title': 'Draft',
+                'created_at': draft.created_at.isoformat(), 'updated_at': draft.updated_at.isoformat()
+            })
+
+    def test_list_endpoints(self):
+        templates = json.loads(self.client.get('/api/v1/templates?category_id=1').data)
+        self.assertEqual([t['name'] for t in templates['items']], ['Drake'])
+        memes = json.loads(self.client.get('/api/v1/memes?cursor=&per_page=1').data)
+        self.assertEqual(len(memes['items']), 1)
+        self.assertIsNotNone(memes['next_cursor'])
+        stickers = json.loads(self.client.get('/api/v1/stickers?category_id=1').data)
+        self.assertEqual([s['name'] for s in stickers], ['Sunglasses'])
+
+    def test_orjson_provider_matches_default(self):
+        self.assertIsInstance(self.app.json, OrjsonProvider)
+        default = DefaultJSONProvider(self.app)
+        payload = {
+            'b': [1, 2.5, None, True], 'a': {'z': 'text', 'y': datetime(2024, 1, 2, 3, 4, 5)},
+            'items': [{'id': 1, 'name': 'Drake'}]
+        }
+        for compact in (True, False):
+            self.app.json.compact = default.compact = compact
+            self.assertEqual(self.app.json.response(payload).data, default.response(payload).data)
+        for layout in ({'separators': (',', ':')}, {'indent': 2}, {}):
+            self.assertEqual(self.app.json.dumps(payload, **layout), default.dumps(payload, **layout))
+        self.assertEqual(self.app.json.loads(b'{"a": [1, "\\u00e9"]}'), {'a': [1, 'é']})
+
+    def test_default_provider_configurable(self):
+        class DefaultJSONConfig(TestConfig):
+            JSON_PROVIDER = 'default'
+
+        app = create_app(DefaultJSONConfig)
+        self.assertNotIsInstance(app.json, OrjsonProvider)
+
+
+if __name__ == '__main__':
+    unittest.main()
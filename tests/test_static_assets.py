@@ -0,0 +1,103 @@
+import unittest
+import gzip
+import os
+import shutil
+import tempfile
+from app import create_app
+from services import static_assets
+from services.static_assets import precompress_static, is_hashed
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+
+
+BUNDLE = b'console.log("meme editor");\n' * 200
+
+
+class StaticAssetsTestCase(unittest.TestCase):
+    """Test cases for precompressed, cache-friendly SPA asset serving."""
+
+    def setUp(self):
+        self.static = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.static, 'assets'))
+        with open(os.path.join(self.static, 'index.html'), 'w') as f:
+            f.write('<script src="/assets/index-5ede8385.js"></script>')
+        with open(os.path.join(self.static, 'assets', 'index-5ede8385.js'), 'wb') as f:
+            f.write(BUNDLE)
+        self.app = create_app(TestConfig)
+        self.app.static_folder = self.static
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.static)
+
+    def test_manifest(self):
+        manifest = precompress_static(self.static)
+        bundle = manifest['assets/index-5ede8385.js']
+        self.assertTrue(bundle['hashed'])
+        self.assertEqual(bundle['encodings']['gzip'], 'assets/index-5ede8385.js.gz')
+        self.assertEqual(bundle['size'], len(BUNDLE))
+        # Too small to be worth compressing
+        self.assertEqual(manifest['index.html']['encodings'], {})
+        self.assertFalse(manifest['index.html']['hashed'])
+        self.assertFalse(is_hashed('assets/logo.svg'))
+        self.assertTrue(is_hashed('assets/index-BkU3vl9v.css'))
+
+    def test_precompressed_hashed_asset(self):
+        precompress_static(self.static)
+        response = self.client.get('/assets/index-5ede8385.js', headers={'Accept-Encoding': 'deflate, gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('javascript', response.mimetype)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(gzip.decompress(response.data), BUNDLE)
+        self.assertEqual(response.headers['Cache-Control'], 'public, max-age=31536000, immutable')
+
+        etag = response.headers['ETag']
+        again = self.client.get('/assets/index-5ede8385.js', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.data, b'')
+
+        plain = self.client.get('/static/assets/index-5ede8385.js', headers={'If-None-Match': etag})
+        self.assertEqual(plain.status_code, 200)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.data, BUNDLE)
+
+    @unittest.skipUnless(static_assets.brotli, 'brotli is not installed')
+    def test_brotli_precompressed(self):
+        bundle = precompress_static(self.static)['assets/index-5ede8385.js']
+        self.assertEqual(bundle['encodings']['br'], 'assets/index-5ede8385.js.br')
+        response = self.client.get('/assets/index-5ede8385.js', headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(static_assets.brotli.decompress(response.data), BUNDLE)
+        self.assertNotEqual(response.headers['ETag'], self.client.get(
+            '/assets/index-5ede8385.js', headers={'Accept-Encoding': 'gzip'}).headers['ETag'])
+
+    def test_index_revalidated(self):
+        precompress_static(self.static)
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'/assets/index-5ede8385.js', response.data)
+        self.assertTrue(response.cache_control.no_cache)
+        self.assertFalse(response.cache_control.immutable)
+        again = self.client.get('/', headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    def test_without_manifest(self):
+        response = self.client.get('/assets/index-5ede8385.js', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(self.client.get('/assets/missing.js').status_code, 404)
+        self.assertEqual(self.client.get('/static/../config.py').status_code, 404)
+
+        os.remove(os.path.join(self.static, 'index.html'))
+        self.assertIn(b'Setup Required', self.client.get('/').data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import time
+from unittest import mock
+from services import trending_service
+from services.trending_service import aggregate_trending, merge_trending
+
+
+def item(image_url, score, source='reddit'):
+    return {'id': image_url, 'title': image_url, 'image_url': image_url, 'score': score, 'source': source}
+
+
+class TrendingServiceTestCase(unittest.TestCase):
+    """Test cases for concurrent trending aggregation."""
+
+    def test_merge_dedupes_and_ranks_by_normalized_score(self):
+        memes = [item('a', 1000), item('b', 500), item('shared', 100)]
+        small = [item('shared', 50), item('c', 40)]
+        giphy = [item('g1', None, 'giphy'), item('g2', None, 'giphy')]
+
+        merged = merge_trending([memes, small, giphy])
+        urls = [entry['image_url'] for entry in merged]
+        self.assertEqual(len(urls), len(set(urls)))
+        # Top of each source ranks equally high regardless of absolute score
+        self.assertEqual(set(urls[:3]), {'a', 'shared', 'g1'})
+        # The duplicate keeps its better-scored copy (top of the small subreddit)
+        shared = next(entry for entry in merged if entry['image_url'] == 'shared')
+        self.assertEqual(shared['score'], 50)
+
+    def run_sources(self, sources, deadline):
+        with mock.patch.object(trending_service, 'trending_sources', return_value=sources):
+            return aggregate_trending(deadline=deadline)
+
+    def test_slow_and_failing_sources_are_dropped(self):
+        def slow(deadline):
+            time.sleep(1)
+            return [item('slow', 10)]
+
+        def failing(deadline):
+            raise RuntimeError('boom')
+
+        start = time.monotonic()
+        merged = self.run_sources([
+            ('fast', lambda deadline: [item('fast', 10)]),
+            ('slow', slow),
+            ('failing', failing),
+        ], deadline=0.3)
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual([entry['image_url'] for entry in merged], ['fast'])
+
+    def test_sources_fetched_concurrently(self):
+        def source(name):
+            def fetch(deadline):
+                time.sleep(0.2)
+                return [item(name, 1)]
+            return (name, fetch)
+
+        start = time.monotonic()
+        merged = self.run_sources([source(str(i)) for i in range(4)], deadline=2)
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertEqual(len(merged), 4)
+
+    def test_all_sources_failing_raises(self):
+        def failing(deadline):
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            self.run_sources([('a', failing), ('b', failing)], deadline=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import json
+from unittest import mock
+from app import create_app
+from config import Config
+from extensions import db
+from services.cache import clear_local_cache
+from services.trending_worker import run_trending_worker
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+    TRENDING_REFRESHER = 'worker'
+    TRENDING_SUBREDDITS = ['memes']
+    TRENDING_INCLUDE_GIPHY = False
+
+
+FEED = [{
+    'id': 'abc', 'title': 'Hot meme', 'image_url': 'https://i.redd.it/hot.jpg', 'score': 42,
+    'author': 'someone', 'created_at': 1700000000, 'subreddit': 'memes', 'source': 'reddit'
+}]
+
+
+class TrendingWorkerTestCase(unittest.TestCase):
+    """Test cases for the scheduled trending refresher."""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        clear_local_cache()
+        patcher = mock.patch('services.trending_service.fetch_reddit_hot_feed', return_value=FEED)
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        clear_local_cache()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_requests_never_fetch(self):
+        response = self.client.get('/api/v1/trending')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data), [])
+        self.assertEqual(json.loads(self.client.get('/memes').data), [])
+        self.fetch.assert_not_called()
+
+    def test_worker_warms_both_endpoints(self):
+        run_trending_worker(self.app, interval=0, iterations=1)
+        self.assertEqual(self.fetch.call_count, 1)
+
+        trending = json.loads(self.client.get('/api/v1/trending').data)
+        self.assertEqual(trending[0]['title'], 'Hot meme')
+
+        legacy = json.loads(self.client.get('/memes').data)
+        self.assertEqual(legacy, [{'title': 'Hot meme', 'image': 'https://i.redd.it/hot.jpg', 'score': 42}])
+        self.assertEqual(self.fetch.call_count, 1)
+
+    def test_worker_survives_fetch_errors(self):
+        self.fetch.side_effect = [FEED, RuntimeError('reddit down')]
+        run_trending_worker(self.app, interval=0, iterations=2)
+        self.assertEqual(self.fetch.call_count, 2)
+        # The earlier feed is still served
+        self.assertEqual(len(json.loads(self.client.get('/api/v1/trending').data)), 1)
+
+    def test_thread_refresher_starts_on_first_request_only(self):
+        class ServingConfig(TestConfig):
+            TESTING = False
+            TRENDING_REFRESHER = 'thread'
+
+        with mock.patch('services.trending_worker.start_trending_thread') as start:
+            app = create_app(ServingConfig)
+            # Creating the app (as every CLI command does) starts nothing
+            start.assert_not_called()
+            start.side_effect = lambda app: app.extensions.setdefault('trending_refresher', object())
+            client = app.test_client()
+            client.get('/api/v1/trending')
+            client.get('/api/v1/trending')
+            self.assertEqual(start.call_count, 1)
+
+            ServingConfig.TESTING = True
+            create_app(ServingConfig).test_client().get('/api/v1/trending')
+            self.assertEqual(start.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
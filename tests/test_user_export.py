@@ -0,0 +1,119 @@
+import unittest
+import gzip
+import json
+from unittest import mock
+from datetime import datetime, timedelta
+from app import create_app
+from extensions import db
+from models import User, Meme, MemeLayer, MemeDraft
+from services import draft_buffer
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+    EXPORT_BATCH_SIZE = 3
+    DRAFT_FLUSH_INTERVAL = 0
+
+
+def parse(body):
+    return [json.loads(line) for line in body.decode('utf-8').splitlines()]
+
+
+class UserExportTestCase(unittest.TestCase):
+    """Test cases for the streaming NDJSON user export."""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+        self.user = User(username='exporter', email='exporter@example.com')
+        other = User(username='other', email='other@example.com')
+        db.session.add_all([self.user, other])
+        db.session.flush()
+        start = datetime(2024, 1, 1)
+        for i in range(7):
+            db.session.add(Meme(
+                title=f'Meme {i}', user_id=self.user.id, created_at=start + timedelta(minutes=i),
+                layers=[MemeLayer(layer_type='text', content=f'Caption {i}', properties={'x': i}, z_index=0)]
+            ))
+        for i in range(4):
+            db.session.add(MemeDraft(title=f'Draft {i}', user_id=self.user.id, data={'n': i},
+                                     created_at=start + timedelta(minutes=i)))
+        db.session.add(Meme(title='Not mine', user_id=other.id))
+        db.session.add(MemeDraft(title='Not mine', user_id=other.id, data={}))
+        db.session.commit()
+        self.url = f'/api/v1/users/{self.user.id}/export'
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_full_export(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+
+        lines = parse(response.data)
+        self.assertEqual(lines[0]['type'], 'export')
+        self.assertEqual(lines[0]['user_id'], self.user.id)
+        self.assertEqual(lines[-1], {'type': 'end', 'memes': 7, 'drafts': 4})
+
+        memes = [line['item'] for line in lines if line['type'] == 'meme']
+        drafts = [line['item'] for line in lines if line['type'] == 'draft']
+        self.assertEqual([m['title'] for m in memes], [f'Meme {i}' for i in range(7)])
+        self.assertEqual(memes[2]['layers'][0]['content'], 'Caption 2')
+        self.assertEqual([d['data'] for d in drafts], [{'n': i} for i in range(4)])
+        self.assertEqual(drafts[0]['version'], 1)
+
+    def test_streamed_in_batches(self):
+        response = self.client.get(self.url, buffered=False)
+        chunks = iter(response.response)
+        header = parse(next(chunks))
+        self.assertEqual([line['type'] for line in header], ['export'])
+        # EXPORT_BATCH_SIZE rows per chunk
+        self.assertEqual(len(parse(next(chunks))), 3)
+        response.close()
+
+    def test_resume_from_cursor(self):
+        lines = parse(self.client.get(self.url).data)[1:-1]
+        for cut in (4, 7, 9):
+            resumed = parse(self.client.get(self.url, query_string={'cursor': lines[cut - 1]['cursor']}).data)
+            self.assertEqual(resumed[0]['cursor'], lines[cut - 1]['cursor'])
+            self.assertEqual(resumed[1:-1], lines[cut:])
+        last = parse(self.client.get(self.url, query_string={'cursor': lines[-1]['cursor']}).data)
+        self.assertEqual(last[-1], {'type': 'end', 'memes': 0, 'drafts': 0})
+
+    def test_pending_autosave_exported(self):
+        draft = MemeDraft.query.filter_by(title='Draft 1').one()
+        pending = {draft.id: {
+            'title': 'Autosaved', 'template_id': None, 'data': {'n': 'new'}, 'version': 2,
+            'updated_at': datetime.utcnow().isoformat()
+        }}
+        with mock.patch.object(draft_buffer, 'buffered_states', return_value=pending):
+            drafts = [line['item'] for line in parse(self.client.get(self.url).data) if line['type'] == 'draft']
+        self.assertEqual((drafts[1]['title'], drafts[1]['data'], drafts[1]['version']), ('Autosaved', {'n': 'new'}, 2))
+
+    def test_compressed(self):
+        plain = self.client.get(self.url).data
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        # Headers match apart from the export timestamp
+        self.assertEqual(parse(gzip.decompress(response.data))[1:], parse(plain)[1:])
+
+    def test_errors(self):
+        self.assertEqual(self.client.get('/api/v1/users/999/export').status_code, 404)
+        response = self.client.get(self.url, query_string={'cursor': 'layer.abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url, query_string={'cursor': 'meme.!!'}).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import io
+import json
+from marshmallow import ValidationError
+from flask.testing import EnvironBuilder
+from werkzeug.test import run_wsgi_app
+from app import create_app
+from extensions import db
+from models import Meme, MemeDraft
+from schemas import MemeCreateSchema, DraftCreateSchema
+from validation import CompiledSchema, nesting_depth
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    REDIS_URL = None
+    MAX_MEME_BYTES = 6144
+    MAX_DRAFT_BYTES = 4096
+    MAX_BATCH_BYTES = 8192
+    MAX_MEME_LAYERS = 5
+    MAX_PAYLOAD_DEPTH = 6
+
+
+class CountingStream(io.BytesIO):
+    """A request body without a length that remembers how much was read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.consumed = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.consumed += len(chunk)
+        return chunk
+
+
+def outcome(load, payload):
+    try:
+        return 'ok', load(payload)
+    except ValidationError as err:
+        return 'error', err.messages
+
+
+class CompiledSchemaTestCase(unittest.TestCase):
+    """Test cases for the compiled loaders matching their marshmallow schemas."""
+
+    def test_meme_payloads_match_schema(self):
+        compiled, schema = CompiledSchema(MemeCreateSchema), MemeCreateSchema()
+        payloads = [
+            {'title': 'ok', 'image_url': 'https://example.com/a.png', 'template_id': None,
+             'layers': [{'layer_type': 'text', 'content': 'Top', 'properties': {'x': 1}, 'z_index': 2},
+                        {'layer_type': 'sticker', 'content': 's.png'}]},
+            {'title': 1, 'zz': 1, 'layers': [{'layer_type': 'video', 'id': 3, 'content': None}]},
+            {'title': 'coerced', 'user_id': '12', 'layers': [{'layer_type': 'text', 'content': 'c', 'z_index': '3'}]},
+            {'title': 'bad', 'user_id': True, 'image_url': 'not a url', 'layers': [{'properties': []}]},
+            {'title': 'shape', 'layers': {}},
+            {'title': 'items', 'layers': [1, 'two']},
+            {},
+            [],
+        ]
+        for payload in payloads:
+            self.assertEqual(outcome(compiled.load, payload), outcome(schema.load, payload), payload)
+
+    def test_partial_draft_payloads_match_schema(self):
+        compiled, schema = CompiledSchema(DraftCreateSchema, partial=True), DraftCreateSchema(partial=True)
+        for payload in ({'title': 'x'}, {'data': []}, {'data': {'layers': []}}, {'title': None}, {'extra': 1}):
+            self.assertEqual(outcome(compiled.load, payload), outcome(schema.load, payload), payload)
+
+    def test_nesting_depth(self):
+        self.assertEqual(nesting_depth({'a': [{'b': 1}]}, 10), 3)
+        self.assertEqual(nesting_depth('scalar', 10), 0)
+        deep = []
+        for _ in range(1000):
+            deep = [deep]
+        self.assertLessEqual(nesting_depth(deep, 5), 6)
+
+
+class PayloadLimitsTestCase(unittest.TestCase):
+    """Test cases for the hard limits on meme and draft bodies."""
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_oversized_bodies_rejected(self):
+        big = {'title': 'Big', 'data': {'src': 'A' * 5000}}
+        response = self.client.post('/api/v1/memes/draft', json=big)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(json.loads(response.data)['error'], 'PayloadTooLarge')
+
+        draft = MemeDraft(title='Small', data={})
+        db.session.add(draft)
+        db.session.commit()
+        self.assertEqual(self.client.put(f'/api/v1/memes/draft/{draft.id}', json=big).status_code, 413)
+        self.assertEqual(MemeDraft.query.count(), 1)
+
+    def test_meme_limit_separate_from_drafts(self):
+        meme = {'title': 'Mid', 'image_url': 'https://example.com/' + 'a' * 5000}
+        self.assertEqual(self.client.post('/api/v1/memes', json=meme).status_code, 201)
+
+        meme['image_url'] += 'a' * 2000
+        response = self.client.post('/api/v1/memes', json=meme)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(json.loads(response.data)['error'], 'PayloadTooLarge')
+        self.assertEqual(Meme.query.count(), 1)
+
+    def test_oversized_batch_rejected(self):
+        memes = [{'title': f'Meme {i}', 'image_url': 'https://example.com/' + 'a' * 200} for i in range(50)]
+        response = self.client.post('/api/v1/memes/batch', json={'memes': memes})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(json.loads(response.data)['error'], 'PayloadTooLarge')
+        self.assertEqual(Meme.query.count(), 0)
+
+        response = self.client.post('/api/v1/memes/batch', json={'memes': memes[:5]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Meme.query.count(), 5)
+
+    def post_chunked(self, url, payload):
+        stream = CountingStream(json.dumps(payload).encode('utf-8'))
+        builder = EnvironBuilder(self.app, url, method='POST', content_type='application/json')
+        environ = builder.get_environ()
+        environ.pop('CONTENT_LENGTH', None)
+        environ.update({'wsgi.input': stream, 'wsgi.input_terminated': True})
+        app_iter, status, headers = run_wsgi_app(self.app, environ, buffered=True)
+        return self.app.response_class(app_iter, status, headers), stream.consumed
+
+    def test_chunked_body_read_bounded(self):
+        response, consumed = self.post_chunked('/api/v1/memes/draft', {'title': 'Big', 'data': {'src': 'A' * 100000}})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(consumed, 4097)
+
+        response, consumed = self.post_chunked('/api/v1/memes/batch', {'memes': [{'title': 'A' * 100000}]})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(consumed, 8193)
+
+        response, _ = self.post_chunked('/api/v1/memes/draft', {'title': 'Small', 'data': {}})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(MemeDraft.query.one().title, 'Small')
+
+    def test_layer_and_depth_limits(self):
+        layer = {'layer_type': 'text', 'content': 'x'}
+        response = self.client.post('/api/v1/memes', json={'title': 'Many', 'layers': [layer] * 6})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('maximum length 5', json.loads(response.data)['message'])
+        self.assertEqual(self.client.post('/api/v1/memes', json={'title': 'Five', 'layers': [layer] * 5}).status_code, 201)
+
+        deep = {'title': 'Deep', 'data': {'a': {'b': {'c': {'d': {'e': {}}}}}}}
+        response = self.client.post('/api/v1/memes/draft', json=deep)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('deeper than 6', json.loads(response.data)['message'])
+        self.assertEqual(Meme.query.count(), 1)
+
+        deep_layer = {'layer_type': 'text', 'properties': {'a': {'b': {'c': {}}}}}
+        response = self.client.post('/api/v1/memes/batch', json={'memes': [{'title': 'Deep', 'layers': [deep_layer]}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('deeper than 8', json.loads(response.data)['message'])
+        self.assertEqual(Meme.query.count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
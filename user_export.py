@@ -0,0 +1,120 @@
+"""Streaming NDJSON export of one user's memes and drafts.
+
+The export is a sequence of JSON lines: an ``export`` header, then every meme
+(with its layers) and every draft oldest first, then an ``end`` line with the
+counts. Each item line carries a ``cursor``; passing the last one received
+back as ``?cursor=`` resumes the export right after that item, so a client
+whose connection dropped can tell a finished export (it got ``end``) from a
+cut one and pick up where it stopped.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+import draft_codec
+from extensions import db
+from models import Meme, MemeDraft
+from pagination import encode_cursor, decode_cursor
+from serializers import meme_rows, serialize_memes
+from services import draft_buffer
+
+
+SECTIONS = ('meme', 'draft')
+
+
+def encode_export_cursor(section: str, created_at: datetime, item_id: int) -> str:
+    return f'{section}.{encode_cursor(created_at, item_id)}'
+
+
+def decode_export_cursor(cursor: str) -> Tuple[str, datetime, int]:
+    """Parse a cursor from an export line; raises ValueError if malformed."""
+    section, _, position = cursor.partition('.')
+    if section not in SECTIONS or not position:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return (section,) + decode_cursor(position)
+
+
+def _batches(query, model, user_id: int, after: Optional[Tuple[datetime, int]], batch_size: int):
+    """Rows of ``query`` for the user, oldest first, fetched ``batch_size`` at a time
+    from a server-side cursor."""
+    query = query.filter(model.user_id == user_id)
+    if after is not None:
+        query = query.filter(tuple_(model.created_at, model.id) > after)
+    statement = query.order_by(model.created_at, model.id).statement.execution_options(yield_per=batch_size)
+    return db.session.execute(statement).partitions()
+
+
+def draft_export_rows():
+    """Columns of a full draft, payload included."""
+    return db.session.query(
+        MemeDraft.id, MemeDraft.title, MemeDraft.user_id, MemeDraft.template_id, MemeDraft.data_blob,
+        MemeDraft.version, MemeDraft.created_at, MemeDraft.updated_at
+    )
+
+
+def serialize_drafts(rows) -> List[Dict[str, Any]]:
+    """Serialize a batch of draft rows as GET /memes/draft/<id> does, pending autosaves included."""
+    buffered = draft_buffer.buffered_states(row.id for row in rows)
+    items = []
+    for row in rows:
+        item = {
+            'id': row.id,
+            'title': row.title,
+            'user_id': row.user_id,
+            'template_id': row.template_id,
+            'data': draft_codec.decode(row.data_blob),
+            'version': row.version,
+            'created_at': row.created_at.isoformat(),
+            'updated_at': row.updated_at.isoformat()
+        }
+        state = buffered.get(row.id)
+        if state and state['version'] > row.version:
+            item.update((key, state[key]) for key in ('title', 'template_id', 'data', 'version', 'updated_at'))
+        items.append(item)
+    return items
+
+
+def export_lines(user_id: int, cursor: Optional[str] = None, batch_size: int = 500) -> Iterator[bytes]:
+    """Yield the export for ``user_id`` as NDJSON, one chunk per batch of rows.
+
+    ``cursor`` must already be valid (see decode_export_cursor). The header is
+    yielded before any query runs, so clients see bytes immediately; memory
+    use is bounded by ``batch_size`` whatever the size of the account.
+    """
+    dumps = current_app.json.dumps
+
+    def line(obj: Dict[str, Any]) -> str:
+        return dumps(obj, separators=(',', ':')) + '\n'
+
+    yield line({
+        'type': 'export', 'user_id': user_id, 'cursor': cursor, 'exported_at': datetime.utcnow().isoformat()
+    }).encode('utf-8')
+
+    start, after = 'meme', None
+    if cursor:
+        start, created_at, item_id = decode_export_cursor(cursor)
+        after = (created_at, item_id)
+
+    sections = (
+        ('meme', Meme, meme_rows(), serialize_memes),
+        ('draft', MemeDraft, draft_export_rows(), serialize_drafts),
+    )
+    counts = dict.fromkeys(SECTIONS, 0)
+    try:
+        for section, model, query, serialize in sections[SECTIONS.index(start):]:
+            for rows in _batches(query, model, user_id, after if section == start else None, batch_size):
+                chunk = ''.join(
+                    line({'type': section, 'cursor': encode_export_cursor(section, row.created_at, row.id), 'item': item})
+                    for row, item in zip(rows, serialize(rows))
+                )
+                counts[section] += len(rows)
+                yield chunk.encode('utf-8')
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        # Headers are long gone; tell the client to resume from its last cursor
+        yield line({'type': 'error', 'message': f'Export interrupted: {e.__class__.__name__}'}).encode('utf-8')
+        return
+    yield line({'type': 'end', 'memes': counts['meme'], 'drafts': counts['draft']}).encode('utf-8')
@@ -0,0 +1,165 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flask import current_app, request
+from marshmallow import EXCLUDE, INCLUDE, ValidationError, fields, missing
+
+
+class PayloadTooLarge(Exception):
+    """Raised when a request body is over its configured byte limit."""
+
+
+def json_body(max_bytes: int, silent: bool = False) -> Any:
+    """Parse the request's JSON body, refusing anything over ``max_bytes`` before parsing it.
+
+    A chunked body declares no length, so at most ``max_bytes + 1`` bytes of it
+    are read to find out.
+    """
+    too_large = PayloadTooLarge(f'Request body is larger than {max_bytes} bytes')
+    length = request.content_length
+    if length is not None or not request.is_json:
+        if length is not None and length > max_bytes:
+            raise too_large
+        return request.get_json(silent=silent) or {}
+
+    chunks, size = [], 0
+    while size <= max_bytes:
+        chunk = request.stream.read(min(65536, max_bytes + 1 - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    if size > max_bytes:
+        raise too_large
+    try:
+        return current_app.json.loads(b''.join(chunks)) or {}
+    except ValueError as e:
+        if silent:
+            return {}
+        return request.on_json_loading_failed(e)
+
+
+def nesting_depth(value: Any, limit: int) -> int:
+    """Depth of nested objects/arrays in ``value``, counting stops once ``limit`` is passed."""
+    deepest = 0
+    stack: List[Tuple[Any, int]] = [(value, 1)]
+    while stack:
+        value, depth = stack.pop()
+        if isinstance(value, dict):
+            children = value.values()
+        elif isinstance(value, list):
+            children = value
+        else:
+            continue
+        deepest = max(deepest, depth)
+        if deepest > limit:
+            break
+        stack.extend((child, depth + 1) for child in children if isinstance(child, (dict, list)))
+    return deepest
+
+
+def check_limits(payload: Any, layers_key: Optional[str] = None, wrapper_depth: int = 0) -> None:
+    """Enforce MAX_MEME_LAYERS and MAX_PAYLOAD_DEPTH on a parsed body (ValidationError).
+
+    ``wrapper_depth`` allows for the levels an envelope (such as a batch's
+    ``{"memes": [...]}``) adds above the payloads it carries.
+    """
+    max_layers = current_app.config['MAX_MEME_LAYERS']
+    layers = payload.get(layers_key) if layers_key and isinstance(payload, dict) else None
+    if isinstance(layers, list) and len(layers) > max_layers:
+        raise ValidationError({layers_key: [f'Longer than maximum length {max_layers}.']})
+    max_depth = current_app.config['MAX_PAYLOAD_DEPTH'] + wrapper_depth
+    if nesting_depth(payload, max_depth) > max_depth:
+        raise ValidationError({'_schema': [f'Nested deeper than {max_depth} levels.']})
+
+
+class CompiledSchema:
+    """Single-pass loader equivalent to ``schema_class().load`` for flat and nested schemas.
+
+    Values of the expected JSON type (str, int, dict, list of dicts) are checked
+    inline; anything else goes through the marshmallow field itself, so results
+    and error messages match the schema's. Schemas with hooks or a non-RAISE
+    ``unknown`` setting are loaded by marshmallow unchanged.
+    """
+
+    def __init__(self, schema_class, partial: bool = False):
+        self.schema = schema_class(partial=partial)
+        self.partial = partial
+        self.fallback = bool(self.schema._hooks) or self.schema.unknown in (EXCLUDE, INCLUDE)
+        self.fields = [
+            (field.data_key or name, name, field, self._compile(field))
+            for name, field in self.schema.load_fields.items()
+        ]
+        self.keys = {key for key, _, _, _ in self.fields}
+
+    def _compile(self, field: fields.Field) -> Callable[[Any], Any]:
+        validators = list(field.validators)
+
+        def validate(value):
+            for validator in validators:
+                validator(value)
+            return value
+
+        def generic(value):
+            return field.deserialize(value)
+
+        if isinstance(field, fields.Nested) and field.many and not validators:
+            nested = CompiledSchema(type(field.schema), partial=self.partial)
+
+            def load_many(value):
+                if not isinstance(value, list) or not all(type(item) is dict for item in value):
+                    return generic(value)
+                return nested.load_list(value)
+            return load_many
+        if type(field) in (fields.String, fields.Url):
+            return lambda value: validate(value) if type(value) is str else generic(value)
+        if type(field) is fields.Integer and not validators:
+            return lambda value: value if type(value) is int else generic(value)
+        if type(field) is fields.Dict and field.key_field is None and field.value_field is None and not validators:
+            return lambda value: dict(value) if type(value) is dict else generic(value)
+        return generic
+
+    def load_list(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results, errors = [], {}
+        for index, item in enumerate(items):
+            result, item_errors = self._load(item)
+            if item_errors:
+                errors[index] = item_errors
+            results.append(result)
+        if errors:
+            raise ValidationError(errors)
+        return results
+
+    def load(self, data: Any) -> Dict[str, Any]:
+        if self.fallback or type(data) is not dict:
+            return self.schema.load(data)
+        result, errors = self._load(data)
+        if errors:
+            raise ValidationError(errors)
+        return result
+
+    def _load(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        result, errors = {}, {}
+        for key, name, field, load in self.fields:
+            value = data.get(key, missing)
+            if value is missing:
+                if field.load_default is not missing:
+                    default = field.load_default
+                    result[name] = default() if callable(default) else default
+                elif field.required and not self.partial:
+                    errors[key] = [field.error_messages['required']]
+                continue
+            if value is None:
+                if field.allow_none:
+                    result[name] = None
+                else:
+                    errors[key] = [field.error_messages['null']]
+                continue
+            try:
+                result[name] = load(value)
+            except ValidationError as err:
+                errors[key] = err.messages
+        if not self.keys.issuperset(data):
+            for key in data:
+                if key not in self.keys:
+                    errors[key] = [self.schema.error_messages['unknown']]
+        return result, errors